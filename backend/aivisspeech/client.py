@@ -3,6 +3,9 @@ AivisSpeech Engine API Client
 VOICEVOX-compatible HTTP API wrapper
 """
 from typing import Dict, List, Any, Optional
+import asyncio
+import io
+import zipfile
 import httpx
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -11,15 +14,25 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 class AivisSpeechClient:
     """AivisSpeech Engine API client wrapper"""
     
-    def __init__(self, base_url: str = "http://localhost:10101"):
+    def __init__(self, base_url: str = "http://localhost:10101", client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            base_url: Engine URL (use "" with a client that has its own base_url)
+            client: Shared HTTP client to send requests with; it is not closed by this wrapper
+        """
         self.base_url = base_url.rstrip('/')
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self._owns_client = client is None
+        self.client = client if client is not None else httpx.AsyncClient(timeout=30.0)
+        
+        # None until the first synthesize_many() call finds out
+        self.multi_synthesis_supported: Optional[bool] = None
         
     async def __aenter__(self):
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.8))
     async def get_speakers(self) -> List[Dict[str, Any]]:
@@ -109,6 +122,80 @@ class AivisSpeechClient:
             logger.error(f"Failed to synthesize speech: {e}")
             raise
     
+    async def multi_synthesis(
+        self,
+        audio_queries: List[Dict[str, Any]],
+        speaker_id: int
+    ) -> List[bytes]:
+        """
+        Synthesize several audio queries in one request (VOICEVOX-compatible /multi_synthesis)
+        
+        Args:
+            audio_queries: AudioQuery JSONs, all for the same speaker
+            speaker_id: Speaker style ID
+            
+        Returns:
+            WAV file bytes per query, in input order
+        """
+        response = await self.client.post(
+            f"{self.base_url}/multi_synthesis",
+            params={"speaker": speaker_id},
+            json=audio_queries,
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        
+        # The engine answers with a ZIP of numbered WAV files (001.wav, 002.wav, ...)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            names = sorted(name for name in archive.namelist() if name.lower().endswith('.wav'))
+            wav_files = [archive.read(name) for name in names]
+        
+        if len(wav_files) != len(audio_queries):
+            raise ValueError(f"multi_synthesis returned {len(wav_files)} files for {len(audio_queries)} queries")
+        return wav_files
+    
+    async def synthesize_many(
+        self,
+        audio_queries: List[Dict[str, Any]],
+        speaker_id: int,
+        concurrency: int = 4
+    ) -> List[bytes]:
+        """
+        Synthesize many audio queries with as few round trips as possible
+        
+        Uses /multi_synthesis when the engine has it; otherwise (or once it
+        turned out to be missing) falls back to concurrent /synthesis calls.
+        
+        Args:
+            audio_queries: AudioQuery JSONs, all for the same speaker
+            speaker_id: Speaker style ID
+            concurrency: Parallel /synthesis calls in fallback mode
+            
+        Returns:
+            WAV file bytes per query, in input order
+        """
+        if not audio_queries:
+            return []
+        
+        if self.multi_synthesis_supported is not False:
+            try:
+                wav_files = await self.multi_synthesis(audio_queries, speaker_id)
+                self.multi_synthesis_supported = True
+                return wav_files
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405, 501):
+                    raise
+                logger.info("Engine has no /multi_synthesis, falling back to single /synthesis calls")
+                self.multi_synthesis_supported = False
+        
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def synthesize_one(audio_query: Dict[str, Any]) -> bytes:
+            async with semaphore:
+                return await self.synthesis(audio_query, speaker_id)
+        
+        return list(await asyncio.gather(*(synthesize_one(query) for query in audio_queries)))
+    
     async def tts(
         self,
         text: str,
@@ -0,0 +1,4 @@
+"""
+Gateway load-test and latency benchmarks
+Run with: python -m benchmarks --help (from backend/)
+"""
@@ -0,0 +1,122 @@
+"""
+Gateway benchmark CLI
+
+    # Real gateway code in-process, stand-in upstreams, 30 s at 16 concurrent clients
+    python -m benchmarks --concurrency 16 --duration 30 --output results/current.json
+
+    # Compare with an earlier run; exits 1 on a regression
+    python -m benchmarks --output results/current.json --baseline results/main.json
+
+    # A gateway already running (e.g. pointed at `python -m fakes` servers)
+    python -m benchmarks --target http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from loguru import logger
+
+from .harness import build_report, compare_reports, default_workloads, format_report, parse_mix, run_load, DEFAULT_SPEAKER_ID
+from .targets import in_process_gateway, remote_gateway
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Gateway load-test and latency benchmark")
+    parser.add_argument("--target", help="Gateway URL (default: the gateway app in-process with stand-in upstreams)")
+    parser.add_argument("--mix", default="preview=70,batch=10,convert=20", help="Weighted request mix")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead of a duration")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded load before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speaker-id", type=int, default=DEFAULT_SPEAKER_ID)
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.0, help="Fraction of requests repeating an earlier text")
+    parser.add_argument("--batch-lines", type=int, default=20)
+    parser.add_argument("--convert-seconds", type=float, default=3.0, help="Audio length sent to /rvc/convert")
+
+    fakes = parser.add_argument_group("in-process upstreams")
+    fakes.add_argument("--aivisspeech-instances", type=int, default=1)
+    fakes.add_argument("--rvc-instances", type=int, default=1)
+    fakes.add_argument("--upstream-concurrency", type=int, default=1, help="Requests each stand-in serves at once")
+    fakes.add_argument("--latency-scale", type=float, default=1.0, help="Multiply the stand-ins' service times")
+
+    output = parser.add_argument_group("results")
+    output.add_argument("--output", help="Write the JSON report here")
+    output.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    output.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    workloads = default_workloads(
+        speaker_id=args.speaker_id,
+        cache_hit_ratio=args.cache_hit_ratio,
+        batch_lines=args.batch_lines,
+        convert_seconds=args.convert_seconds,
+        seed=args.seed
+    )
+
+    upstreams = None
+    if args.target:
+        client = remote_gateway(args.target, max_connections=max(args.concurrency, 1))
+    else:
+        client, upstreams = in_process_gateway(
+            aivisspeech_instances=args.aivisspeech_instances,
+            rvc_instances=args.rvc_instances,
+            latency_scale=args.latency_scale,
+            upstream_concurrency=args.upstream_concurrency,
+            seed=args.seed
+        )
+
+    settings = {
+        key: value for key, value in vars(args).items()
+        if key not in ("output", "baseline", "threshold")
+    }
+    settings["mix"] = mix
+
+    async with client:
+        samples, elapsed = await run_load(
+            client,
+            workloads,
+            mix,
+            concurrency=args.concurrency,
+            duration=None if args.requests else args.duration,
+            requests=args.requests,
+            warmup=0.0 if args.requests else args.warmup,
+            seed=args.seed
+        )
+
+    report = build_report(samples, elapsed, settings)
+    if upstreams is not None:
+        report["upstreams"] = {name: [service.stats() for service in services] for name, services in upstreams.items()}
+
+    changes = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            changes = compare_reports(report, json.load(f), threshold=args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "changes": changes}
+
+    print(format_report(report, changes))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    return 1 if changes and any(change["regression"] for change in changes) else 0
+
+
+def main() -> None:
+    args = parse_args()
+    # Per-request gateway logs would dominate the run
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Gateway load generator
+Closed-loop workers replay a weighted request mix against the gateway and
+record per-endpoint latency; results are plain JSON so runs can be diffed
+"""
+import asyncio
+import base64
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, "gateway"))
+
+from fakes.service import wav_bytes
+from health import percentile
+
+# Default style id (present in the fake engine)
+DEFAULT_SPEAKER_ID = 888753760
+
+# Error rate increase (absolute) tolerated before a comparison flags a regression
+ERROR_RATE_TOLERANCE = 0.01
+
+SENTENCES = [
+    "今日はとても良い天気ですね。",
+    "次の駅で電車を降りてください。",
+    "この物語は、小さな町に住む一人の少女から始まります。",
+    "彼女は毎朝、誰よりも早く起きて海を見に行きました。",
+    "それでは、今日の講義を始めましょう。",
+    "風が強くなってきたので、窓を閉めておきます。"
+]
+
+
+class Workload:
+    """
+    One kind of request in the mix
+
+    build() returns (method, path, keyword arguments for httpx) for the
+    i-th request of this kind; `endpoint` is the key results are grouped by.
+    """
+
+    def __init__(self, name: str, endpoint: str, build: Callable[[int], Tuple[str, str, Dict[str, Any]]]):
+        self.name = name
+        self.endpoint = endpoint
+        self.build = build
+
+
+def _text(rng: random.Random, sentences: int, unique: bool, i: int) -> str:
+    text = "".join(rng.choice(SENTENCES) for _ in range(sentences))
+    # A numbered suffix defeats the gateway caches, so every request reaches the upstream
+    return f"{text}（{i}）" if unique else text
+
+
+def default_workloads(
+    speaker_id: int = DEFAULT_SPEAKER_ID,
+    cache_hit_ratio: float = 0.0,
+    batch_lines: int = 20,
+    convert_seconds: float = 3.0,
+    seed: int = 0
+) -> Dict[str, Workload]:
+    """
+    preview: one short sentence to /tts/synthesize (raw WAV)
+    batch: `batch_lines` sentences to /tts/synthesize_batch
+    convert: `convert_seconds` of audio to /rvc/convert (raw WAV)
+    """
+    rng = random.Random(seed)
+    audio_base64 = base64.b64encode(wav_bytes(convert_seconds)).decode('utf-8')
+
+    def unique() -> bool:
+        return rng.random() >= cache_hit_ratio
+
+    def preview(i: int):
+        return "POST", "/tts/synthesize", {
+            "json": {"text": _text(rng, 1, unique(), i), "speaker_id": speaker_id},
+            "headers": {"Accept": "audio/wav"}
+        }
+
+    def batch(i: int):
+        keep = unique()
+        return "POST", "/tts/synthesize_batch", {
+            "json": {
+                "texts": [_text(rng, 2, keep, i * batch_lines + line) for line in range(batch_lines)],
+                "speaker_id": speaker_id
+            }
+        }
+
+    def convert(i: int):
+        return "POST", "/rvc/convert", {
+            "json": {"audio_base64": audio_base64, "model_name": "leo_model.pth"},
+            "headers": {"Accept": "audio/wav"}
+        }
+
+    return {
+        "preview": Workload("preview", "POST /tts/synthesize", preview),
+        "batch": Workload("batch", "POST /tts/synthesize_batch", batch),
+        "convert": Workload("convert", "POST /rvc/convert", convert)
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    "preview=70,batch=10,convert=20" -> weights
+
+    Raises:
+        ValueError: Malformed spec or non-positive total weight
+    """
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    if sum(weights.values()) <= 0:
+        raise ValueError(f"Request mix has no weight: {spec!r}")
+    return weights
+
+
+def summarize(samples: List[Tuple[float, int, int]], elapsed: float) -> Dict[str, Any]:
+    """
+    Statistics of (latency seconds, status code, response bytes) samples
+
+    Latency percentiles cover successful (2xx) requests only; errors are
+    counted separately so a fast-failing server does not look fast.
+    """
+    ok = sorted(latency for latency, status, _ in samples if 200 <= status < 300)
+    errors = len(samples) - len(ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+        "bytes_per_second": round(sum(size for _, status, size in samples if 200 <= status < 300) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ok) / len(ok) * 1000, 2) if ok else 0.0,
+            "p50": round(percentile(ok, 50) * 1000, 2),
+            "p95": round(percentile(ok, 95) * 1000, 2),
+            "p99": round(percentile(ok, 99) * 1000, 2),
+            "max": round(ok[-1] * 1000, 2) if ok else 0.0
+        },
+        "status_codes": {str(code): sum(1 for _, status, _ in samples if status == code) for code in sorted({s for _, s, _ in samples})}
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    workloads: Dict[str, Workload],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: Optional[float] = None,
+    requests: Optional[int] = None,
+    warmup: float = 0.0,
+    seed: int = 0
+) -> Tuple[Dict[str, List[Tuple[float, int, int]]], float]:
+    """
+    Drive `concurrency` closed-loop workers until `duration` seconds or
+    `requests` requests (whichever is set); requests started during the
+    first `warmup` seconds are not recorded
+
+    Returns:
+        (samples per endpoint, measured seconds)
+
+    Raises:
+        KeyError: The mix names an unknown workload
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    for name in names:
+        if name not in workloads:
+            raise KeyError(f"Unknown workload {name!r} (available: {', '.join(workloads)})")
+
+    rng = random.Random(seed)
+    samples: Dict[str, List[Tuple[float, int, int]]] = {workloads[name].endpoint: [] for name in names}
+    counters = {name: 0 for name in names}
+    issued = 0
+
+    start_time = time.perf_counter()
+    measure_from = start_time + warmup
+    deadline = measure_from + duration if duration is not None else None
+
+    async def worker() -> None:
+        nonlocal issued
+        while True:
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                return
+            if requests is not None and issued >= requests:
+                return
+            issued += 1
+
+            workload = workloads[rng.choices(names, weights)[0]]
+            method, path, kwargs = workload.build(counters[workload.name])
+            counters[workload.name] += 1
+
+            sent_at = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status, size = response.status_code, len(response.content)
+            except httpx.HTTPError:
+                status, size = 0, 0  # Transport failure
+            if sent_at >= measure_from:
+                samples[workload.endpoint].append((time.perf_counter() - sent_at, status, size))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, max(time.perf_counter() - measure_from, 1e-9)
+
+
+def build_report(
+    samples: Dict[str, List[Tuple[float, int, int]]],
+    elapsed: float,
+    settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Assemble the JSON result document"""
+    everything = [sample for endpoint_samples in samples.values() for sample in endpoint_samples]
+    return {
+        "version": 1,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "settings": settings,
+        "duration_seconds": round(elapsed, 3),
+        "overall": summarize(everything, elapsed),
+        "endpoints": {endpoint: summarize(endpoint_samples, elapsed) for endpoint, endpoint_samples in samples.items()}
+    }
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Per-endpoint changes against a previous run
+
+    A change is a regression when p50/p95/p99 latency rises, or throughput
+    falls, by more than `threshold` (fraction), or the error rate rises by
+    more than ERROR_RATE_TOLERANCE.
+
+    Returns:
+        One entry per compared metric, with "regression": bool
+    """
+    changes = []
+    for endpoint, stats in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if base is None:
+            continue
+
+        metrics = [(f"latency_ms.{pct}", base["latency_ms"][pct], stats["latency_ms"][pct], True) for pct in ("p50", "p95", "p99")]
+        metrics.append(("throughput_rps", base["throughput_rps"], stats["throughput_rps"], False))
+        for metric, before, after, higher_is_worse in metrics:
+            change = (after - before) / before if before else 0.0
+            worse = change if higher_is_worse else -change
+            changes.append({
+                "endpoint": endpoint,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": worse > threshold
+            })
+
+        error_delta = stats["error_rate"] - base["error_rate"]
+        changes.append({
+            "endpoint": endpoint,
+            "metric": "error_rate",
+            "baseline": base["error_rate"],
+            "current": stats["error_rate"],
+            "change": round(error_delta, 4),
+            "regression": error_delta > ERROR_RATE_TOLERANCE
+        })
+    return changes
+
+
+def format_report(report: Dict[str, Any], changes: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Human-readable summary table"""
+    lines = [
+        f"{'endpoint':<30} {'reqs':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    ]
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for endpoint, stats in rows:
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{endpoint:<30} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8.2f} "
+            f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f}"
+        )
+    if changes:
+        lines.append("")
+        lines.append("vs baseline:")
+        for change in changes:
+            marker = "REGRESSION" if change["regression"] else ""
+            lines.append(
+                f"  {change['endpoint']:<30} {change['metric']:<16} {change['baseline']:>10} -> "
+                f"{change['current']:<10} ({change['change'] * 100:+.1f}%) {marker}".rstrip()
+            )
+    return "\n".join(lines)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
@@ -0,0 +1,87 @@
+"""
+Benchmark targets
+The real gateway app in-process with stand-in upstreams, or any running gateway over HTTP
+"""
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from . import harness  # noqa: F401  (puts backend/ and backend/gateway/ on sys.path)
+from fakes import FakeService, create_aivisspeech_app, create_rvc_app
+from fakes import aivisspeech as fake_aivisspeech, rvc as fake_rvc
+
+
+def _scale(service: FakeService, latency_scale: float) -> FakeService:
+    service.configure({
+        "latency": {
+            route: {"base": model.base * latency_scale, "per_unit": model.per_unit * latency_scale}
+            for route, model in service.latency.items()
+        }
+    })
+    return service
+
+
+def in_process_gateway(
+    aivisspeech_instances: int = 1,
+    rvc_instances: int = 1,
+    latency_scale: float = 1.0,
+    upstream_concurrency: int = 1,
+    seed: Optional[int] = None
+) -> Tuple[httpx.AsyncClient, Dict[str, List[FakeService]]]:
+    """
+    The gateway app in real-services mode, its upstream pools pointed at
+    stand-in services through httpx.ASGITransport
+
+    Everything between the gateway route and the upstream HTTP call runs
+    as in production (caches, singleflight, pools, breakers, timeouts).
+    The ASGI transport has no connection pool, so AIVISSPEECH_MAX_CONNECTIONS
+    only applies when benchmarking against servers (see remote_gateway).
+
+    Returns:
+        (client for the gateway, fake services by name for inspection)
+    """
+    from config import Config
+    import main
+    from routers import rvc, tts
+
+    services: Dict[str, List[FakeService]] = {"aivisspeech": [], "rvc": []}
+    apps = {}
+    for name, module, create_app, count in (
+        ("aivisspeech", fake_aivisspeech, create_aivisspeech_app, aivisspeech_instances),
+        ("rvc", fake_rvc, create_rvc_app, rvc_instances)
+    ):
+        for i in range(count):
+            service = _scale(module.default_service(seed=None if seed is None else seed + i), latency_scale)
+            service.configure({"concurrency": upstream_concurrency})
+            services[name].append(service)
+            apps[f"http://{name}-{i}"] = create_app(service)
+
+    def fake_client(timeout: float):
+        def create(url: str) -> httpx.AsyncClient:
+            return httpx.AsyncClient(base_url=url, timeout=timeout, transport=httpx.ASGITransport(app=apps[url]))
+        return create
+
+    Config.ENABLE_REAL_SERVICES = True
+    Config.AIVISSPEECH_URLS = ",".join(url for url in apps if url.startswith("http://aivisspeech-"))
+    Config.RVC_URLS = ",".join(url for url in apps if url.startswith("http://rvc-"))
+    tts._create_aivisspeech_http_client = fake_client(30.0)
+    rvc._create_rvc_http_client = fake_client(120.0)
+    tts.aivisspeech_client = None
+    tts.aivisspeech_engine = None
+    rvc.rvc_client = None
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://gateway",
+        timeout=300.0
+    )
+    return client, services
+
+
+def remote_gateway(url: str, max_connections: int = 100) -> httpx.AsyncClient:
+    """Client for a gateway already running at url"""
+    return httpx.AsyncClient(
+        base_url=url,
+        timeout=300.0,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
@@ -0,0 +1,16 @@
+"""
+Local stand-ins for AivisSpeech and RVC
+In-process: httpx.AsyncClient(transport=httpx.ASGITransport(app=create_aivisspeech_app()))
+As servers: python -m fakes aivisspeech --port 10101 / python -m fakes rvc --port 10102
+"""
+from .service import FakeService, FaultInjector, LatencyModel
+from .aivisspeech import create_app as create_aivisspeech_app
+from .rvc import create_app as create_rvc_app
+
+__all__ = [
+    "FakeService",
+    "FaultInjector",
+    "LatencyModel",
+    "create_aivisspeech_app",
+    "create_rvc_app"
+]
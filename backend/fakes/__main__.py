@@ -0,0 +1,62 @@
+"""
+Run a stand-in service as a local HTTP server
+
+    python -m fakes aivisspeech --port 10101
+    python -m fakes rvc --port 10102 --latency-scale 0.5 --error-rate 0.02
+
+Point the gateway at it with AIVISSPEECH_URLS / RVC_URLS. Latency and
+faults can be changed while it runs with PUT /_fake.
+"""
+import argparse
+
+import uvicorn
+
+from . import aivisspeech, rvc
+from .service import FaultInjector, LatencyModel
+
+SERVICES = {
+    "aivisspeech": (aivisspeech, 10101),
+    "rvc": (rvc, 10102)
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake AivisSpeech or RVC service")
+    parser.add_argument("service", choices=sorted(SERVICES))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Default: 10101 (aivisspeech), 10102 (rvc)")
+    parser.add_argument("--seed", type=int, help="Seed for latency draws and fault injection")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests served at once (GPU slots)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every route's latency")
+    parser.add_argument("--distribution", choices=LatencyModel.DISTRIBUTIONS, help="Override the latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that stall first")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    module, default_port = SERVICES[args.service]
+    service = module.default_service(seed=args.seed)
+    service.configure({
+        "latency": {
+            route: {
+                "base": model.base * args.latency_scale,
+                "per_unit": model.per_unit * args.latency_scale,
+                "distribution": args.distribution or model.distribution
+            }
+            for route, model in service.latency.items()
+        },
+        "concurrency": args.concurrency
+    })
+    service.faults = FaultInjector(
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds
+    )
+
+    uvicorn.run(module.create_app(service), host=args.host, port=args.port or default_port)
+
+
+if __name__ == "__main__":
+    main()
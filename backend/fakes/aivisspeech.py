@@ -0,0 +1,134 @@
+"""
+Stand-in AivisSpeech Engine
+VOICEVOX-compatible /speakers, /audio_query, /synthesis and /multi_synthesis
+with per-character costs; audio length follows text length and speedScale
+"""
+import io
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import Response
+
+from .service import FakeService, FaultInjector, LatencyModel, add_control_routes, wav_bytes
+
+# Spoken length of one character of Japanese text at speedScale 1.0
+SECONDS_PER_CHAR = 0.12
+
+SPEAKERS: List[Dict[str, Any]] = [
+    {
+        "name": "Fake Anneli",
+        "speaker_uuid": "00000000-0000-0000-0000-000000000001",
+        "styles": [
+            {"name": "ノーマル", "id": 888753760, "type": "talk"},
+            {"name": "通常", "id": 888753761, "type": "talk"}
+        ],
+        "version": "1.0.0"
+    },
+    {
+        "name": "Fake Mio",
+        "speaker_uuid": "00000000-0000-0000-0000-000000000002",
+        "styles": [
+            {"name": "ノーマル", "id": 0, "type": "talk"},
+            {"name": "ささやき", "id": 5, "type": "talk"}
+        ],
+        "version": "1.0.0"
+    }
+]
+
+STYLE_IDS = {style["id"] for speaker in SPEAKERS for style in speaker["styles"]}
+
+
+def default_service(seed: Optional[int] = None) -> FakeService:
+    """
+    Latency roughly like a single-GPU engine: /audio_query is cheap text
+    analysis, /synthesis costs about 4 ms per character
+    """
+    return FakeService(
+        "aivisspeech",
+        latency={
+            "/audio_query": LatencyModel(base=0.005, per_unit=0.0005),
+            "/synthesis": LatencyModel(base=0.03, per_unit=0.004),
+            # One engine call for the whole group: the fixed cost is paid once
+            "/multi_synthesis": LatencyModel(base=0.03, per_unit=0.004)
+        },
+        faults=FaultInjector(),
+        concurrency=1,
+        seed=seed
+    )
+
+
+def _check_style(speaker: int) -> None:
+    if speaker not in STYLE_IDS:
+        raise HTTPException(status_code=422, detail=f"Style ID not found: {speaker}")
+
+
+def _render(audio_query: Dict[str, Any]) -> bytes:
+    chars = len(audio_query.get("kana") or "")
+    seconds = chars * SECONDS_PER_CHAR / max(float(audio_query.get("speedScale") or 1.0), 0.1)
+    return wav_bytes(
+        seconds,
+        sample_rate=int(audio_query.get("outputSamplingRate") or 44100),
+        channels=2 if audio_query.get("outputStereo") else 1
+    )
+
+
+def create_app(service: Optional[FakeService] = None) -> FastAPI:
+    """
+    Build the fake engine app
+
+    Args:
+        service: Latency/fault configuration (default_service() if omitted)
+    """
+    service = service or default_service()
+    app = FastAPI(title="Fake AivisSpeech Engine", version="fake")
+    app.state.fake = service
+    add_control_routes(app, service)
+
+    @app.get("/version")
+    async def version():
+        return "fake"
+
+    @app.get("/speakers")
+    async def speakers():
+        await service.serve("/speakers")
+        return SPEAKERS
+
+    @app.post("/audio_query")
+    async def audio_query(text: str = Query(...), speaker: int = Query(...)):
+        _check_style(speaker)
+        await service.serve("/audio_query", len(text))
+        return {
+            "accent_phrases": [],
+            "speedScale": 1.0,
+            "intonationScale": 1.0,
+            "tempoDynamicsScale": 1.0,
+            "pitchScale": 0.0,
+            "volumeScale": 1.0,
+            "prePhonemeLength": 0.1,
+            "postPhonemeLength": 0.1,
+            "pauseLength": None,
+            "pauseLengthScale": 1.0,
+            "outputSamplingRate": 44100,
+            "outputStereo": False,
+            "kana": text
+        }
+
+    @app.post("/synthesis")
+    async def synthesis(audio_query: Dict[str, Any], speaker: int = Query(...)):
+        _check_style(speaker)
+        await service.serve("/synthesis", len(audio_query.get("kana") or ""))
+        return Response(content=_render(audio_query), media_type="audio/wav")
+
+    @app.post("/multi_synthesis")
+    async def multi_synthesis(audio_queries: List[Dict[str, Any]], speaker: int = Query(...)):
+        _check_style(speaker)
+        await service.serve("/multi_synthesis", sum(len(query.get("kana") or "") for query in audio_queries))
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            for i, query in enumerate(audio_queries):
+                archive.writestr(f"{i + 1:03d}.wav", _render(query))
+        return Response(content=buffer.getvalue(), media_type="application/zip")
+
+    return app
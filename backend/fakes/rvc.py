@@ -0,0 +1,191 @@
+"""
+Stand-in RVC service
+/convert, /convert/stream, /separate, /models and /health with
+per-second-of-audio costs; conversion echoes the input audio, separation
+returns it as both stems
+"""
+import base64
+import json
+import struct
+import wave
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from .service import FakeService, FaultInjector, LatencyModel, add_control_routes, read_wav_pcm, wav_seconds
+
+MODELS = ["leo_model.pth", "default_model.pth"]
+
+# Models kept resident at once (the real server bounds its cache by memory)
+MODEL_SLOTS = 3
+
+# RIFF/data size of a streamed WAV, whose length is unknown up front
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def default_service(seed: Optional[int] = None) -> FakeService:
+    """
+    Latency roughly like RVC on one GPU: conversion about 0.3 s per second
+    of audio, Demucs separation about 0.5 s per second, model loads ~1.5 s
+    """
+    return FakeService(
+        "rvc",
+        latency={
+            "/convert": LatencyModel(base=0.05, per_unit=0.3),
+            "/separate": LatencyModel(base=0.2, per_unit=0.5),
+            "/models/load": LatencyModel(base=1.5, spread=0.1)
+        },
+        faults=FaultInjector(),
+        concurrency=1,
+        seed=seed
+    )
+
+
+def _decode_audio(audio_base64: str) -> bytes:
+    try:
+        return base64.b64decode(audio_base64)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid audio_base64")
+
+
+def _stream_header(sample_rate: int, channels: int, sample_width: int) -> bytes:
+    # Same layout as the real server's streamed header: sizes unknown
+    block_align = channels * sample_width
+    return (
+        b'RIFF' + struct.pack('<I', UNKNOWN_SIZE) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8)
+        + b'data' + struct.pack('<I', UNKNOWN_SIZE)
+    )
+
+
+def create_app(service: Optional[FakeService] = None) -> FastAPI:
+    """
+    Build the fake RVC app
+
+    Args:
+        service: Latency/fault configuration (default_service() if omitted)
+    """
+    service = service or default_service()
+    app = FastAPI(title="Fake MioVo RVC Service", version="fake")
+    app.state.fake = service
+    app.state.current_model = None
+    app.state.resident = OrderedDict()
+    add_control_routes(app, service)
+    
+    async def use_model(model_name: str) -> None:
+        # Only a model that is not resident costs a load, like the real server's LRU cache
+        if model_name in app.state.resident:
+            app.state.resident.move_to_end(model_name)
+        else:
+            await service.serve("/models/load")
+            app.state.resident[model_name] = True
+            while len(app.state.resident) > MODEL_SLOTS:
+                app.state.resident.popitem(last=False)
+        app.state.current_model = model_name
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "healthy",
+            "service": "miovo-rvc",
+            "version": "fake",
+            "rvc_loaded": app.state.current_model is not None,
+            "current_model": app.state.current_model,
+            "gpu_available": True,
+            "models_loaded": len(app.state.resident)
+        }
+
+    @app.get("/models")
+    async def models():
+        return {"models": MODELS, "count": len(MODELS)}
+
+    @app.post("/models/{model_name}")
+    async def load_model(model_name: str):
+        if model_name not in MODELS:
+            raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
+        cached = model_name in app.state.resident
+        await use_model(model_name)
+        return {"status": "loaded", "model": model_name, "cached": cached, "cache_size": len(app.state.resident)}
+
+    @app.post("/convert")
+    async def convert(body: Dict[str, Any], request: Request, response: Response):
+        audio_bytes = _decode_audio(body.get("audio_base64") or "")
+        model_name = body.get("model_name")
+        if model_name not in MODELS:
+            raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
+
+        await use_model(model_name)
+        processing_time = await service.serve("/convert", wav_seconds(audio_bytes))
+        params = {key: body[key] for key in ("f0method", "protect", "index_rate", "filter_radius") if key in body}
+        # Stage timing like the real server reports it
+        server_timing = f"inference;dur={processing_time * 1000:.1f}"
+
+        if "audio/wav" in request.headers.get("accept", ""):
+            return Response(
+                content=audio_bytes,
+                media_type="audio/wav",
+                headers={
+                    "X-Model": model_name,
+                    "X-Params-Used": json.dumps(params, separators=(',', ':')),
+                    "X-Processing-Time": str(round(processing_time, 3)),
+                    "Server-Timing": server_timing
+                }
+            )
+        response.headers["Server-Timing"] = server_timing
+        return {
+            "status": "converted",
+            "audio_base64": body["audio_base64"],
+            "model": model_name,
+            "params_used": params,
+            "processing_time": round(processing_time, 3)
+        }
+
+    @app.post("/convert/stream")
+    async def convert_stream(body: Dict[str, Any]):
+        audio_bytes = _decode_audio(body.get("audio_base64") or "")
+        model_name = body.get("model_name")
+        if model_name not in MODELS:
+            raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
+
+        try:
+            channels, sample_width, sample_rate, pcm = read_wav_pcm(audio_bytes)
+        except (wave.Error, EOFError) as e:
+            raise HTTPException(status_code=400, detail=f"Cannot decode audio: {e}")
+
+        await use_model(model_name)
+        block_align = channels * sample_width
+        seconds = len(pcm) / block_align / sample_rate
+        segment_seconds = float(body.get("segment_seconds") or 20.0)
+        segments = max(1, int(seconds // segment_seconds))
+        # Echo the input, one segment's worth of whole frames per simulated segment conversion
+        step = max(-(-len(pcm) // block_align // segments), 1) * block_align
+
+        async def segments_body():
+            yield _stream_header(sample_rate, channels, sample_width)
+            for start in range(0, len(pcm), step):
+                await service.serve("/convert", seconds / segments)
+                yield pcm[start:start + step]
+
+        return StreamingResponse(
+            segments_body(),
+            media_type="audio/wav",
+            headers={"X-Model": model_name, "X-Segments": str(segments)}
+        )
+
+    @app.post("/separate")
+    async def separate(body: Dict[str, Any], response: Response):
+        audio_bytes = _decode_audio(body.get("audio_base64") or "")
+        processing_time = await service.serve("/separate", wav_seconds(audio_bytes))
+        # Same fields as the real server: stage timings, no processing_time
+        response.headers["Server-Timing"] = f"separation;dur={processing_time * 1000:.1f}"
+        return {
+            "status": "separated",
+            "vocals_base64": body["audio_base64"],
+            "accompaniment_base64": body["audio_base64"],
+            "model": body.get("model", "htdemucs"),
+            "timings": {"separation": round(processing_time * 1000, 1)}
+        }
+
+    return app
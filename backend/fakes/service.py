@@ -0,0 +1,281 @@
+"""
+Shared machinery for the stand-in services
+Latency models, fault injection, a concurrency gate and runtime control routes
+"""
+import asyncio
+import io
+import math
+import random
+import wave
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+# Route prefix for the control endpoints (never delayed or failed)
+CONTROL_PREFIX = "/_fake"
+
+
+class LatencyModel:
+    """
+    Service time of one request
+
+        seconds = (base + per_unit * units) * draw
+
+    `units` is the cost driver of the route (characters of text, seconds of
+    audio). `draw` has mean 1 and comes from `distribution`:
+
+    - fixed: always 1
+    - uniform: 1 ± spread
+    - lognormal: right-skewed with shape `spread` (a realistic long tail)
+    - exponential: memoryless, heavy tail
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+    def __init__(self, base: float = 0.0, per_unit: float = 0.0, distribution: str = "lognormal", spread: float = 0.25):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.base = base
+        self.per_unit = per_unit
+        self.distribution = distribution
+        self.spread = spread
+
+    def sample(self, units: float, rng: random.Random) -> float:
+        mean = self.base + self.per_unit * max(units, 0.0)
+        if self.distribution == "uniform":
+            draw = rng.uniform(max(1.0 - self.spread, 0.0), 1.0 + self.spread)
+        elif self.distribution == "lognormal":
+            draw = rng.lognormvariate(-self.spread ** 2 / 2, self.spread) if self.spread > 0 else 1.0
+        elif self.distribution == "exponential":
+            draw = rng.expovariate(1.0)
+        else:
+            draw = 1.0
+        return mean * draw
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base": self.base,
+            "per_unit": self.per_unit,
+            "distribution": self.distribution,
+            "spread": self.spread
+        }
+
+
+class FaultInjector:
+    """
+    Failures injected before a request is served
+
+    - error_rate: fraction of requests answered with `error_status`
+    - hang_rate: fraction of requests that stall for `hang_seconds` first
+      (exercises client timeouts; needs a real server, the in-process ASGI
+      transport does not enforce timeouts)
+    - down: every route except the control routes answers 503, health
+      checks included
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        down: bool = False
+    ):
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.down = down
+
+    def pick(self, rng: random.Random) -> Optional[str]:
+        """"error", "hang" or None for this request"""
+        roll = rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.hang_rate:
+            return "hang"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error_rate": self.error_rate,
+            "error_status": self.error_status,
+            "hang_rate": self.hang_rate,
+            "hang_seconds": self.hang_seconds,
+            "down": self.down
+        }
+
+
+class FakeService:
+    """
+    Runtime state of one stand-in service
+
+    Work routes call `await service.serve(route, units)`, which applies the
+    injected faults, waits for one of `concurrency` slots (an engine with a
+    single GPU serves one request at a time) and sleeps for the sampled
+    service time. Queueing delay therefore grows with load like it does on
+    the real engines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: Dict[str, LatencyModel],
+        faults: Optional[FaultInjector] = None,
+        concurrency: int = 1,
+        seed: Optional[int] = None
+    ):
+        self.name = name
+        self.latency = latency
+        self.faults = faults or FaultInjector()
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self._slots = asyncio.Semaphore(concurrency)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.busy_seconds = 0.0
+
+    async def serve(self, route: str, units: float = 1.0) -> float:
+        """
+        Simulate the work of one request
+
+        Returns:
+            Simulated processing time in seconds
+
+        Raises:
+            HTTPException: Injected error
+        """
+        self.requests[route] = self.requests.get(route, 0) + 1
+        fault = self.faults.pick(self.rng)
+        if fault == "error":
+            self.errors[route] = self.errors.get(route, 0) + 1
+            raise HTTPException(status_code=self.faults.error_status, detail=f"Injected {self.name} failure")
+        if fault == "hang":
+            await asyncio.sleep(self.faults.hang_seconds)
+
+        model = self.latency.get(route)
+        slots = self._slots  # configure() may swap the semaphore meanwhile
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            seconds = model.sample(units, self.rng) if model is not None else 0.0
+            await asyncio.sleep(seconds)
+            self.busy_seconds += seconds
+            return seconds
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    def configure(self, body: Dict[str, Any]) -> None:
+        """
+        Apply a partial update, e.g.
+        {"latency": {"/synthesis": {"per_unit": 0.01}}, "faults": {"error_rate": 0.1}, "concurrency": 2}
+
+        Raises:
+            ValueError: Unknown route, field or distribution
+        """
+        for route, fields in (body.get("latency") or {}).items():
+            current = self.latency.get(route)
+            if current is None:
+                raise ValueError(f"Unknown route: {route}")
+            self.latency[route] = LatencyModel(**{**current.to_dict(), **fields})
+        if body.get("faults"):
+            self.faults = FaultInjector(**{**self.faults.to_dict(), **body["faults"]})
+        if body.get("concurrency"):
+            self.concurrency = int(body["concurrency"])
+            self._slots = asyncio.Semaphore(self.concurrency)
+        if "seed" in body:
+            self.rng.seed(body["seed"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "service": self.name,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "latency": {route: model.to_dict() for route, model in self.latency.items()},
+            "faults": self.faults.to_dict()
+        }
+
+
+def add_control_routes(app: FastAPI, service: FakeService) -> None:
+    """
+    GET/PUT /_fake to inspect and reconfigure the service while it runs,
+    plus the middleware that makes every other route answer 503 while down
+    """
+
+    @app.middleware("http")
+    async def outage(request: Request, call_next):
+        if service.faults.down and not request.url.path.startswith(CONTROL_PREFIX):
+            return JSONResponse(status_code=503, content={"detail": f"{service.name} is down (injected)"})
+        return await call_next(request)
+
+    @app.get(CONTROL_PREFIX)
+    async def get_fake_state():
+        return service.stats()
+
+    @app.put(CONTROL_PREFIX)
+    async def configure_fake(body: Dict[str, Any]):
+        try:
+            service.configure(body)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return service.stats()
+
+
+def wav_bytes(seconds: float, sample_rate: int = 44100, channels: int = 1, frequency: float = 220.0) -> bytes:
+    """16-bit WAV of a quiet sine tone (not silence, so level checks downstream see signal)"""
+    num_frames = max(int(seconds * sample_rate), 0)
+    step = 2 * math.pi * frequency / sample_rate
+    # One period, repeated: cheap even for minutes of audio
+    period = max(int(round(sample_rate / frequency)), 1)
+    cycle = b''.join(
+        int(1000 * math.sin(step * i)).to_bytes(2, 'little', signed=True) * channels
+        for i in range(period)
+    )
+    frames = (cycle * (num_frames // period + 1))[:num_frames * 2 * channels]
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frames)
+    return buffer.getvalue()
+
+
+def read_wav_pcm(data: bytes) -> Tuple[int, int, int, bytes]:
+    """
+    Format and PCM frames of a WAV file, wherever its data chunk sits (LIST
+    and other chunks are skipped)
+
+    Returns:
+        (channels, sample width in bytes, sample rate, frames)
+
+    Raises:
+        wave.Error, EOFError: Not a PCM WAV file
+    """
+    with wave.open(io.BytesIO(data), 'rb') as wav_file:
+        frames = wav_file.readframes(wav_file.getnframes())
+        return wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate(), frames
+
+
+def wav_seconds(data: bytes) -> float:
+    """Duration of a WAV file (0 if it cannot be parsed)"""
+    try:
+        with wave.open(io.BytesIO(data), 'rb') as wav_file:
+            return wav_file.getnframes() / wav_file.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
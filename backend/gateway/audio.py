@@ -0,0 +1,321 @@
+"""
+WAV assembly for MioVo Gateway
+Parses headers in place, converts mismatched inputs with NumPy and streams the
+joined PCM as memoryview slices, so joining lines never holds more than the
+output plus one converted line
+"""
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# RIFF/data size written when the length is unknown (streaming)
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class WavFormatError(ValueError):
+    """Raised for data that is not a WAV this module can decode"""
+
+
+class WavFormat(NamedTuple):
+    sample_rate: int
+    channels: int
+    sample_width: int  # Bytes per sample
+    is_float: bool = False
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.sample_width
+
+    def describe(self) -> str:
+        return f"{self.sample_rate}Hz/{self.channels}ch/{self.sample_width * 8}bit{' float' if self.is_float else ''}"
+
+
+def parse_wav(data: BytesLike) -> Tuple[WavFormat, memoryview]:
+    """
+    Read the format of a WAV file and locate its PCM frames without copying
+
+    Chunks other than "fmt " and "data" (LIST, fact, ...) are skipped. A data
+    size of 0xFFFFFFFF (streamed WAV) means "until the end of the file".
+
+    Returns:
+        (format, memoryview over the whole frames of the data chunk)
+
+    Raises:
+        WavFormatError: Not a RIFF/WAVE file, or an unsupported encoding
+    """
+    view = memoryview(data).cast('B')
+    if len(view) < 12 or view[0:4] != b'RIFF' or view[8:12] != b'WAVE':
+        raise WavFormatError("Not a RIFF/WAVE file")
+
+    fmt: Optional[WavFormat] = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = view[offset:offset + 4].tobytes()
+        size = struct.unpack_from('<I', view, offset + 4)[0]
+        body = offset + 8
+
+        if chunk_id == b'fmt ':
+            if size < 16 or body + 16 > len(view):
+                raise WavFormatError("Truncated fmt chunk")
+            tag, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', view, body)
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                tag = struct.unpack_from('<H', view, body + 24)[0]
+            if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or channels < 1 or sample_rate < 1:
+                raise WavFormatError(f"Unsupported WAV encoding (format tag {tag:#06x})")
+            is_float = tag == WAVE_FORMAT_IEEE_FLOAT
+            if (is_float and bits != 32) or (not is_float and bits not in (8, 16, 24, 32)):
+                raise WavFormatError(f"Unsupported sample size: {bits} bit")
+            fmt = WavFormat(sample_rate, channels, bits // 8, is_float)
+
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise WavFormatError("data chunk before fmt chunk")
+            end = len(view) if size == UNKNOWN_SIZE else min(body + size, len(view))
+            end -= (end - body) % fmt.block_align  # Drop a trailing partial frame
+            return fmt, view[body:end]
+
+        offset = body + size + (size & 1)  # Chunks are word aligned
+
+    raise WavFormatError("No data chunk")
+
+
+def wav_header(fmt: WavFormat, num_frames: Optional[int] = None) -> bytes:
+    """
+    Canonical 44-byte WAV header
+
+    Without num_frames the RIFF and data sizes are set to 0xFFFFFFFF, which
+    players and ffmpeg treat as "read until end of stream".
+    """
+    if num_frames is None:
+        riff_size = data_size = UNKNOWN_SIZE
+    else:
+        data_size = num_frames * fmt.block_align
+        riff_size = 36 + data_size
+    tag = WAVE_FORMAT_IEEE_FLOAT if fmt.is_float else WAVE_FORMAT_PCM
+    return (
+        b'RIFF' + struct.pack('<I', riff_size) + b'WAVE'
+        + b'fmt ' + struct.pack(
+            '<IHHIIHH', 16, tag, fmt.channels, fmt.sample_rate,
+            fmt.sample_rate * fmt.block_align, fmt.block_align, fmt.sample_width * 8
+        )
+        + b'data' + struct.pack('<I', data_size)
+    )
+
+
+def converted_frames(num_frames: int, src: WavFormat, dst: WavFormat) -> int:
+    """Frame count of num_frames after conversion from src to dst"""
+    if src.sample_rate == dst.sample_rate:
+        return num_frames
+    return int(round(num_frames * dst.sample_rate / src.sample_rate))
+
+
+def decode_pcm(pcm: BytesLike, fmt: WavFormat) -> np.ndarray:
+    """PCM bytes to float32 samples in [-1, 1], shaped (frames, channels)"""
+    if fmt.is_float:
+        samples = np.frombuffer(pcm, dtype='<f4').astype(np.float32)
+    elif fmt.sample_width == 1:
+        samples = (np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif fmt.sample_width == 2:
+        samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    elif fmt.sample_width == 3:
+        raw = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        packed = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = (np.where(packed >= 1 << 23, packed - (1 << 24), packed) / float(1 << 23)).astype(np.float32)
+    else:
+        samples = (np.frombuffer(pcm, dtype='<i4').astype(np.float64) / 2147483648.0).astype(np.float32)
+    return samples.reshape(-1, fmt.channels)
+
+
+def encode_pcm(samples: np.ndarray, fmt: WavFormat) -> bytes:
+    """float32 samples shaped (frames, channels) to PCM bytes in fmt"""
+    if fmt.is_float:
+        return samples.astype('<f4').tobytes()
+    clipped = np.clip(samples, -1.0, 1.0)
+    if fmt.sample_width == 1:
+        return np.round(clipped * 127.0 + 128.0).astype(np.uint8).tobytes()
+    if fmt.sample_width == 2:
+        return np.round(clipped * 32767.0).astype('<i2').tobytes()
+    if fmt.sample_width == 3:
+        packed = np.round(clipped * 8388607.0).astype(np.int32).reshape(-1)
+        out = np.empty((packed.size, 3), dtype=np.uint8)
+        out[:, 0] = packed & 0xFF
+        out[:, 1] = (packed >> 8) & 0xFF
+        out[:, 2] = (packed >> 16) & 0xFF
+        return out.tobytes()
+    return np.round(clipped.astype(np.float64) * 2147483647.0).astype('<i4').tobytes()
+
+
+def convert_pcm(pcm: memoryview, src: WavFormat, dst: WavFormat) -> BytesLike:
+    """
+    Convert PCM frames between formats (sample width, channel count, rate)
+
+    Channels are downmixed by averaging and upmixed by repeating the mono
+    signal; rates are converted by linear interpolation. Returns pcm itself
+    when the formats already match.
+    """
+    if src == dst:
+        return pcm
+
+    samples = decode_pcm(pcm, src)
+
+    if src.channels != dst.channels:
+        mono = samples.mean(axis=1, keepdims=True) if src.channels > 1 else samples
+        samples = np.repeat(mono, dst.channels, axis=1) if dst.channels > 1 else mono
+
+    if src.sample_rate != dst.sample_rate:
+        n_in = samples.shape[0]
+        n_out = converted_frames(n_in, src, dst)
+        positions = np.arange(n_out, dtype=np.float64) * (src.sample_rate / dst.sample_rate)
+        source = np.arange(n_in, dtype=np.float64)
+        samples = np.stack(
+            [np.interp(positions, source, samples[:, ch]) for ch in range(samples.shape[1])],
+            axis=1
+        ).astype(np.float32) if n_in else np.zeros((n_out, samples.shape[1]), dtype=np.float32)
+
+    return encode_pcm(samples, dst)
+
+
+def silence(fmt: WavFormat, num_frames: int) -> bytes:
+    """num_frames of digital silence in fmt (8-bit PCM is unsigned, centred on 128)"""
+    fill = b'\x80' if fmt.sample_width == 1 and not fmt.is_float else b'\x00'
+    return fill * (num_frames * fmt.block_align)
+
+
+class WavAssembler:
+    """
+    Joins WAV files into one PCM stream in a fixed output format
+
+    Lines are fed in order with add(), which yields output chunks (memoryview
+    slices of the input where no conversion is needed); flush() yields what
+    is held back at the end. Between lines either `gap_seconds` of silence
+    is inserted or the lines overlap by `crossfade_seconds` with linear
+    fades; a crossfade takes at most half of either line.
+    """
+
+    def __init__(self, fmt: WavFormat, gap_seconds: float = 0.0, crossfade_seconds: float = 0.0):
+        self.fmt = fmt
+        self.gap_frames = int(round(max(gap_seconds, 0.0) * fmt.sample_rate))
+        self.crossfade_frames = int(round(max(crossfade_seconds, 0.0) * fmt.sample_rate))
+
+        self.lines = 0
+        self.frames = 0
+        self.converted = 0
+
+        # End of the previous line, held back to be mixed into the next one
+        self._tail: BytesLike = b''
+
+    def add(self, wav_data: BytesLike) -> Iterator[BytesLike]:
+        """
+        Yield the output for one more line
+
+        Raises:
+            WavFormatError: The line is not a decodable WAV
+        """
+        src, pcm = parse_wav(wav_data)
+        if src != self.fmt:
+            pcm = memoryview(convert_pcm(pcm, src, self.fmt))
+            self.converted += 1
+        block_align = self.fmt.block_align
+        num_frames = len(pcm) // block_align
+
+        start = 0
+        if self.lines:
+            if self.crossfade_frames:
+                held = len(self._tail) // block_align
+                overlap = min(held, num_frames // 2)
+                if held > overlap:
+                    yield self._emit(self._tail[:(held - overlap) * block_align])
+                if overlap:
+                    yield self._emit(self._mix(self._tail[(held - overlap) * block_align:], pcm[:overlap * block_align]))
+                start = overlap
+            elif self.gap_frames:
+                yield self._emit(silence(self.fmt, self.gap_frames))
+        self.lines += 1
+
+        hold = min(self.crossfade_frames, num_frames // 2)
+        end = num_frames - hold
+        if end > start:
+            yield self._emit(pcm[start * block_align:end * block_align])
+        self._tail = pcm[max(end, start) * block_align:]
+
+    def flush(self) -> Iterator[BytesLike]:
+        """Yield the held-back end of the last line"""
+        if len(self._tail):
+            yield self._emit(self._tail)
+        self._tail = b''
+
+    def total_frames(self, formats: List[Tuple[WavFormat, int]]) -> int:
+        """
+        Exact output length for lines of the given (format, frames), so the
+        header can carry real sizes before any PCM is written
+        """
+        lengths = [converted_frames(frames, src, self.fmt) for src, frames in formats]
+        total = sum(lengths)
+        for previous, current in zip(lengths, lengths[1:]):
+            if self.crossfade_frames:
+                total -= min(self.crossfade_frames, previous // 2, current // 2)
+            else:
+                total += self.gap_frames
+        return total
+
+    def _emit(self, chunk: BytesLike) -> BytesLike:
+        self.frames += len(chunk) // self.fmt.block_align
+        return chunk
+
+    def _mix(self, fading_out: BytesLike, fading_in: BytesLike) -> bytes:
+        out_samples = decode_pcm(fading_out, self.fmt)
+        in_samples = decode_pcm(fading_in, self.fmt)
+        ramp = np.linspace(0.0, 1.0, num=out_samples.shape[0], dtype=np.float32)[:, None]
+        return encode_pcm(out_samples * (1.0 - ramp) + in_samples * ramp, self.fmt)
+
+
+def iter_concatenated_wav(
+    wav_data_list: List[BytesLike],
+    fmt: Optional[WavFormat] = None,
+    gap_seconds: float = 0.0,
+    crossfade_seconds: float = 0.0
+) -> Iterator[BytesLike]:
+    """
+    One WAV file joining wav_data_list: a header with exact sizes, then PCM chunks
+
+    Every input is parsed before this returns, so a bad input fails here
+    rather than halfway through a response.
+
+    Args:
+        fmt: Output format (default: the first file's format)
+
+    Raises:
+        WavFormatError: An input is not a decodable WAV
+    """
+    if not wav_data_list:
+        raise ValueError("No WAV data to concatenate")
+
+    parsed = [parse_wav(wav_data) for wav_data in wav_data_list]
+    assembler = WavAssembler(fmt or parsed[0][0], gap_seconds, crossfade_seconds)
+    total = assembler.total_frames([(src, len(pcm) // src.block_align) for src, pcm in parsed])
+    return _iter_assembled(assembler, wav_data_list, total)
+
+
+def _iter_assembled(assembler: WavAssembler, wav_data_list: List[BytesLike], total: int) -> Iterator[BytesLike]:
+    yield wav_header(assembler.fmt, total)
+    for wav_data in wav_data_list:
+        yield from assembler.add(wav_data)
+    yield from assembler.flush()
+
+
+def concatenate_wav(
+    wav_data_list: List[BytesLike],
+    fmt: Optional[WavFormat] = None,
+    gap_seconds: float = 0.0,
+    crossfade_seconds: float = 0.0
+) -> bytes:
+    """Join WAV files into a single WAV (see iter_concatenated_wav); output is built with one copy"""
+    return b''.join(iter_concatenated_wav(wav_data_list, fmt, gap_seconds, crossfade_seconds))
+
@@ -0,0 +1,269 @@
+"""
+Result caches for MioVo Gateway
+Content-addressed audio cache with a memory LRU tier and an optional disk tier,
+plus an entry-bounded LRU for AivisSpeech AudioQuery JSON
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a content address (sha256 hex) from JSON-serializable parts"""
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """
+    Two-tier cache for rendered audio
+
+    - Memory tier: LRU ordered dict bounded by total byte size
+    - Disk tier (optional): one file per key, tracked in an in-memory LRU
+      index built once at startup; when the files exceed the byte budget the
+      least recently used are removed down to DISK_LOW_WATER of it, so a
+      full cache does not evict on every write
+    """
+
+    # Fraction of the disk budget eviction frees the cache down to
+    DISK_LOW_WATER = 0.9
+
+    def __init__(self, memory_bytes: int, disk_dir: Optional[str] = None, disk_bytes: int = 0):
+        self.memory_budget = max(memory_bytes, 0)
+        self.disk_dir = disk_dir or None
+        self.disk_budget = max(disk_bytes, 0) if self.disk_dir else 0
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+
+        # Disk writes and reads run in worker threads: the index and size are guarded
+        self._disk_lock = threading.Lock()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, least recent first
+        self._disk_size = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            # File mtimes record last use across restarts
+            for _, path, size in sorted(self._scan_disk()):
+                self._disk_index[os.path.basename(path)[:-len('.bin')]] = size
+                self._disk_size += size
+            logger.info(
+                f"Audio disk cache at {self.disk_dir}: {len(self._disk_index)} files, {self._disk_size} bytes in use"
+            )
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self.disk_dir is not None and self.disk_budget > 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Look up a key in memory, then on disk (promoting disk hits to memory)"""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+
+        if self.disk_enabled:
+            data = await asyncio.to_thread(self._disk_read, key)
+            if data is not None:
+                self.disk_hits += 1
+                self._memory_put(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        """Store data in both tiers"""
+        self._memory_put(key, data)
+        if self.disk_enabled:
+            try:
+                await asyncio.to_thread(self._disk_write, key, data)
+            except OSError as e:
+                logger.warning(f"Failed to write audio cache entry {key[:12]}: {e}")
+
+    def clear(self) -> None:
+        """Drop the memory tier (disk files are left in place)"""
+        self._memory.clear()
+        self._memory_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier usage"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "memory_budget_bytes": self.memory_budget,
+            "disk_enabled": self.disk_enabled,
+            "disk_entries": len(self._disk_index),
+            "disk_bytes": self._disk_size,
+            "disk_budget_bytes": self.disk_budget
+        }
+
+    # Memory tier
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_budget:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+
+        self._memory[key] = data
+        self._memory_size += len(data)
+
+        while self._memory_size > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.evictions += 1
+
+    # Disk tier
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.bin")
+
+    def _disk_read(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._disk_lock:
+                # Removed behind our back: forget it
+                size = self._disk_index.pop(key, None)
+                if size is not None:
+                    self._disk_size -= size
+            return None
+
+        with self._disk_lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        # Touch so the order survives a restart
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def _disk_write(self, key: str, data: bytes) -> None:
+        if len(data) > self.disk_budget:
+            return
+
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Atomic update: write to .tmp then rename (per thread, as the same key may be written concurrently)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+        with self._disk_lock:
+            os.replace(tmp_path, path)
+            self._disk_size += len(data) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+            if self._disk_size > self.disk_budget:
+                self._disk_evict()
+
+    def _scan_disk(self):
+        """Yield (mtime, path, size) for every cache file"""
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith('.bin'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield st.st_mtime, path, st.st_size
+
+    def _disk_evict(self) -> None:
+        """Remove least recently used files down to the low-water mark (caller holds the disk lock)"""
+        started = time.time()
+        target = int(self.disk_budget * self.DISK_LOW_WATER)
+
+        removed = 0
+        while self._disk_index and self._disk_size > target:
+            key, size = self._disk_index.popitem(last=False)
+            try:
+                os.unlink(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+            self._disk_size -= size
+            self.evictions += 1
+            removed += 1
+
+        logger.debug(f"Audio disk cache evicted {removed} files in {(time.time() - started) * 1000:.1f}ms")
+
+
+class QueryCache:
+    """
+    LRU cache for AudioQuery JSON keyed on (text, speaker)
+
+    The query only depends on text and speaker; the *_scale parameters are
+    patched in by the caller, so get() hands out a private copy.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(max_entries, 0)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        query = self._entries.get(key)
+        if query is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(query)
+
+    def put(self, key: str, query: Dict[str, Any]) -> None:
+        if self.max_entries == 0:
+            return
+
+        self._entries[key] = copy.deepcopy(query)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries
+        }
@@ -4,7 +4,7 @@ Manages service URLs and settings
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 
 class Config:
     """Application configuration"""
@@ -13,6 +13,22 @@ class Config:
     AIVISSPEECH_URL: str = os.getenv('AIVISSPEECH_URL', 'http://localhost:10101')
     RVC_URL: str = os.getenv('RVC_URL', 'http://localhost:10102')
     
+    # Several engine instances per service (comma-separated, overrides the single URL)
+    AIVISSPEECH_URLS: str = os.getenv('AIVISSPEECH_URLS', '')
+    RVC_URLS: str = os.getenv('RVC_URLS', '')
+    
+    # Upstream circuit breaker: consecutive failures that open a backend's circuit,
+    # and how long it stays open before a trial request is let through
+    UPSTREAM_EJECT_AFTER: int = int(os.getenv('UPSTREAM_EJECT_AFTER', '3'))
+    UPSTREAM_EJECT_SECONDS: float = float(os.getenv('UPSTREAM_EJECT_SECONDS', '10'))
+    
+    # Adaptive upstream timeouts: p99 latency per unit of work x factor, never below the minimum
+    # (the fixed client timeouts remain the upper bound and apply until enough samples exist)
+    ADAPTIVE_TIMEOUT_FACTOR: float = float(os.getenv('ADAPTIVE_TIMEOUT_FACTOR', '3'))
+    ADAPTIVE_TIMEOUT_MIN: float = float(os.getenv('ADAPTIVE_TIMEOUT_MIN', '2'))
+    # RVC jobs queue behind each other on the GPU, so its floor is higher
+    RVC_ADAPTIVE_TIMEOUT_MIN: float = float(os.getenv('RVC_ADAPTIVE_TIMEOUT_MIN', '60'))
+    
     # Service settings
     ENABLE_REAL_SERVICES: bool = os.getenv('ENABLE_REAL_SERVICES', 'false').lower() == 'true'
     SERVICE_TIMEOUT: int = int(os.getenv('SERVICE_TIMEOUT', '30'))
@@ -41,6 +57,66 @@ class Config:
     MAX_TEXT_LENGTH = 5000
     MAX_BATCH_SIZE = 10
     
+    # Upstream connection pool settings
+    AIVISSPEECH_MAX_CONNECTIONS: int = int(os.getenv('AIVISSPEECH_MAX_CONNECTIONS', '10'))
+    AIVISSPEECH_MAX_KEEPALIVE: int = int(os.getenv('AIVISSPEECH_MAX_KEEPALIVE', '5'))
+    
+    # Batch synthesis fan-out (0 = as many lines as the AivisSpeech pool allows)
+    TTS_BATCH_CONCURRENCY: int = int(os.getenv('TTS_BATCH_CONCURRENCY', '0'))
+    
+    # Spacing between joined batch lines: silence, or an overlap with linear fades (takes precedence)
+    TTS_LINE_GAP_MS: int = int(os.getenv('TTS_LINE_GAP_MS', '0'))
+    TTS_LINE_CROSSFADE_MS: int = int(os.getenv('TTS_LINE_CROSSFADE_MS', '0'))
+    
+    # Lines of a non-streamed batch sent per /multi_synthesis call (1 = one /synthesis call per line;
+    # streamed batches never group, as a group's first line waits for its last)
+    TTS_MULTI_SYNTHESIS_SIZE: int = int(os.getenv('TTS_MULTI_SYNTHESIS_SIZE', '8'))
+    
+    # TTS result cache (memory LRU + optional disk tier, empty dir = disk tier off)
+    TTS_CACHE_MEMORY_MB: int = int(os.getenv('TTS_CACHE_MEMORY_MB', '128'))
+    TTS_CACHE_DIR: str = os.getenv('TTS_CACHE_DIR', '')
+    TTS_CACHE_DISK_MB: int = int(os.getenv('TTS_CACHE_DISK_MB', '2048'))
+    
+    # Long-text chunking (Chunk-and-Stream): texts longer than the threshold are
+    # split into chunks of at most TTS_CHUNK_MAX_CHARS and synthesized in parallel
+    TTS_CHUNK_THRESHOLD: int = int(os.getenv('TTS_CHUNK_THRESHOLD', '500'))
+    TTS_CHUNK_MAX_CHARS: int = int(os.getenv('TTS_CHUNK_MAX_CHARS', '400'))
+    
+    # Speaker catalog cache (seconds between /speakers refreshes)
+    TTS_SPEAKERS_TTL: int = int(os.getenv('TTS_SPEAKERS_TTL', '300'))
+    
+    # Lightweight AivisSpeech endpoint used for health probes
+    AIVISSPEECH_PROBE_PATH: str = os.getenv('AIVISSPEECH_PROBE_PATH', '/version')
+    
+    # Background health monitor (Watchdog pattern)
+    HEALTH_CHECK_INTERVAL: float = float(os.getenv('HEALTH_CHECK_INTERVAL', '5'))
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv('HEALTH_CHECK_TIMEOUT', '5'))
+    HEALTH_LATENCY_WINDOW: int = int(os.getenv('HEALTH_LATENCY_WINDOW', '120'))
+    
+    # AudioQuery cache keyed on (text, speaker), 0 = disabled
+    TTS_QUERY_CACHE_SIZE: int = int(os.getenv('TTS_QUERY_CACHE_SIZE', '4096'))
+    
+    # Background job queue (?background=true)
+    JOB_WORKERS_TTS: int = int(os.getenv('JOB_WORKERS_TTS', '4'))
+    JOB_WORKERS_RVC: int = int(os.getenv('JOB_WORKERS_RVC', '2'))
+    JOB_WORKERS_SEPARATION: int = int(os.getenv('JOB_WORKERS_SEPARATION', '1'))
+    JOB_QUEUE_MAX: int = int(os.getenv('JOB_QUEUE_MAX', '1000'))
+    JOB_RESULT_TTL: int = int(os.getenv('JOB_RESULT_TTL', '600'))  # seconds finished jobs are kept
+    JOB_RESULT_MAX_MB: int = int(os.getenv('JOB_RESULT_MAX_MB', '256'))  # audio kept by finished jobs; 0 = no limit
+    TASK_EVENTS_HEARTBEAT: float = float(os.getenv('TASK_EVENTS_HEARTBEAT', '15'))  # SSE keep-alive interval
+    
+    # Play All reading sessions: lines synthesized ahead of the playback cursor
+    READING_PREFETCH_LINES: int = int(os.getenv('READING_PREFETCH_LINES', '3'))
+    READING_SESSION_TTL: int = int(os.getenv('READING_SESSION_TTL', '1800'))  # idle seconds before a session is closed
+    READING_SESSION_MAX_LINES: int = int(os.getenv('READING_SESSION_MAX_LINES', '100000'))  # lines per session, over all pages
+    
+    # Prometheus-style /metrics endpoint and request instrumentation
+    METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Per-request stage timing (X-Trace-Id and Server-Timing response headers)
+    TRACING_ENABLED: bool = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+    TRACE_EXPORT_PATH: str = os.getenv('TRACE_EXPORT_PATH', '')  # JSONL file of finished traces; empty = off
+    
     @classmethod
     def is_production(cls) -> bool:
         """Check if running in production mode"""
@@ -48,13 +124,31 @@ class Config:
     
     @classmethod
     def get_aivisspeech_url(cls) -> str:
-        """Get AivisSpeech service URL"""
-        return cls.AIVISSPEECH_URL
+        """Get AivisSpeech service URL (the first one when several are configured)"""
+        return cls.get_aivisspeech_urls()[0]
     
     @classmethod
     def get_rvc_url(cls) -> str:
-        """Get RVC service URL"""
-        return cls.RVC_URL
+        """Get RVC service URL (the first one when several are configured)"""
+        return cls.get_rvc_urls()[0]
+    
+    @classmethod
+    def get_aivisspeech_urls(cls) -> List[str]:
+        """Get all AivisSpeech instance URLs"""
+        return _split_urls(cls.AIVISSPEECH_URLS) or [cls.AIVISSPEECH_URL]
+    
+    @classmethod
+    def get_rvc_urls(cls) -> List[str]:
+        """Get all RVC instance URLs"""
+        return _split_urls(cls.RVC_URLS) or [cls.RVC_URL]
+    
+    @classmethod
+    def get_tts_batch_concurrency(cls) -> int:
+        """Get number of batch lines synthesized in parallel"""
+        if cls.TTS_BATCH_CONCURRENCY > 0:
+            return cls.TTS_BATCH_CONCURRENCY
+        # Every AivisSpeech instance has its own connection pool
+        return cls.AIVISSPEECH_MAX_CONNECTIONS * len(cls.get_aivisspeech_urls())
     
     @classmethod
     def validate_config(cls) -> bool:
@@ -65,12 +159,16 @@ class Config:
                 return False
             
             # Check if URLs are valid
-            for url in [cls.AIVISSPEECH_URL, cls.RVC_URL]:
+            for url in cls.get_aivisspeech_urls() + cls.get_rvc_urls():
                 if not url.startswith(('http://', 'https://')):
                     print(f"⚠️ Invalid URL format: {url}")
                     return False
         
         return True
 
+def _split_urls(value: str) -> List[str]:
+    """Parse a comma-separated URL list"""
+    return [url.strip().rstrip('/') for url in value.split(',') if url.strip()]
+
 # Create config instance
 config = Config()
\ No newline at end of file
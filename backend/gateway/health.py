@@ -0,0 +1,175 @@
+"""
+Background health monitor for MioVo Gateway
+Watchdog pattern: probe every upstream concurrently on an interval and keep
+the latest snapshot plus rolling latency statistics
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from loguru import logger
+
+from config import config
+
+# A probe returns extra details for the snapshot and raises if the service is down
+ProbeFn = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class LatencyStats:
+    """Rolling window of probe latencies in milliseconds"""
+
+    def __init__(self, window: int):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, latency_ms: float) -> None:
+        self._samples.append(latency_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self._samples:
+            return {"samples": 0}
+
+        ordered = sorted(self._samples)
+        return {
+            "samples": len(ordered),
+            "last_ms": round(self._samples[-1], 2),
+            "avg_ms": round(sum(ordered) / len(ordered), 2),
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "max_ms": round(ordered[-1], 2)
+        }
+
+
+class ServiceHealth:
+    """Latest probe result for one service"""
+
+    def __init__(self, name: str, probe: ProbeFn, window: int):
+        self.name = name
+        self.probe = probe
+        self.latency = LatencyStats(window)
+
+        self.available = False
+        self.checked_at: Optional[float] = None
+        self.response_time_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.details: Dict[str, Any] = {}
+        self.consecutive_failures = 0
+        self.last_ok_at: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "checked_at": self.checked_at,
+            "response_time_ms": self.response_time_ms,
+            "error": self.error,
+            "consecutive_failures": self.consecutive_failures,
+            "last_ok_at": self.last_ok_at,
+            "latency": self.latency.summary(),
+            **self.details
+        }
+
+
+class HealthMonitor:
+    """
+    Probes registered services concurrently every `interval` seconds
+
+    Endpoints read snapshot() instead of probing inside the request, so
+    status polling from many UIs costs nothing upstream and one slow
+    service never delays the report for the other.
+    """
+
+    def __init__(self, interval: float, timeout: float, window: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.window = window
+        self._services: Dict[str, ServiceHealth] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, probe: ProbeFn) -> None:
+        self._services[name] = ServiceHealth(name, probe, self.window)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            logger.info(f"Starting health monitor (interval {self.interval}s) for: {', '.join(self._services)}")
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe_now(name) for name in self._services))
+
+    async def probe_now(self, name: str) -> Dict[str, Any]:
+        """Probe one service immediately and return its new snapshot"""
+        service = self._services[name]
+        start_time = time.time()
+        try:
+            details = await asyncio.wait_for(service.probe(), timeout=self.timeout)
+            latency_ms = (time.time() - start_time) * 1000
+            service.available = True
+            service.error = None
+            service.details = details or {}
+            service.consecutive_failures = 0
+            service.last_ok_at = time.time()
+            service.response_time_ms = round(latency_ms, 2)
+            service.latency.add(latency_ms)
+        except asyncio.TimeoutError:
+            self._record_failure(service, f"Probe timed out after {self.timeout}s")
+        except Exception as e:
+            # httpx status errors carry a second "more information" line
+            message = str(e).splitlines()[0] if str(e) else e.__class__.__name__
+            self._record_failure(service, message)
+        finally:
+            service.checked_at = time.time()
+
+        return service.snapshot()
+
+    async def snapshot(self, name: str) -> Dict[str, Any]:
+        """Latest snapshot, probing once if the service was never checked"""
+        service = self._services[name]
+        if service.checked_at is None:
+            return await self.probe_now(name)
+        return service.snapshot()
+
+    def _record_failure(self, service: ServiceHealth, error: str) -> None:
+        if service.available or service.consecutive_failures == 0:
+            logger.warning(f"{service.name} health probe failed: {error}")
+        service.available = False
+        service.error = error
+        service.response_time_ms = None
+        service.consecutive_failures += 1
+
+    async def _run(self) -> None:
+        while True:
+            started = time.time()
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health monitor iteration failed: {e}")
+            await asyncio.sleep(max(self.interval - (time.time() - started), 0.0))
+
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+# Shared monitor; routers register their probes at import time
+health_monitor = HealthMonitor(
+    interval=config.HEALTH_CHECK_INTERVAL,
+    timeout=config.HEALTH_CHECK_TIMEOUT,
+    window=config.HEALTH_LATENCY_WINDOW
+)
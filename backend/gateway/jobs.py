@@ -0,0 +1,344 @@
+"""
+Background job queue for MioVo Gateway
+Submit returns a task id immediately; work runs on bounded worker pools per task type
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from config import config
+from models import TaskResponse, TaskType, TaskStatus
+from responses import queued_task_response
+
+# Terminal states; finished jobs are kept for JOB_RESULT_TTL seconds, within JOB_RESULT_MAX_MB of audio
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when a task type's queue already holds JOB_QUEUE_MAX jobs"""
+
+
+class Job:
+    """
+    One queued unit of work
+
+    The work function receives the job, reports progress through
+    set_progress() and attaches raw audio with add_artifact(); its return
+    value becomes the task result. Every change is also pushed to the
+    job's event subscribers (GET /tasks/{id}/events).
+    """
+
+    def __init__(self, task_type: TaskType, work: Callable[["Job"], Awaitable[Dict[str, Any]]]):
+        self.task_id = str(uuid.uuid4())
+        self.type = task_type
+        self.status = TaskStatus.QUEUED
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.accessed_at = time.time()
+
+        # Raw audio tracks served by GET /tasks/{id}/result?track=
+        self.artifacts: Dict[str, bytes] = {}
+
+        self._work = work
+        self._task: Optional[asyncio.Task] = None
+
+        # Event stream subscribers and the id of the last published event
+        self._subscribers: List[asyncio.Queue] = []
+        self._event_id = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def last_event_id(self) -> int:
+        return self._event_id
+
+    @property
+    def artifact_bytes(self) -> int:
+        return sum(len(audio) for audio in self.artifacts.values())
+
+    def set_progress(self, progress: float, **detail: Any) -> None:
+        """Update progress (0-100); detail (e.g. line=3, lines=10) is included in the event"""
+        self.progress = round(min(max(progress, 0.0), 100.0), 2)
+        self.updated_at = datetime.utcnow()
+        self._publish("progress", {"task_id": self.task_id, "progress": self.progress, **detail})
+
+    def add_artifact(self, track: str, audio: bytes, **detail: Any) -> None:
+        """Attach a track; it is downloadable as soon as it is added, before the task completes"""
+        self.artifacts[track] = audio
+        self._publish("partial", {"task_id": self.task_id, "track": track, "bytes": len(audio), **detail})
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving (event_id, event, data) tuples until the task finishes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def status_event(self) -> Dict[str, Any]:
+        return jsonable_encoder(self.to_response())
+
+    def to_response(self) -> TaskResponse:
+        result = self.result
+        if result is not None and self.artifacts:
+            result = {**result, "tracks": list(self.artifacts)}
+        return TaskResponse(
+            task_id=self.task_id,
+            type=self.type,
+            status=self.status,
+            progress=self.progress,
+            result=result,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=self.updated_at
+        )
+
+    def _start(self) -> None:
+        self.status = TaskStatus.PROCESSING
+        self.updated_at = datetime.utcnow()
+        self._publish("status", self.status_event())
+
+    def _finish(self, status: TaskStatus, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        if status == TaskStatus.COMPLETED:
+            self.progress = 100.0
+        self.updated_at = datetime.utcnow()
+        self.finished_at = time.time()
+        self._publish("status", self.status_event())
+
+    def _publish(self, event: str, data: Dict[str, Any]) -> None:
+        self._event_id += 1
+        for queue in self._subscribers:
+            queue.put_nowait((self._event_id, event, data))
+
+
+class JobManager:
+    """
+    Per-type bounded queues drained by a fixed number of workers
+
+    Queued jobs only hold memory, not sockets, so far more work can wait
+    than there are open connections upstream. A full queue rejects new
+    submissions instead of growing without bound.
+
+    Finished jobs are dropped after result_ttl seconds, or earlier, least
+    recently accessed first, when their audio exceeds result_max_bytes.
+    """
+
+    def __init__(self, workers: Dict[TaskType, int], queue_max: int, result_ttl: float, result_max_bytes: int = 0):
+        self.workers = workers
+        self.queue_max = queue_max
+        self.result_ttl = result_ttl
+        self.result_max_bytes = result_max_bytes  # 0 = no limit
+
+        self._jobs: Dict[str, Job] = {}
+        self._queues: Dict[TaskType, asyncio.Queue] = {}
+        self._worker_tasks: list = []
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._worker_tasks)
+
+    def start(self) -> None:
+        """Start the worker pools (also done lazily by the first submit)"""
+        if self.running:
+            return
+        self._queues = {task_type: asyncio.Queue(maxsize=self.queue_max) for task_type in self.workers}
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(task_type))
+            for task_type, count in self.workers.items()
+            for _ in range(max(count, 1))
+        ]
+        logger.info(
+            "Job workers started: "
+            + ", ".join(f"{task_type.value}={max(count, 1)}" for task_type, count in self.workers.items())
+        )
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        for task in self._worker_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker_tasks = []
+
+    def submit(self, task_type: TaskType, work: Callable[[Job], Awaitable[Dict[str, Any]]]) -> Job:
+        """
+        Queue work and return its job without waiting
+
+        Raises:
+            QueueFullError: The queue for this task type is full
+        """
+        self.start()
+        self._evict_expired()
+
+        job = Job(task_type, work)
+        try:
+            self._queues[task_type].put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"{task_type.value} queue is full ({self.queue_max} jobs waiting)")
+
+        self._jobs[job.task_id] = job
+        self.submitted += 1
+        logger.info(f"Queued {task_type.value} task {job.task_id}")
+        return job
+
+    def get(self, task_id: str) -> Optional[Job]:
+        self._evict_expired()
+        job = self._jobs.get(task_id)
+        if job is not None:
+            job.accessed_at = time.time()
+        return job
+
+    def cancel(self, task_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job
+
+        Queued jobs are skipped by the workers; running jobs have their
+        work task cancelled. Finished jobs are left untouched.
+        """
+        job = self._jobs.get(task_id)
+        if job is None or job.finished:
+            return job
+
+        if job._task is not None and not job._task.done():
+            job._task.cancel()
+        job._finish(TaskStatus.FAILED, error="Cancelled")
+        self.cancelled += 1
+        logger.info(f"Cancelled task {task_id}")
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_max": self.queue_max,
+            "queues": {
+                task_type.value: {
+                    "workers": max(self.workers[task_type], 1),
+                    "queued": queue.qsize()
+                }
+                for task_type, queue in self._queues.items()
+            },
+            "jobs": len(self._jobs),
+            "retained_mb": round(self._retained_bytes() / (1024 * 1024), 1),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "evicted": self.evicted
+        }
+
+    async def _worker(self, task_type: TaskType) -> None:
+        queue = self._queues[task_type]
+        while True:
+            job: Job = await queue.get()
+            try:
+                if job.finished:
+                    continue  # Cancelled while queued
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job._start()
+        job._task = asyncio.create_task(job._work(job))
+        try:
+            # wait() keeps a cancelled job from cancelling the worker itself
+            await asyncio.wait({job._task})
+        except asyncio.CancelledError:
+            job._task.cancel()
+            raise
+
+        if job._task.cancelled() or job.finished:
+            return  # Already marked by cancel()
+
+        error = job._task.exception()
+        if error is not None:
+            logger.error(f"{job.type.value} task {job.task_id} failed: {error}")
+            job._finish(TaskStatus.FAILED, error=str(error) or error.__class__.__name__)
+            self.failed += 1
+        else:
+            job.result = job._task.result()
+            job._finish(TaskStatus.COMPLETED)
+            self.completed += 1
+            logger.info(f"{job.type.value} task {job.task_id} completed")
+        self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            task_id for task_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for task_id in expired:
+            del self._jobs[task_id]
+
+        if not self.result_max_bytes:
+            return
+        retained = self._retained_bytes()
+        if retained <= self.result_max_bytes:
+            return
+        # Over budget: drop finished jobs, least recently accessed first (running jobs keep their audio)
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.accessed_at
+        )
+        for job in finished:
+            if retained <= self.result_max_bytes:
+                break
+            retained -= job.artifact_bytes
+            del self._jobs[job.task_id]
+            self.evicted += 1
+            logger.info(f"Dropped finished task {job.task_id} to stay within JOB_RESULT_MAX_MB")
+
+    def _retained_bytes(self) -> int:
+        return sum(job.artifact_bytes for job in self._jobs.values())
+
+
+# Shared job manager; endpoints submit with ?background=true
+job_manager = JobManager(
+    workers={
+        TaskType.TTS: config.JOB_WORKERS_TTS,
+        TaskType.RVC: config.JOB_WORKERS_RVC,
+        TaskType.SEPARATION: config.JOB_WORKERS_SEPARATION
+    },
+    queue_max=config.JOB_QUEUE_MAX,
+    result_ttl=config.JOB_RESULT_TTL,
+    result_max_bytes=config.JOB_RESULT_MAX_MB * 1024 * 1024
+)
+
+
+def submit_task(task_type: TaskType, work: Callable[[Job], Awaitable[Dict[str, Any]]]) -> JSONResponse:
+    """Queue work on job_manager and answer 202 with the QUEUED task (503 if the queue is full)"""
+    try:
+        job = job_manager.submit(task_type, work)
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return queued_task_response(job.to_response())
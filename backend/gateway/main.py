@@ -4,7 +4,7 @@ Port: 8000
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 import uvicorn
 import asyncio
@@ -14,8 +14,13 @@ from loguru import logger
 from typing import Dict, Any
 
 # Import routers
-from routers import tts, rvc
+from routers import tts, rvc, tasks
 from config import config
+from responses import TASK_HEADERS
+from health import health_monitor
+from jobs import job_manager
+import metrics
+import tracing
 
 # Application lifespan
 @asynccontextmanager
@@ -31,19 +36,37 @@ async def lifespan(app: FastAPI):
     if config.ENABLE_REAL_SERVICES:
         logger.info(f"AivisSpeech URL: {config.get_aivisspeech_url()}")
         logger.info(f"RVC URL: {config.get_rvc_url()}")
+        
+        # Warm the speaker catalog and keep it fresh in the background
+        tts.speaker_catalog.start()
+        
+        # Probe upstream services in the background (Watchdog pattern)
+        health_monitor.start()
     else:
         logger.info("Running in mock mode. Set ENABLE_REAL_SERVICES=true to connect to real services.")
     
+    # Background job workers (?background=true)
+    job_manager.start()
+    
     yield
     
     # Shutdown: Cleanup
     logger.info("Shutting down MioVo Gateway...")
     
+    # Stop background tasks
+    await job_manager.stop()
+    await health_monitor.stop()
+    await tts.speaker_catalog.stop()
+    tts.reading_sessions.close_all()
+    
     # Close HTTP clients
     if tts.aivisspeech_client:
         await tts.aivisspeech_client.aclose()
     if rvc.rvc_client:
         await rvc.rvc_client.aclose()
+    
+    if trace_exporter:
+        trace_exporter.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -74,11 +97,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=TASK_HEADERS + [tracing.TRACE_HEADER, "Server-Timing"],
 )
 
+# Stage timings per request (Server-Timing header, optional JSONL export)
+trace_exporter = tracing.TraceExporter(config.TRACE_EXPORT_PATH) if config.TRACE_EXPORT_PATH else None
+if config.TRACING_ENABLED:
+    app.add_middleware(tracing.TracingMiddleware, exporter=trace_exporter)
+
+# Request counts and latency per route (outermost, so it also times CORS handling)
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(tts.router)
 app.include_router(rvc.router)
+app.include_router(tasks.router)
 
 # Health check endpoint
 @app.get("/health")
@@ -91,6 +125,44 @@ async def health_check():
         "mode": "production" if config.ENABLE_REAL_SERVICES else "mock"
     }
 
+def collect_metrics() -> None:
+    """Copy cache, upstream pool and job queue state into gauges (runs at scrape time)"""
+    for name, cache in (("tts", tts.tts_cache), ("audio_query", tts.query_cache)):
+        stats = cache.stats()
+        metrics.cache_hits.set_total(stats["hits"], cache=name)
+        metrics.cache_misses.set_total(stats["misses"], cache=name)
+        metrics.cache_hit_ratio.set(stats["hit_ratio"], cache=name)
+        if "memory_bytes" in stats:
+            metrics.cache_bytes.set(stats["memory_bytes"], cache=name)
+    
+    for name, client in (("aivisspeech", tts.aivisspeech_client), ("rvc", rvc.rvc_client)):
+        if client is None:
+            continue
+        for backend in client.backends:
+            metrics.upstream_in_flight.set(backend.outstanding, upstream=name, backend=backend.url)
+            metrics.upstream_healthy.set(int(backend.stats()["healthy"]), upstream=name, backend=backend.url)
+            if client.max_connections:
+                metrics.upstream_pool_utilization.set(
+                    round(backend.outstanding / client.max_connections, 4), upstream=name, backend=backend.url
+                )
+    
+    for task_type, queue in job_manager.stats()["queues"].items():
+        metrics.jobs_queued.set(queue["queued"], type=task_type)
+
+
+metrics.registry.add_collector(collect_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request, upstream, cache and audio metrics"""
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(
+        content=metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -104,10 +176,13 @@ async def root():
             "docs": "/docs",
             "openapi": "/openapi.json",
             "services_status": "/api/services/status",
+            "metrics": "/metrics",
             "tts": {
                 "synthesize": "/tts/synthesize",
                 "synthesize_batch": "/tts/synthesize_batch",
                 "speakers": "/tts/speakers",
+                "styles": "/tts/styles/{style_id}",
+                "sessions": "/tts/sessions",
                 "health": "/tts/health",
                 "test_connection": "/tts/test_connection"
             },
@@ -118,6 +193,11 @@ async def root():
                 "health": "/rvc/health",
                 "test_connection": "/rvc/test_connection",
                 "gpu_info": "/rvc/gpu_info"
+            },
+            "tasks": {
+                "get": "/tasks/{task_id}",
+                "result": "/tasks/{task_id}/result",
+                "cancel": "DELETE /tasks/{task_id}"
             }
         }
     }
@@ -141,78 +221,69 @@ async def get_services_status():
         "total_response_time_ms": 0
     }
     
-    # Check AivisSpeech status
-    aivisspeech_status = {
-        "available": False,
-        "url": config.get_aivisspeech_url(),
-        "response_time_ms": None,
-        "error": None
-    }
-    
-    try:
-        tts_start = time.time()
-        
-        if config.ENABLE_REAL_SERVICES:
-            # Test real connection
-            client = await tts.get_aivisspeech_client()
-            response = await client.get("/speakers", timeout=5.0)
-            
-            if response.status_code == 200:
-                aivisspeech_status["available"] = True
-                speakers = response.json()
-                aivisspeech_status["speakers_count"] = len(speakers) if isinstance(speakers, list) else 0
-            else:
-                aivisspeech_status["error"] = f"Unexpected status: {response.status_code}"
-        else:
-            # Mock mode
-            aivisspeech_status["available"] = True
-            aivisspeech_status["speakers_count"] = 3  # Mock speakers
-        
-        aivisspeech_status["response_time_ms"] = round((time.time() - tts_start) * 1000, 2)
-        
-    except Exception as e:
-        aivisspeech_status["error"] = str(e)
-        logger.error(f"Failed to check AivisSpeech status: {e}")
+    if config.ENABLE_REAL_SERVICES:
+        # Latest snapshots from the background health monitor (no upstream calls here)
+        aivisspeech_snapshot, rvc_snapshot = await asyncio.gather(
+            health_monitor.snapshot("aivisspeech"),
+            health_monitor.snapshot("rvc")
+        )
+        aivisspeech_status = {
+            "url": config.get_aivisspeech_url(),
+            "speakers_count": 0,
+            **aivisspeech_snapshot
+        }
+        rvc_status = {
+            "url": config.get_rvc_url(),
+            "gpu_available": False,
+            "models_loaded": 0,
+            **rvc_snapshot
+        }
+    else:
+        # Mock mode
+        aivisspeech_status = {
+            "available": True,
+            "url": config.get_aivisspeech_url(),
+            "response_time_ms": 0,
+            "error": None,
+            "speakers_count": 3  # Mock speakers
+        }
+        rvc_status = {
+            "available": True,
+            "url": config.get_rvc_url(),
+            "response_time_ms": 0,
+            "error": None,
+            "gpu_available": True,
+            "models_loaded": 2  # Mock models
+        }
     
     status_response["services"]["aivisspeech"] = aivisspeech_status
+    status_response["services"]["rvc"] = rvc_status
+    status_response["health_monitor"] = {
+        "running": health_monitor.running,
+        "interval_seconds": health_monitor.interval
+    }
     
-    # Check RVC status
-    rvc_status = {
-        "available": False,
-        "url": config.get_rvc_url(),
-        "response_time_ms": None,
-        "error": None,
-        "gpu_available": False
+    # Cache statistics
+    status_response["cache"] = {
+        "tts": tts.tts_cache.stats(),
+        "audio_query": tts.query_cache.stats(),
+        "speakers": tts.speaker_catalog.stats(),
+        "in_flight": {
+            "synthesis": tts.synthesis_flight.stats(),
+            "audio_query": tts.query_flight.stats()
+        }
     }
     
-    try:
-        rvc_start = time.time()
-        
-        if config.ENABLE_REAL_SERVICES:
-            # Test real connection
-            client = await rvc.get_rvc_client()
-            response = await client.get("/health", timeout=5.0)
-            
-            if response.status_code == 200:
-                rvc_status["available"] = True
-                health_data = response.json()
-                rvc_status["gpu_available"] = health_data.get("gpu_available", False)
-                rvc_status["models_loaded"] = health_data.get("models_loaded", 0)
-            else:
-                rvc_status["error"] = f"Unexpected status: {response.status_code}"
-        else:
-            # Mock mode
-            rvc_status["available"] = True
-            rvc_status["gpu_available"] = True
-            rvc_status["models_loaded"] = 2  # Mock models
-        
-        rvc_status["response_time_ms"] = round((time.time() - rvc_start) * 1000, 2)
-        
-    except Exception as e:
-        rvc_status["error"] = str(e)
-        logger.error(f"Failed to check RVC status: {e}")
+    # Background job queue
+    status_response["jobs"] = job_manager.stats()
+    status_response["reading_sessions"] = tts.reading_sessions.stats()
     
-    status_response["services"]["rvc"] = rvc_status
+    # Upstream pools: per-instance circuits and adaptive timeouts
+    status_response["upstreams"] = {
+        name: client.stats()
+        for name, client in (("aivisspeech", tts.aivisspeech_client), ("rvc", rvc.rvc_client))
+        if client is not None
+    }
     
     # Calculate overall status
     all_available = all([
@@ -0,0 +1,292 @@
+"""
+Prometheus-style metrics for MioVo Gateway
+A small in-process registry (counters, gauges, histograms with labels)
+rendered in the text exposition format at GET /metrics
+"""
+import bisect
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from audio import WavFormatError, parse_wav
+
+# Latency buckets in seconds: 5 ms .. 2 min (TTS lines are ~0.1-2 s, RVC/separation up to minutes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """Base for labelled metrics; values are kept per label-value tuple"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing total"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: str) -> None:
+        """Mirror a total kept elsewhere (collectors copy existing counters at scrape time)"""
+        self._values[self._key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    """
+    Bucketed distribution; observe() is one binary search and two additions,
+    cumulative bucket counts are only built when rendering
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics plus collectors
+
+    Collectors run at scrape time and copy state that other components
+    already keep (cache stats, pool counters, queue sizes) into gauges, so
+    nothing on the request path pays for it.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Text exposition format (version 0.0.4)"""
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+# Shared registry, served at GET /metrics
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "miovo_http_requests_total", "HTTP requests handled, by route template and status",
+    ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "miovo_http_request_duration_seconds", "Time until the response started, by route template",
+    ("method", "route")
+)
+http_in_flight = registry.gauge(
+    "miovo_http_requests_in_flight", "HTTP requests currently being handled"
+)
+
+upstream_requests = registry.counter(
+    "miovo_upstream_requests_total", "Requests sent to AivisSpeech/RVC, by path and outcome",
+    ("upstream", "path", "status")
+)
+upstream_request_duration = registry.histogram(
+    "miovo_upstream_request_duration_seconds", "Upstream call latency (e.g. /audio_query and /synthesis separately)",
+    ("upstream", "path")
+)
+upstream_in_flight = registry.gauge(
+    "miovo_upstream_requests_in_flight", "Requests outstanding per upstream instance",
+    ("upstream", "backend")
+)
+upstream_pool_utilization = registry.gauge(
+    "miovo_upstream_pool_utilization", "Outstanding requests / max connections per upstream instance (1 = saturated)",
+    ("upstream", "backend")
+)
+upstream_pool_timeouts = registry.counter(
+    "miovo_upstream_pool_timeouts_total", "Requests that timed out waiting for a free connection",
+    ("upstream",)
+)
+upstream_healthy = registry.gauge(
+    "miovo_upstream_healthy", "1 if the instance's circuit is not open",
+    ("upstream", "backend")
+)
+
+cache_hits = registry.counter("miovo_cache_hits_total", "Cache hits", ("cache",))
+cache_misses = registry.counter("miovo_cache_misses_total", "Cache misses", ("cache",))
+cache_hit_ratio = registry.gauge("miovo_cache_hit_ratio", "Hits / lookups since start", ("cache",))
+cache_bytes = registry.gauge("miovo_cache_bytes", "Bytes held by the audio cache memory tier", ("cache",))
+
+audio_bytes = registry.counter("miovo_audio_output_bytes_total", "WAV bytes produced", ("kind",))
+audio_seconds = registry.counter("miovo_audio_output_seconds_total", "Seconds of audio produced", ("kind",))
+
+jobs_queued = registry.gauge("miovo_jobs_queued", "Background jobs waiting, by task type", ("type",))
+
+
+def record_audio(kind: str, wav_data: Optional[bytes]) -> None:
+    """Count produced audio; the duration comes from the WAV header (no decoding)"""
+    if not wav_data:
+        return
+    audio_bytes.inc(len(wav_data), kind=kind)
+    try:
+        fmt, pcm = parse_wav(wav_data)
+    except WavFormatError:
+        return
+    audio_seconds.inc(len(pcm) / fmt.block_align / fmt.sample_rate, kind=kind)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests per route template (/tts/sessions/{session_id},
+    not the raw path, so label cardinality stays bounded)
+
+    Latency is measured until the response starts, which for streamed
+    audio is the time to first byte.
+    """
+
+    def __init__(self, app: Callable, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = 500
+        started = False
+
+        def observe() -> None:
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(method=scope["method"], route=route_label, status=str(status))
+            http_request_duration.observe(time.perf_counter() - start_time, method=scope["method"], route=route_label)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status, started
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                status = message["status"]
+                observe()
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            if not started:
+                observe()  # Failed before any response was sent
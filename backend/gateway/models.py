@@ -41,6 +41,10 @@ class RVCRequest(BaseModel):
     protect: float = Field(0.5, ge=0.0, le=0.5)
     index_rate: float = Field(0.75, ge=0.0, le=1.0)
     filter_radius: int = Field(3, ge=0, le=7)
+    # Segmented conversion (/rvc/convert/stream); None = the RVC server's defaults
+    segment_seconds: Optional[float] = Field(None, ge=5.0, le=120.0)
+    overlap_seconds: Optional[float] = Field(None, ge=0.0, le=2.0)
+    split: str = Field("silence", pattern="^(silence|fixed)$")
 
 
 class SeparationRequest(BaseModel):
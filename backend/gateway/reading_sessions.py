@@ -0,0 +1,164 @@
+"""
+Reading sessions for MioVo Gateway
+Lookahead prefetch for Play All: keep the next N lines synthesized ahead of the playback cursor
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+# Synthesizes one line of text and returns WAV bytes
+LineSynthesizer = Callable[[str], Awaitable[bytes]]
+
+
+class ReadingSession:
+    """
+    Ordered lines with a playback cursor
+
+    Lines cursor..cursor+lookahead are always being synthesized (or done).
+    Moving the cursor cancels work that fell out of the window, so a seek
+    or skip never leaves stale synthesis running.
+    """
+
+    def __init__(self, lines: List[str], synthesize: LineSynthesizer, lookahead: int):
+        self.session_id = str(uuid.uuid4())
+        self.lines = lines
+        self.lookahead = lookahead
+        self.cursor = 0
+        self.created_at = time.time()
+        self.last_access = self.created_at
+
+        self._synthesize = synthesize
+        self._tasks: Dict[int, "asyncio.Task[bytes]"] = {}
+
+        self.prefetched = 0
+        self.cancelled = 0
+
+    def append(self, lines: List[str]) -> None:
+        """Add lines at the end (long scripts are registered in pages)"""
+        self.lines.extend(lines)
+        self.last_access = time.time()
+        self._schedule()
+
+    def seek(self, index: int) -> None:
+        """Move the cursor and re-plan the prefetch window"""
+        self.cursor = index
+        self.last_access = time.time()
+        self._schedule()
+
+    async def get_line(self, index: int) -> bytes:
+        """
+        Audio for one line; also moves the cursor there
+
+        Raises:
+            IndexError: Line index out of range
+            Exception: Synthesis of the line failed (it is retried on the next call)
+        """
+        if not 0 <= index < len(self.lines):
+            raise IndexError(f"Line index out of range: {index}")
+
+        self.seek(index)
+        task = self._tasks[index]
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                # The line left the window while we waited (concurrent seek)
+                raise RuntimeError(f"Line {index} was cancelled by a seek")
+            raise
+        except Exception:
+            if self._tasks.get(index) is task:
+                del self._tasks[index]
+            raise
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+                self.cancelled += 1
+        self._tasks.clear()
+
+    def status(self) -> Dict[str, Any]:
+        ready = sorted(i for i, task in self._tasks.items() if task.done() and not task.cancelled() and task.exception() is None)
+        pending = sorted(i for i, task in self._tasks.items() if not task.done())
+        return {
+            "session_id": self.session_id,
+            "lines": len(self.lines),
+            "cursor": self.cursor,
+            "lookahead": self.lookahead,
+            "ready": ready,
+            "pending": pending,
+            "prefetched": self.prefetched,
+            "cancelled": self.cancelled
+        }
+
+    def _schedule(self) -> None:
+        window = range(self.cursor, min(self.cursor + self.lookahead + 1, len(self.lines)))
+
+        # Drop work behind the cursor or beyond the lookahead (seek/skip)
+        for index in list(self._tasks):
+            if index not in window:
+                task = self._tasks.pop(index)
+                if not task.done():
+                    task.cancel()
+                    self.cancelled += 1
+
+        # Start missing lines in reading order so the nearest line starts first
+        for index in window:
+            if index not in self._tasks:
+                task = asyncio.create_task(self._synthesize(self.lines[index]))
+                task.add_done_callback(_consume_exception)
+                self._tasks[index] = task
+                if index != self.cursor:
+                    self.prefetched += 1
+
+
+class ReadingSessionManager:
+    """Registry of open reading sessions; idle sessions are closed after `ttl` seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._sessions: Dict[str, ReadingSession] = {}
+
+    def create(self, lines: List[str], synthesize: LineSynthesizer, lookahead: int) -> ReadingSession:
+        self._evict_idle()
+        session = ReadingSession(lines, synthesize, lookahead)
+        self._sessions[session.session_id] = session
+        session.seek(0)
+        logger.info(f"Reading session {session.session_id} opened: {len(lines)} lines, lookahead {lookahead}")
+        return session
+
+    def get(self, session_id: str) -> Optional[ReadingSession]:
+        self._evict_idle()
+        return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        logger.info(f"Reading session {session_id} closed")
+        return True
+
+    def close_all(self) -> None:
+        for session_id in list(self._sessions):
+            self.close(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "ttl_seconds": self.ttl
+        }
+
+    def _evict_idle(self) -> None:
+        cutoff = time.time() - self.ttl
+        for session_id, session in list(self._sessions.items()):
+            if session.last_access < cutoff:
+                self.close(session_id)
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,161 @@
+"""
+Circuit breaker and adaptive timeouts for upstream calls
+Fail fast while an upstream is down, and size timeouts from observed latency
+instead of a fixed worst case
+"""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from health import percentile
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without sending anything while every upstream circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker
+
+    - closed: requests flow; `failure_threshold` consecutive failures open it
+    - open: requests are refused at once for `reset_timeout` seconds
+    - half-open: one trial request is let through; success closes the
+      circuit, failure opens it again for another `reset_timeout`
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def can_attempt(self) -> bool:
+        """Whether a request may go out now (does not reserve the half-open trial)"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._trial_in_flight)
+
+    def on_attempt(self) -> None:
+        """Call right before sending; reserves the trial slot when half-open"""
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = True
+
+    def release_trial(self) -> None:
+        """Give back the half-open trial slot without a verdict (request cancelled)"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this failure opened the circuit"""
+        self.consecutive_failures += 1
+        was_half_open = self.state == HALF_OPEN
+        self._trial_in_flight = False
+        if was_half_open or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self.opened_at = time.time()
+            self.opens += 1
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        """Seconds until the circuit lets a trial request through"""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_timeout - (time.time() - self.opened_at), 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "opens": self.opens
+        }
+
+
+class AdaptiveTimeout:
+    """
+    Per-route timeout derived from observed latency and the size of the work
+
+    Latency is tracked per work unit (characters of text, seconds of audio),
+    so a long text gets proportionally more time than a short one. Until
+    `min_samples` requests have been seen the caller's default applies.
+    Requests cut off by the adaptive timeout are recorded as censored
+    samples, so the timeout keeps growing through a sustained slowdown
+    instead of freezing on pre-slowdown history.
+
+        timeout = clamp(p99(latency / units) * units * factor, minimum, maximum)
+    """
+
+    def __init__(
+        self,
+        factor: float,
+        minimum: float,
+        maximum: float,
+        window: int = 200,
+        min_samples: int = 20,
+        censored_bump: float = 1.5
+    ):
+        self.factor = factor
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.min_samples = min_samples
+        self.censored_bump = censored_bump
+        self._samples: Dict[str, Deque[float]] = {}
+        self._censored: Dict[str, int] = {}
+
+    def observe(self, route: str, elapsed: float, units: float = 1.0) -> None:
+        samples = self._samples.setdefault(route, deque(maxlen=self.window))
+        samples.append(elapsed / max(units, 1.0))
+
+    def observe_timeout(self, route: str, timeout: float, units: float = 1.0) -> None:
+        """
+        Record a request the adaptive timeout cut off
+
+        Its latency is only known to exceed `timeout`, so it counts as
+        `timeout * censored_bump`: each one raises the p99, until requests
+        complete again and real samples take over.
+        """
+        self._censored[route] = self._censored.get(route, 0) + 1
+        self.observe(route, timeout * self.censored_bump, units)
+
+    def timeout_for(self, route: str, units: float = 1.0) -> Optional[float]:
+        """Timeout in seconds, or None while there is not enough history"""
+        samples = self._samples.get(route)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        per_unit = percentile(sorted(samples), 99)
+        return round(min(max(per_unit * max(units, 1.0) * self.factor, self.minimum), self.maximum), 3)
+
+    def stats(self) -> Dict[str, Any]:
+        routes = {}
+        for route, samples in self._samples.items():
+            ordered = sorted(samples)
+            routes[route] = {
+                "samples": len(ordered),
+                "censored": self._censored.get(route, 0),
+                "p50_per_unit_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p99_per_unit_ms": round(percentile(ordered, 99) * 1000, 2)
+            }
+        return routes
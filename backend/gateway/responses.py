@@ -0,0 +1,89 @@
+"""
+Response helpers for MioVo Gateway
+Content negotiation between JSON TaskResponse and raw audio bytes
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from models import TaskResponse, TaskType, TaskStatus
+
+# Accept values that select the binary audio representation
+BINARY_MEDIA_TYPES = ("audio/wav", "audio/x-wav", "audio/wave", "audio/*", "application/octet-stream")
+
+# Task metadata headers (also listed in CORS expose_headers)
+TASK_HEADERS = ["X-Task-Id", "X-Task-Type", "X-Task-Status", "X-Task-Result", "X-Task-Created-At", "X-Task-Updated-At"]
+
+
+def wants_binary(request: Request, format: Optional[str] = None) -> bool:
+    """
+    Decide whether the caller asked for raw audio
+
+    An explicit ?format=binary|json wins; otherwise an Accept header naming an
+    audio type selects binary. Wildcard */* keeps the JSON shape for existing callers.
+    """
+    if format:
+        return format == "binary"
+
+    accept = request.headers.get("accept", "")
+    media_types = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    return any(media_type in BINARY_MEDIA_TYPES for media_type in media_types)
+
+
+def audio_response(
+    audio: bytes,
+    task_id: str,
+    task_type: TaskType,
+    result: Dict[str, Any],
+    created_at: datetime,
+    media_type: str = "audio/wav"
+) -> Response:
+    """Raw audio body with task metadata in X-Task-* headers"""
+    return Response(
+        content=audio,
+        media_type=media_type,
+        headers={
+            "X-Task-Id": task_id,
+            "X-Task-Type": task_type.value,
+            "X-Task-Status": TaskStatus.COMPLETED.value,
+            "X-Task-Result": json.dumps(jsonable_encoder(result), separators=(',', ':')),
+            "X-Task-Created-At": created_at.isoformat(),
+            "X-Task-Updated-At": datetime.utcnow().isoformat()
+        }
+    )
+
+
+def failed_task_response(task: TaskResponse, status_code: int = 502) -> JSONResponse:
+    """
+    Failed TaskResponse for binary callers
+
+    JSON callers keep getting failures as 200 + status=failed; binary callers
+    get a non-2xx status so they don't try to decode the body as audio.
+    """
+    return JSONResponse(
+        status_code=status_code,
+        content=jsonable_encoder(task),
+        headers={
+            "X-Task-Id": task.task_id,
+            "X-Task-Type": task.type.value,
+            "X-Task-Status": task.status.value
+        }
+    )
+
+
+def queued_task_response(task: TaskResponse) -> JSONResponse:
+    """202 Accepted for a background task, pointing at its polling endpoint"""
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(task),
+        headers={
+            "Location": f"/tasks/{task.task_id}",
+            "X-Task-Id": task.task_id,
+            "X-Task-Type": task.type.value,
+            "X-Task-Status": task.status.value
+        }
+    )
@@ -2,7 +2,7 @@
 RVC Router - Voice Conversion endpoints
 Integrates with RVC Service via Cloudflare Tunnel
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Request, Query
 from fastapi.responses import StreamingResponse
 import httpx
 import uuid
@@ -12,7 +12,7 @@ import base64
 import time
 import sys
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 import io
 
@@ -21,11 +21,21 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import RVCRequest, TaskResponse, TaskType, TaskStatus
 from config import config
+from responses import wants_binary, audio_response, failed_task_response
+from health import health_monitor
+from jobs import Job, submit_task
+from upstream import UpstreamPool
+import metrics
+import tracing
+from resilience import AdaptiveTimeout
 
 router = APIRouter(prefix="/rvc", tags=["rvc"])
 
 # RVC client singleton
-rvc_client: Optional[httpx.AsyncClient] = None
+rvc_client: Optional[UpstreamPool] = None
+
+# Connections per RVC instance (conversions are long; a few in flight saturate a GPU)
+RVC_MAX_CONNECTIONS = 10
 
 
 # Separation Request Model
@@ -37,102 +47,162 @@ class SeparationRequest(BaseModel):
     overlap: float = Field(0.25, ge=0.0, le=0.5, description="Overlap ratio")
 
 
-async def get_rvc_client() -> httpx.AsyncClient:
-    """Get or create RVC client with Cloudflare Tunnel URL"""
+def _create_rvc_http_client(rvc_url: str) -> httpx.AsyncClient:
+    """HTTP client for one RVC instance"""
+    return httpx.AsyncClient(
+        base_url=rvc_url,
+        timeout=httpx.Timeout(
+            connect=10.0,
+            read=120.0,  # Longer timeout for processing
+            write=120.0,
+            pool=120.0
+        ),
+        limits=httpx.Limits(
+            max_keepalive_connections=5,
+            max_connections=RVC_MAX_CONNECTIONS
+        )
+    )
+
+
+async def get_rvc_client() -> UpstreamPool:
+    """Get or create the RVC client (balanced over every configured instance)"""
     global rvc_client
     if rvc_client is None:
-        rvc_url = config.get_rvc_url()
-        logger.info(f"Initializing RVC client with URL: {rvc_url}")
-        rvc_client = httpx.AsyncClient(
-            base_url=rvc_url,
-            timeout=httpx.Timeout(
-                connect=10.0,
-                read=120.0,  # Longer timeout for processing
-                write=120.0,
-                pool=120.0
+        rvc_urls = config.get_rvc_urls()
+        logger.info(f"Initializing RVC client with URLs: {', '.join(rvc_urls)}")
+        rvc_client = UpstreamPool(
+            "rvc",
+            rvc_urls,
+            _create_rvc_http_client,
+            eject_after=config.UPSTREAM_EJECT_AFTER,
+            eject_seconds=config.UPSTREAM_EJECT_SECONDS,
+            timeouts=AdaptiveTimeout(
+                factor=config.ADAPTIVE_TIMEOUT_FACTOR,
+                minimum=config.RVC_ADAPTIVE_TIMEOUT_MIN,
+                maximum=120.0
             ),
-            limits=httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10
-            )
+            max_connections=RVC_MAX_CONNECTIONS
         )
     return rvc_client
 
 
+def estimate_audio_seconds(audio_base64: str) -> float:
+    """Rough audio duration from base64 size, assuming 16-bit mono at DEFAULT_SAMPLE_RATE"""
+    return len(audio_base64) * 3 / 4 / (config.DEFAULT_SAMPLE_RATE * 2)
+
+
+def conversion_payload(request: RVCRequest) -> Dict[str, Any]:
+    """Body of an RVC server conversion request"""
+    return {
+        "audio_base64": request.audio_base64,
+        "model_name": request.model_name,
+        "f0method": request.f0method,
+        "protect": request.protect,
+        "index_rate": request.index_rate,
+        "filter_radius": request.filter_radius
+    }
+
+
+async def render_conversion(request: RVCRequest) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Run one RVC conversion
+    
+    Shared by the synchronous endpoint and background jobs.
+    
+    Returns:
+        (WAV bytes, result dict without audio)
+    """
+    if not config.ENABLE_REAL_SERVICES:
+        # Mock mode: return original audio
+        logger.warning(f"Real services disabled. Using mock RVC for model: {request.model_name}")
+        return base64.b64decode(request.audio_base64), {
+            "model": request.model_name,
+            "mock": True
+        }
+    
+    # Connect to real RVC service
+    client = await get_rvc_client()
+    
+    # Send conversion request (raw WAV preferred; older RVC servers answer with JSON)
+    convert_response = await client.post(
+        "/convert",
+        json=conversion_payload(request),
+        headers={"Accept": "audio/wav, application/json;q=0.5"},
+        work=estimate_audio_seconds(request.audio_base64)
+    )
+    convert_response.raise_for_status()
+    
+    if convert_response.headers.get("content-type", "").startswith("audio/"):
+        audio_bytes = convert_response.content
+        processing_time = float(convert_response.headers.get("X-Processing-Time", 0))
+    else:
+        with tracing.span("decode"):
+            result_data = convert_response.json()
+            audio_bytes = base64.b64decode(result_data.get("audio_base64") or "")
+        processing_time = result_data.get("processing_time", 0)
+    
+    metrics.record_audio("rvc", audio_bytes)
+    return audio_bytes, {
+        "model": request.model_name,
+        "processing_time": processing_time
+    }
+
+
 @router.post("/convert", response_model=TaskResponse)
-async def convert_voice(request: RVCRequest):
+async def convert_voice(
+    request: RVCRequest,
+    http_request: Request,
+    format: Optional[str] = Query(None, pattern="^(json|binary)$"),
+    background: bool = Query(False, description="Queue the work and return the task immediately")
+):
     """
     Convert voice using RVC
     
     Args:
         request: Audio + model + parameters
+        format: "binary" for raw WAV bytes, "json" for TaskResponse
+            (default: negotiated from the Accept header, JSON otherwise)
+        background: Return a QUEUED task (202) and convert on the job queue;
+            poll GET /tasks/{task_id} and fetch GET /tasks/{task_id}/result
         
     Returns:
-        Task with converted audio (base64)
+        Task with converted audio (base64), or raw WAV with task metadata in X-Task-* headers
     """
+    if background:
+        async def work(job: Job) -> Dict[str, Any]:
+            audio_bytes, result = await render_conversion(request)
+            job.add_artifact("audio", audio_bytes)
+            return result
+        
+        return submit_task(TaskType.RVC, work)
+    
     task_id = str(uuid.uuid4())
     now = datetime.utcnow()
+    binary = wants_binary(http_request, format)
     
     try:
-        if not config.ENABLE_REAL_SERVICES:
-            # Mock mode
-            logger.warning(f"Real services disabled. Using mock RVC for task: {task_id}")
-            return TaskResponse(
-                task_id=task_id,
-                type=TaskType.RVC,
-                status=TaskStatus.COMPLETED,
-                progress=100.0,
-                result={
-                    "audio_base64": request.audio_base64,  # Return original audio in mock mode
-                    "model": request.model_name,
-                    "mock": True
-                },
-                created_at=now,
-                updated_at=datetime.utcnow()
-            )
-        
-        # Connect to real RVC service
-        client = await get_rvc_client()
-        
-        # Prepare conversion request
-        conversion_data = {
-            "audio_base64": request.audio_base64,
-            "model_name": request.model_name,
-            "f0method": request.f0method,
-            "protect": request.protect,
-            "index_rate": request.index_rate,
-            "filter_radius": request.filter_radius
-        }
-        
         logger.info(f"Starting RVC conversion for task {task_id} with model {request.model_name}")
-        
-        # Send conversion request
-        convert_response = await client.post(
-            "/convert",
-            json=conversion_data
-        )
-        convert_response.raise_for_status()
-        result_data = convert_response.json()
-        
+        audio_bytes, result = await render_conversion(request)
         logger.info(f"RVC conversion completed: {task_id}")
         
+        if binary:
+            return audio_response(audio_bytes, task_id, TaskType.RVC, result, created_at=now)
+        
+        with tracing.span("encode"):
+            result["audio_base64"] = base64.b64encode(audio_bytes).decode('utf-8')
         return TaskResponse(
             task_id=task_id,
             type=TaskType.RVC,
             status=TaskStatus.COMPLETED,
             progress=100.0,
-            result={
-                "audio_base64": result_data.get("audio_base64"),
-                "model": request.model_name,
-                "processing_time": result_data.get("processing_time", 0)
-            },
+            result=result,
             created_at=now,
             updated_at=datetime.utcnow()
         )
         
     except httpx.HTTPError as e:
         logger.error(f"RVC API error for task {task_id}: {e}")
-        return TaskResponse(
+        task = TaskResponse(
             task_id=task_id,
             type=TaskType.RVC,
             status=TaskStatus.FAILED,
@@ -141,9 +211,10 @@ async def convert_voice(request: RVCRequest):
             created_at=now,
             updated_at=datetime.utcnow()
         )
+        return failed_task_response(task, status_code=502) if binary else task
     except Exception as e:
         logger.error(f"Unexpected error in RVC conversion for task {task_id}: {e}")
-        return TaskResponse(
+        task = TaskResponse(
             task_id=task_id,
             type=TaskType.RVC,
             status=TaskStatus.FAILED,
@@ -152,61 +223,162 @@ async def convert_voice(request: RVCRequest):
             created_at=now,
             updated_at=datetime.utcnow()
         )
+        return failed_task_response(task, status_code=500) if binary else task
+
+
+@router.post("/convert/stream")
+async def convert_voice_stream(request: RVCRequest):
+    """
+    Convert long audio in segments, streaming WAV as each segment finishes
+    
+    The RVC server cuts the clip near silence every segment_seconds,
+    converts the segments one by one and joins them with crossfades, so the
+    first audio arrives after one segment and server memory stays flat for
+    clips up to MAX_AUDIO_LENGTH.
+    
+    Args:
+        request: Audio + model + parameters + segment_seconds / overlap_seconds / split
+        
+    Returns:
+        16-bit PCM WAV stream (sizes in the header are 0xFFFFFFFF, as the length is not known up front)
+    """
+    if not config.ENABLE_REAL_SERVICES:
+        # Mock mode: stream the original audio
+        logger.warning(f"Real services disabled. Using mock RVC stream for model: {request.model_name}")
+        audio_bytes = base64.b64decode(request.audio_base64)
+        return StreamingResponse(
+            iter([audio_bytes[i:i + 65536] for i in range(0, len(audio_bytes), 65536)]),
+            media_type="audio/wav"
+        )
+    
+    client = await get_rvc_client()
+    payload = conversion_payload(request)
+    payload["split"] = request.split
+    if request.segment_seconds is not None:
+        payload["segment_seconds"] = request.segment_seconds
+    if request.overlap_seconds is not None:
+        payload["overlap_seconds"] = request.overlap_seconds
+    
+    try:
+        upstream_response = await client.post("/convert/stream", json=payload, stream=True)
+    except httpx.HTTPError as e:
+        logger.error(f"RVC stream request failed: {e}")
+        raise HTTPException(status_code=502, detail=f"RVC service error: {str(e)}")
+    
+    # Errors (unknown model, full queue, undecodable audio) arrive before any audio
+    if upstream_response.status_code >= 400:
+        await upstream_response.aread()
+        await upstream_response.aclose()
+        try:
+            detail = upstream_response.json().get("detail")
+        except ValueError:
+            detail = upstream_response.text
+        retry_after = upstream_response.headers.get("Retry-After")
+        # 503 + Retry-After (queue full) is passed on so clients can back off
+        raise HTTPException(
+            status_code=upstream_response.status_code if upstream_response.status_code < 500 or retry_after else 502,
+            detail=f"RVC service error: {detail}",
+            headers={"Retry-After": retry_after} if retry_after else None
+        )
+    
+    async def relay():
+        sent = 0
+        try:
+            async for chunk in upstream_response.aiter_raw():
+                sent += len(chunk)
+                yield chunk
+        except httpx.HTTPError as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error(f"RVC stream interrupted after {sent} bytes: {e}")
+        finally:
+            await upstream_response.aclose()
+            metrics.audio_bytes.inc(sent, kind="rvc")
+    
+    return StreamingResponse(
+        relay(),
+        media_type="audio/wav",
+        headers={
+            "X-Model": request.model_name,
+            "X-Segments": upstream_response.headers.get("X-Segments", "")
+        }
+    )
+
+
+async def render_separation(request: SeparationRequest) -> Dict[str, Any]:
+    """
+    Run one vocal separation
+    
+    Returns:
+        Result with vocals_base64 / instrumental_base64
+    """
+    if not config.ENABLE_REAL_SERVICES:
+        # Mock mode
+        logger.warning("Real services disabled. Using mock separation")
+        return {
+            "vocals_base64": request.audio_base64,
+            "instrumental_base64": request.audio_base64,
+            "mock": True
+        }
+    
+    # Connect to RVC service (which includes Demucs)
+    client = await get_rvc_client()
+    
+    # Prepare separation request
+    separation_data = {
+        "audio_base64": request.audio_base64,
+        "model": request.model,
+        "shifts": request.shifts,
+        "overlap": request.overlap
+    }
+    
+    # Send separation request
+    separate_response = await client.post(
+        "/separate",
+        json=separation_data,
+        work=estimate_audio_seconds(request.audio_base64)
+    )
+    separate_response.raise_for_status()
+    result_data = separate_response.json()
+    
+    # The RVC server calls the second stem "accompaniment" and reports stage timings in ms
+    return {
+        "vocals_base64": result_data.get("vocals_base64"),
+        "instrumental_base64": result_data.get("accompaniment_base64"),
+        "processing_time": round(sum((result_data.get("timings") or {}).values()) / 1000, 3)
+    }
 
 
 @router.post("/separate", response_model=TaskResponse)
-async def separate_vocals(request: SeparationRequest):
+async def separate_vocals(
+    request: SeparationRequest,
+    background: bool = Query(False, description="Queue the work and return the task immediately")
+):
     """
     Separate vocals from audio using Demucs
     
     Args:
         request: Audio + separation parameters
+        background: Return a QUEUED task (202) and separate on the job queue;
+            tracks are served by GET /tasks/{task_id}/result?track=vocals|instrumental
         
     Returns:
         Task with separated audio tracks (vocals and instrumental)
     """
+    if background:
+        async def work(job: Job) -> Dict[str, Any]:
+            result = await render_separation(request)
+            for track in ("vocals", "instrumental"):
+                job.add_artifact(track, base64.b64decode(result.pop(f"{track}_base64") or ""))
+            return result
+        
+        return submit_task(TaskType.SEPARATION, work)
+    
     task_id = str(uuid.uuid4())
     now = datetime.utcnow()
     
     try:
-        if not config.ENABLE_REAL_SERVICES:
-            # Mock mode
-            logger.warning(f"Real services disabled. Using mock separation for task: {task_id}")
-            return TaskResponse(
-                task_id=task_id,
-                type=TaskType.SEPARATION,
-                status=TaskStatus.COMPLETED,
-                progress=100.0,
-                result={
-                    "vocals_base64": request.audio_base64,
-                    "instrumental_base64": request.audio_base64,
-                    "mock": True
-                },
-                created_at=now,
-                updated_at=datetime.utcnow()
-            )
-        
-        # Connect to RVC service (which includes Demucs)
-        client = await get_rvc_client()
-        
-        # Prepare separation request
-        separation_data = {
-            "audio_base64": request.audio_base64,
-            "model": request.model,
-            "shifts": request.shifts,
-            "overlap": request.overlap
-        }
-        
         logger.info(f"Starting vocal separation for task {task_id} with model {request.model}")
-        
-        # Send separation request
-        separate_response = await client.post(
-            "/separate",
-            json=separation_data
-        )
-        separate_response.raise_for_status()
-        result_data = separate_response.json()
-        
+        result = await render_separation(request)
         logger.info(f"Vocal separation completed: {task_id}")
         
         return TaskResponse(
@@ -214,11 +386,7 @@ async def separate_vocals(request: SeparationRequest):
             type=TaskType.SEPARATION,
             status=TaskStatus.COMPLETED,
             progress=100.0,
-            result={
-                "vocals_base64": result_data.get("vocals_base64"),
-                "instrumental_base64": result_data.get("instrumental_base64"),
-                "processing_time": result_data.get("processing_time", 0)
-            },
+            result=result,
             created_at=now,
             updated_at=datetime.utcnow()
         )
@@ -285,7 +453,7 @@ async def load_model(model_name: str):
             }
         
         client = await get_rvc_client()
-        response = await client.post(f"/models/{model_name}/load")
+        response = await client.post(f"/models/{model_name}")
         response.raise_for_status()
         return response.json()
         
@@ -297,12 +465,27 @@ async def load_model(model_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _health_probe() -> Dict[str, Any]:
+    """Background health monitor probe for the RVC service (every instance; re-admits recovered ones)"""
+    client = await get_rvc_client()
+    details = await client.probe_backends("/health", timeout=config.HEALTH_CHECK_TIMEOUT)
+    health_data = [body for body in client.healthy_probe_bodies() if isinstance(body, dict)]
+    return {
+        "gpu_available": any(body.get("gpu_available", False) for body in health_data),
+        "models_loaded": sum(body.get("models_loaded", 0) for body in health_data),
+        # Conversions waiting on the instances' inference pools
+        "inference_queued": sum((body.get("executor") or {}).get("queued", 0) for body in health_data),
+        **details
+    }
+
+
+health_monitor.register("rvc", _health_probe)
+
+
 @router.get("/health")
 async def health_check():
-    """Check RVC service health"""
+    """Check RVC service health (latest background probe snapshot)"""
     try:
-        start_time = time.time()
-        
         if not config.ENABLE_REAL_SERVICES:
             return {
                 "rvc": True,
@@ -311,22 +494,23 @@ async def health_check():
                 "service_url": "mock://localhost"
             }
         
-        client = await get_rvc_client()
-        response = await client.get("/health", timeout=5.0)
-        is_healthy = response.status_code == 200
-        
-        response_time = (time.time() - start_time) * 1000
+        snapshot = await health_monitor.snapshot("rvc")
+        is_healthy = snapshot["available"]
         
-        result = response.json() if is_healthy else {}
-        
-        return {
+        result = {
             "rvc": is_healthy,
-            "status": "healthy" if is_healthy else "degraded",
-            "response_time_ms": round(response_time, 2),
+            "status": "healthy" if is_healthy else "unhealthy",
+            "response_time_ms": snapshot["response_time_ms"],
             "service_url": config.get_rvc_url(),
-            "models_loaded": result.get("models_loaded", 0),
-            "gpu_available": result.get("gpu_available", False)
+            "models_loaded": snapshot.get("models_loaded", 0),
+            "gpu_available": snapshot.get("gpu_available", False),
+            "inference_queued": snapshot.get("inference_queued", 0),
+            "checked_at": snapshot["checked_at"],
+            "latency": snapshot["latency"]
         }
+        if snapshot["error"]:
+            result["error"] = snapshot["error"]
+        return result
     except Exception as e:
         logger.error(f"RVC health check failed: {e}")
         return {
@@ -0,0 +1,126 @@
+"""
+Tasks Router - Background job polling and event stream endpoints
+Tasks are submitted with ?background=true on the TTS/RVC endpoints
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from loguru import logger
+import asyncio
+import json
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import TaskResponse, TaskStatus
+from config import config
+from responses import audio_response
+from jobs import Job, job_manager
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+def _get_job(task_id: str) -> Job:
+    job = job_manager.get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Task not found: {task_id}")
+    return job
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: str):
+    """
+    Poll a background task
+
+    Returns:
+        Task with status, progress and (once completed) result metadata;
+        result["tracks"] lists the audio available from /tasks/{task_id}/result
+    """
+    return _get_job(task_id).to_response()
+
+
+@router.get("/{task_id}/result")
+async def get_task_result(
+    task_id: str,
+    track: str = Query("audio", description="audio | vocals | instrumental")
+):
+    """
+    Download the audio of a completed task as raw WAV
+
+    Partial tracks (e.g. "line-3" of a batch) can be downloaded as soon as
+    their "partial" event has been sent, before the task completes.
+
+    Returns:
+        WAV bytes with task metadata in X-Task-* headers (409 while the track is not ready yet)
+    """
+    job = _get_job(task_id)
+
+    if track not in job.artifacts:
+        if job.status != TaskStatus.COMPLETED:
+            raise HTTPException(status_code=409, detail=f"Task is {job.status.value}")
+        raise HTTPException(status_code=404, detail=f"Track not found: {track}")
+
+    return audio_response(job.artifacts[track], job.task_id, job.type, job.result or {}, created_at=job.created_at)
+
+
+@router.delete("/{task_id}", response_model=TaskResponse)
+async def cancel_task(task_id: str):
+    """Cancel a queued or running task (completed tasks are returned unchanged)"""
+    _get_job(task_id)
+    job = job_manager.cancel(task_id)
+    logger.info(f"Cancel requested for task {task_id}: {job.status.value}")
+    return job.to_response()
+
+
+def format_sse(event_id: int, event: str, data: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+async def stream_task_events(job: Job):
+    """
+    Yield the current state, then every status/progress/partial event until
+    the task finishes; a comment line keeps idle connections open
+    """
+    queue = job.subscribe()
+    try:
+        yield format_sse(job.last_event_id, "status", job.status_event())
+        if job.finished:
+            return
+
+        while True:
+            try:
+                event_id, event, data = await asyncio.wait_for(queue.get(), timeout=config.TASK_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield format_sse(event_id, event, data)
+            if event == "status" and data["status"] in (TaskStatus.COMPLETED.value, TaskStatus.FAILED.value):
+                return
+    finally:
+        job.unsubscribe(queue)
+
+
+@router.get("/{task_id}/events")
+async def get_task_events(task_id: str):
+    """
+    Server-Sent Events stream for a background task
+
+    Events:
+        status: full TaskResponse on every transition (queued, processing, completed, failed)
+        progress: {"task_id", "progress", ...} with per-line/per-chunk detail
+        partial: {"task_id", "track", "bytes", ...} when a track becomes downloadable
+
+    The stream closes after the final status event.
+    """
+    job = _get_job(task_id)
+    return StreamingResponse(
+        stream_task_events(job),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering
+        }
+    )
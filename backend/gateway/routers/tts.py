@@ -2,9 +2,9 @@
 TTS Router - Text-to-Speech endpoints
 Integrates with AivisSpeech Engine via Cloudflare Tunnel
 """
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from typing import Dict, Any, List, Optional, Callable, Tuple, Awaitable, Set
 from pydantic import BaseModel, Field
 import base64
 import uuid
@@ -15,14 +15,35 @@ import struct
 import wave
 import httpx
 import time
+import asyncio
+import copy
+import functools
+import math
+import unicodedata
 import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Backend root, for the shared aivisspeech package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from models import TTSRequest, TaskResponse, TaskType, TaskStatus
 from config import config
+from cache import AudioCache, QueryCache, make_cache_key
+from responses import wants_binary, audio_response, failed_task_response
+from text_chunker import split_text
+from audio import WavAssembler, WavFormat, WavFormatError, concatenate_wav, iter_concatenated_wav, wav_header
+from singleflight import SingleFlight
+from speakers import SpeakerCatalog, etag_matches
+from health import health_monitor
+from jobs import Job, submit_task
+from reading_sessions import ReadingSessionManager
+from upstream import UpstreamPool
+import metrics
+import tracing
+from resilience import AdaptiveTimeout
+from aivisspeech.client import AivisSpeechClient
 
 
 # Batch TTS Request Model
@@ -34,6 +55,36 @@ class BatchTTSRequest(BaseModel):
     pitch_scale: float = Field(0.0, ge=-1.0, le=1.0)
     intonation_scale: float = Field(1.0, ge=0.0, le=2.0)
     volume_scale: float = Field(1.0, ge=0.0, le=2.0)
+    concurrency: Optional[int] = Field(None, ge=1, le=64, description="Lines synthesized in parallel")
+    stream: bool = Field(False, description="Stream lines progressively as they become ready")
+    gap_ms: Optional[int] = Field(None, ge=0, le=5000, description="Silence inserted between lines")
+    crossfade_ms: Optional[int] = Field(None, ge=0, le=1000, description="Overlap between lines (takes precedence over gap_ms)")
+
+
+# Lines accepted per request; longer scripts append the rest with POST /tts/sessions/{id}/lines
+READING_SESSION_PAGE_LINES = 1000
+
+
+# Reading Session Request Models
+class ReadingSessionRequest(BaseModel):
+    """Play All reading session: ordered lines + shared TTS parameters"""
+    lines: List[str] = Field(..., min_items=1, max_items=READING_SESSION_PAGE_LINES)
+    speaker_id: int = Field(..., ge=0)
+    speed_scale: float = Field(1.0, ge=0.5, le=2.0)
+    pitch_scale: float = Field(0.0, ge=-1.0, le=1.0)
+    intonation_scale: float = Field(1.0, ge=0.0, le=2.0)
+    volume_scale: float = Field(1.0, ge=0.0, le=2.0)
+    lookahead: Optional[int] = Field(None, ge=0, le=16, description="Lines synthesized ahead of the cursor")
+
+
+class ReadingSessionLinesRequest(BaseModel):
+    """Further lines of a reading session's script"""
+    lines: List[str] = Field(..., min_items=1, max_items=READING_SESSION_PAGE_LINES)
+
+
+class CursorRequest(BaseModel):
+    """Move a reading session's playback cursor"""
+    index: int = Field(..., ge=0)
 
 
 # Speaker Info Model
@@ -47,120 +98,440 @@ class SpeakerInfo(BaseModel):
 router = APIRouter(prefix="/tts", tags=["tts"])
 
 # AivisSpeech client singleton
-aivisspeech_client: Optional[httpx.AsyncClient] = None
+aivisspeech_client: Optional[UpstreamPool] = None
+
+# Engine API wrapper over aivisspeech_client (multi-query synthesis)
+aivisspeech_engine: Optional[AivisSpeechClient] = None
+
+# Rendered audio cache, keyed on (text, speaker, scales)
+tts_cache = AudioCache(
+    memory_bytes=config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_dir=config.TTS_CACHE_DIR or None,
+    disk_bytes=config.TTS_CACHE_DISK_MB * 1024 * 1024
+)
+
+# AudioQuery cache, keyed on (text, speaker) only
+query_cache = QueryCache(max_entries=config.TTS_QUERY_CACHE_SIZE)
+
+# Mock speakers served when real services are disabled
+MOCK_SPEAKERS = [
+    {"speaker_id": 0, "name": "Default", "styles": []},
+    {"speaker_id": 1, "name": "Female", "styles": []},
+    {"speaker_id": 2, "name": "Male", "styles": []}
+]
+
+
+async def fetch_speakers() -> List[Dict[str, Any]]:
+    """Fetch the full speaker list from AivisSpeech (used by speaker_catalog)"""
+    if not config.ENABLE_REAL_SERVICES:
+        return MOCK_SPEAKERS
+    
+    client = await get_aivisspeech_client()
+    response = await client.get("/speakers")
+    response.raise_for_status()
+    speakers = response.json()
+    return speakers if isinstance(speakers, list) else []
+
+
+# Speaker catalog, refreshed in the background every TTS_SPEAKERS_TTL seconds
+speaker_catalog = SpeakerCatalog(fetch_speakers, ttl=config.TTS_SPEAKERS_TTL)
+
+# Coalesce identical in-flight upstream work (same keys as the caches above)
+synthesis_flight = SingleFlight("synthesis")
+query_flight = SingleFlight("audio_query")
+
+# Open Play All reading sessions
+reading_sessions = ReadingSessionManager(ttl=config.READING_SESSION_TTL)
+
+
+def _create_aivisspeech_http_client(aivisspeech_url: str) -> httpx.AsyncClient:
+    """HTTP client for one AivisSpeech instance"""
+    return httpx.AsyncClient(
+        base_url=aivisspeech_url,
+        timeout=httpx.Timeout(
+            connect=10.0,
+            read=30.0,
+            write=30.0,
+            pool=30.0
+        ),
+        limits=httpx.Limits(
+            max_keepalive_connections=config.AIVISSPEECH_MAX_KEEPALIVE,
+            max_connections=config.AIVISSPEECH_MAX_CONNECTIONS
+        )
+    )
 
 
-async def get_aivisspeech_client() -> httpx.AsyncClient:
-    """Get or create AivisSpeech client with Cloudflare Tunnel URL"""
+async def get_aivisspeech_client() -> UpstreamPool:
+    """Get or create the AivisSpeech client (balanced over every configured instance)"""
     global aivisspeech_client
     if aivisspeech_client is None:
-        aivisspeech_url = config.get_aivisspeech_url()
-        logger.info(f"Initializing AivisSpeech client with URL: {aivisspeech_url}")
-        aivisspeech_client = httpx.AsyncClient(
-            base_url=aivisspeech_url,
-            timeout=httpx.Timeout(
-                connect=10.0,
-                read=30.0,
-                write=30.0,
-                pool=30.0
+        aivisspeech_urls = config.get_aivisspeech_urls()
+        logger.info(f"Initializing AivisSpeech client with URLs: {', '.join(aivisspeech_urls)}")
+        aivisspeech_client = UpstreamPool(
+            "aivisspeech",
+            aivisspeech_urls,
+            _create_aivisspeech_http_client,
+            eject_after=config.UPSTREAM_EJECT_AFTER,
+            eject_seconds=config.UPSTREAM_EJECT_SECONDS,
+            timeouts=AdaptiveTimeout(
+                factor=config.ADAPTIVE_TIMEOUT_FACTOR,
+                minimum=config.ADAPTIVE_TIMEOUT_MIN,
+                maximum=30.0
             ),
-            limits=httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10
-            )
+            max_connections=config.AIVISSPEECH_MAX_CONNECTIONS
         )
     return aivisspeech_client
 
 
-@router.post("/synthesize", response_model=TaskResponse)
-async def synthesize_speech(request: TTSRequest):
+def normalize_text(text: str) -> str:
+    """Normalize text for cache/coalescing keys (Unicode NFC)"""
+    return unicodedata.normalize("NFC", text)
+
+
+def tts_cache_key(text: str, params: BaseModel, output_sample_rate: Optional[int] = None) -> str:
+    """Content address of a rendered line, over the normalized request"""
+    return make_cache_key(
+        "tts",
+        normalize_text(text),
+        params.speaker_id,
+        round(params.speed_scale, 4),
+        round(params.pitch_scale, 4),
+        round(params.intonation_scale, 4),
+        round(params.volume_scale, 4),
+        output_sample_rate
+    )
+
+
+async def synthesize_text(
+    client: httpx.AsyncClient,
+    text: str,
+    params: BaseModel,
+    output_sample_rate: Optional[int] = None
+) -> bytes:
     """
-    Synthesize speech from text using AivisSpeech Engine
+    Run /audio_query + /synthesis for a single text, served from tts_cache when possible
+    
+    Concurrent identical requests share a single upstream round trip.
     
     Args:
-        request: TTS parameters
+        client: AivisSpeech HTTP client
+        text: Text to synthesize
+        params: Request carrying speaker_id and the *_scale parameters
+        output_sample_rate: Force mono output at this rate (engine default if None)
         
     Returns:
-        Task with audio result (base64)
+        WAV file bytes
     """
-    task_id = str(uuid.uuid4())
-    now = datetime.utcnow()
+    cache_key = tts_cache_key(text, params, output_sample_rate)
+    with tracing.span("cache.lookup"):
+        cached = await tts_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"TTS cache hit: {cache_key[:12]}")
+        return cached
     
-    try:
-        if not config.ENABLE_REAL_SERVICES:
-            # Fallback to mock mode
-            logger.warning(f"Real services disabled. Using mock TTS for task: {task_id}")
-            wav_data = create_mock_wav_data(duration_seconds=2.0)
-            audio_base64 = base64.b64encode(wav_data).decode('utf-8')
-            
-            return TaskResponse(
-                task_id=task_id,
-                type=TaskType.TTS,
-                status=TaskStatus.COMPLETED,
-                progress=100.0,
-                result={
-                    "audio_base64": audio_base64,
-                    "speaker_id": request.speaker_id,
-                    "mock": True
-                },
-                created_at=now,
-                updated_at=datetime.utcnow()
-            )
-        
-        # Connect to real AivisSpeech service
-        client = await get_aivisspeech_client()
-        
-        # Step 1: Create audio query
-        logger.info(f"Creating audio query for task {task_id}")
+    async def render() -> bytes:
+        wav_data = await _synthesize_upstream(client, text, params, output_sample_rate)
+        await tts_cache.put(cache_key, wav_data)
+        return wav_data
+    
+    return await synthesis_flight.do(cache_key, render)
+
+
+async def get_audio_query(client: httpx.AsyncClient, text: str, speaker_id: int) -> Dict[str, Any]:
+    """
+    Get AudioQuery JSON for (text, speaker), served from query_cache when possible
+    
+    Returns:
+        A private copy of the AudioQuery that the caller may modify
+    """
+    cache_key = make_cache_key("audio_query", normalize_text(text), speaker_id)
+    audio_query = query_cache.get(cache_key)
+    if audio_query is not None:
+        return audio_query
+    
+    async def fetch() -> Dict[str, Any]:
         query_response = await client.post(
             "/audio_query",
             params={
-                "text": request.text,
-                "speaker": request.speaker_id
-            }
+                "text": text,
+                "speaker": speaker_id
+            },
+            work=len(text)
         )
         query_response.raise_for_status()
         audio_query = query_response.json()
-        
-        # Step 2: Apply TTS parameters
-        audio_query['speedScale'] = request.speed_scale
-        audio_query['pitchScale'] = request.pitch_scale
-        audio_query['intonationScale'] = request.intonation_scale
-        audio_query['volumeScale'] = request.volume_scale
-        
-        # Step 3: Synthesize audio
-        logger.info(f"Synthesizing audio for task {task_id}")
-        synthesis_response = await client.post(
-            "/synthesis",
-            params={"speaker": request.speaker_id},
-            json=audio_query,
-            headers={"Content-Type": "application/json"}
+        query_cache.put(cache_key, audio_query)
+        return audio_query
+    
+    # The shared result is handed to every coalesced waiter, so copy it
+    return copy.deepcopy(await query_flight.do(cache_key, fetch))
+
+
+async def _synthesize_upstream(
+    client: httpx.AsyncClient,
+    text: str,
+    params: BaseModel,
+    output_sample_rate: Optional[int] = None
+) -> bytes:
+    """Uncached /synthesis round trip (the AudioQuery itself may come from query_cache)"""
+    # Step 1: Create audio query (skips morphological analysis on a cache hit)
+    audio_query = await get_audio_query(client, text, params.speaker_id)
+    
+    # Step 2: Apply TTS parameters
+    apply_tts_params(audio_query, params, output_sample_rate)
+    
+    # Step 3: Synthesize audio
+    synthesis_response = await client.post(
+        "/synthesis",
+        params={"speaker": params.speaker_id},
+        json=audio_query,
+        headers={"Content-Type": "application/json"},
+        work=len(text)
+    )
+    synthesis_response.raise_for_status()
+    
+    return synthesis_response.content
+
+
+def apply_tts_params(audio_query: Dict[str, Any], params: BaseModel, output_sample_rate: Optional[int] = None) -> None:
+    """Patch the request's scales (and optional mono output rate) into an AudioQuery"""
+    audio_query['speedScale'] = params.speed_scale
+    audio_query['pitchScale'] = params.pitch_scale
+    audio_query['intonationScale'] = params.intonation_scale
+    audio_query['volumeScale'] = params.volume_scale
+    if output_sample_rate:
+        audio_query['outputSamplingRate'] = output_sample_rate
+        audio_query['outputStereo'] = False
+
+
+def get_aivisspeech_engine(client: UpstreamPool) -> AivisSpeechClient:
+    """AivisSpeechClient sending through the shared client (for /multi_synthesis)"""
+    global aivisspeech_engine
+    if aivisspeech_engine is None or aivisspeech_engine.client is not client:
+        aivisspeech_engine = AivisSpeechClient(base_url="", client=client)
+    return aivisspeech_engine
+
+
+async def synthesize_group(
+    client: httpx.AsyncClient,
+    texts: List[str],
+    params: BaseModel,
+    output_sample_rate: Optional[int] = None
+) -> List[Any]:
+    """
+    Synthesize several lines with a single /multi_synthesis round trip
+    
+    Cached lines are served from tts_cache. The rest go through
+    synthesis_flight like single lines: a line already being synthesized
+    elsewhere joins that call, and only the lines this group leads are sent.
+    If the grouped call fails, the lines are retried one by one so a single
+    bad line does not silence its neighbours.
+    
+    Returns:
+        WAV bytes, or the exception that line failed with, per text
+    """
+    keys = [tts_cache_key(text, params, output_sample_rate) for text in texts]
+    with tracing.span("cache.lookup", lines=len(keys)):
+        results: List[Any] = list(await asyncio.gather(*(tts_cache.get(key) for key in keys)))
+    missing = [i for i, cached in enumerate(results) if cached is None]
+    if not missing:
+        return results
+    
+    leaders: List[int] = []
+    waiting: Set[int] = set()
+    group: Optional["asyncio.Future[Dict[int, Any]]"] = None
+    
+    async def render_group(lines: List[int]) -> Dict[int, Any]:
+        rendered: Dict[int, Any] = {}
+        queries = await asyncio.gather(
+            *(get_audio_query(client, texts[i], params.speaker_id) for i in lines),
+            return_exceptions=True
         )
-        synthesis_response.raise_for_status()
+        pending = []
+        for i, audio_query in zip(lines, queries):
+            if isinstance(audio_query, BaseException):
+                rendered[i] = audio_query
+            else:
+                apply_tts_params(audio_query, params, output_sample_rate)
+                pending.append((i, audio_query))
+        if not pending:
+            return rendered
+        
+        engine = get_aivisspeech_engine(client)
+        try:
+            wav_data_list = await engine.synthesize_many(
+                [audio_query for _, audio_query in pending],
+                params.speaker_id,
+                concurrency=len(pending)
+            )
+        except Exception as e:
+            logger.warning(f"Grouped synthesis of {len(pending)} lines failed ({e}), retrying line by line")
+            # Straight upstream: these lines' flights are the ones waiting on this group
+            wav_data_list = await asyncio.gather(
+                *(_synthesize_upstream(client, texts[i], params, output_sample_rate) for i, _ in pending),
+                return_exceptions=True
+            )
+        rendered.update((i, wav_data) for (i, _), wav_data in zip(pending, wav_data_list))
+        return rendered
+    
+    async def render_line(i: int) -> bytes:
+        nonlocal group
+        if group is None:
+            # Every line's flight is registered before the first one runs
+            waiting.update(leaders)
+            group = asyncio.ensure_future(render_group(list(leaders)))
+        try:
+            wav_data = (await asyncio.shield(group))[i]
+        except asyncio.CancelledError:
+            # Stop the upstream call once no led line is wanted any more
+            waiting.discard(i)
+            if not waiting:
+                group.cancel()
+            raise
+        if isinstance(wav_data, BaseException):
+            raise wav_data
+        await tts_cache.put(keys[i], wav_data)
+        return wav_data
+    
+    def lead(i: int) -> Awaitable[bytes]:
+        leaders.append(i)
+        return render_line(i)
+    
+    flights = await asyncio.gather(
+        *(synthesis_flight.do(keys[i], functools.partial(lead, i)) for i in missing),
+        return_exceptions=True
+    )
+    for i, wav_data in zip(missing, flights):
+        results[i] = wav_data
+    return results
+
+
+async def synthesize_chunks(
+    client: httpx.AsyncClient,
+    chunks: List[str],
+    params: BaseModel,
+    on_progress: Optional[Callable[[float], None]] = None
+) -> bytes:
+    """
+    Synthesize text chunks in parallel and join them in reading order
+    
+    Unlike batch lines, a failed chunk fails the whole text rather than
+    being replaced with silence.
+    """
+    semaphore = asyncio.Semaphore(config.get_tts_batch_concurrency())
+    done = 0
+    
+    async def synthesize_chunk(text: str) -> bytes:
+        nonlocal done
+        async with semaphore:
+            wav_data = await synthesize_text(client, text, params)
+        done += 1
+        if on_progress:
+            on_progress(done / len(chunks) * 100.0)
+        return wav_data
+    
+    wav_data_list = await asyncio.gather(*(synthesize_chunk(text) for text in chunks))
+    with tracing.span("assemble", chunks=len(chunks)):
+        return concatenate_wav(wav_data_list)
+
+
+async def render_speech(
+    request: TTSRequest,
+    on_progress: Optional[Callable[[float], None]] = None
+) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Produce the audio and result metadata for a TTS request
+    
+    Shared by the synchronous endpoint and background jobs.
+    
+    Returns:
+        (WAV bytes, result dict without audio)
+    """
+    if not config.ENABLE_REAL_SERVICES:
+        # Fallback to mock mode
+        logger.warning("Real services disabled. Using mock TTS")
+        wav_data = create_mock_wav_data(duration_seconds=2.0)
+        return wav_data, {
+            "speaker_id": request.speaker_id,
+            "mock": True
+        }
+    
+    # Connect to real AivisSpeech service
+    client = await get_aivisspeech_client()
+    
+    if len(request.text) > config.TTS_CHUNK_THRESHOLD:
+        # Long text: bound latency by chunk size instead of total length
+        with tracing.span("chunking"):
+            chunks = split_text(request.text, config.TTS_CHUNK_MAX_CHARS)
+        logger.info(f"Synthesizing audio in {len(chunks)} chunks")
+        wav_data = await synthesize_chunks(client, chunks, request, on_progress)
+    else:
+        chunks = [request.text]
+        wav_data = await synthesize_text(client, request.text, request)
+    
+    metrics.record_audio("tts", wav_data)
+    return wav_data, {
+        "speaker_id": request.speaker_id,
+        "text_length": len(request.text),
+        "chunks": len(chunks)
+    }
+
+
+@router.post("/synthesize", response_model=TaskResponse)
+async def synthesize_speech(
+    request: TTSRequest,
+    http_request: Request,
+    format: Optional[str] = Query(None, pattern="^(json|binary)$"),
+    background: bool = Query(False, description="Queue the work and return the task immediately")
+):
+    """
+    Synthesize speech from text using AivisSpeech Engine
+    
+    Args:
+        request: TTS parameters
+        format: "binary" for raw WAV bytes, "json" for TaskResponse
+            (default: negotiated from the Accept header, JSON otherwise)
+        background: Return a QUEUED task (202) and synthesize on the job queue;
+            poll GET /tasks/{task_id} and fetch GET /tasks/{task_id}/result
         
-        # Get WAV audio data
-        wav_data = synthesis_response.content
-        audio_base64 = base64.b64encode(wav_data).decode('utf-8')
+    Returns:
+        Task with audio result (base64), or raw WAV with task metadata in X-Task-* headers
+    """
+    if background:
+        async def work(job: Job) -> Dict[str, Any]:
+            wav_data, result = await render_speech(request, job.set_progress)
+            job.add_artifact("audio", wav_data)
+            return result
         
+        return submit_task(TaskType.TTS, work)
+    
+    task_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    binary = wants_binary(http_request, format)
+    
+    try:
+        logger.info(f"Synthesizing audio for task {task_id}")
+        wav_data, result = await render_speech(request)
         logger.info(f"TTS synthesis completed: {task_id}")
         
+        if binary:
+            return audio_response(wav_data, task_id, TaskType.TTS, result, created_at=now)
+        
+        with tracing.span("encode"):
+            result["audio_base64"] = base64.b64encode(wav_data).decode('utf-8')
         return TaskResponse(
             task_id=task_id,
             type=TaskType.TTS,
             status=TaskStatus.COMPLETED,
             progress=100.0,
-            result={
-                "audio_base64": audio_base64,
-                "speaker_id": request.speaker_id,
-                "text_length": len(request.text)
-            },
+            result=result,
             created_at=now,
             updated_at=datetime.utcnow()
         )
         
     except httpx.HTTPError as e:
         logger.error(f"AivisSpeech API error for task {task_id}: {e}")
-        return TaskResponse(
+        task = TaskResponse(
             task_id=task_id,
             type=TaskType.TTS,
             status=TaskStatus.FAILED,
@@ -169,9 +540,10 @@ async def synthesize_speech(request: TTSRequest):
             created_at=now,
             updated_at=datetime.utcnow()
         )
+        return failed_task_response(task, status_code=502) if binary else task
     except Exception as e:
         logger.error(f"TTS synthesis failed for task {task_id}: {e}")
-        return TaskResponse(
+        task = TaskResponse(
             task_id=task_id,
             type=TaskType.TTS,
             status=TaskStatus.FAILED,
@@ -180,27 +552,26 @@ async def synthesize_speech(request: TTSRequest):
             created_at=now,
             updated_at=datetime.utcnow()
         )
+        return failed_task_response(task, status_code=500) if binary else task
 
 
 @router.get("/speakers")
-async def get_speakers():
-    """Get available speakers/styles from AivisSpeech"""
+async def get_speakers(http_request: Request):
+    """
+    Get available speakers/styles from AivisSpeech
+    
+    Served from the speaker catalog cache. Responses carry an ETag;
+    a matching If-None-Match returns 304 without a body.
+    """
     try:
-        if not config.ENABLE_REAL_SERVICES:
-            # Return mock speakers
-            return {
-                "speakers": [
-                    {"speaker_id": 0, "name": "Default", "styles": []},
-                    {"speaker_id": 1, "name": "Female", "styles": []},
-                    {"speaker_id": 2, "name": "Male", "styles": []}
-                ]
-            }
+        speakers = await speaker_catalog.get()
+        etag = speaker_catalog.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else {}
         
-        client = await get_aivisspeech_client()
-        response = await client.get("/speakers")
-        response.raise_for_status()
+        if etag_matches(http_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
         
-        return {"speakers": response.json()}
+        return JSONResponse(content={"speakers": speakers}, headers=headers)
         
     except httpx.HTTPError as e:
         logger.error(f"Failed to get speakers from AivisSpeech: {e}")
@@ -210,12 +581,42 @@ async def get_speakers():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/styles/{style_id}")
+async def get_style(style_id: int):
+    """Look up the speaker that owns a style id"""
+    try:
+        await speaker_catalog.get()
+    except Exception as e:
+        logger.error(f"Failed to load speaker catalog: {e}")
+        raise HTTPException(status_code=503, detail="AivisSpeech service unavailable")
+    
+    style = speaker_catalog.lookup_style(style_id)
+    if style is None:
+        raise HTTPException(status_code=404, detail=f"Style not found: {style_id}")
+    return style
+
+
+async def probe_aivisspeech(timeout: float = 5.0) -> httpx.Response:
+    """Cheap liveness probe (AIVISSPEECH_PROBE_PATH, /version by default)"""
+    client = await get_aivisspeech_client()
+    return await client.get(config.AIVISSPEECH_PROBE_PATH, timeout=timeout)
+
+
+async def _health_probe() -> Dict[str, Any]:
+    """Background health monitor probe for AivisSpeech (every instance; re-admits recovered ones)"""
+    client = await get_aivisspeech_client()
+    details = await client.probe_backends(config.AIVISSPEECH_PROBE_PATH, timeout=config.HEALTH_CHECK_TIMEOUT)
+    # Count from the speaker catalog cache instead of pulling /speakers
+    return {"speakers_count": speaker_catalog.stats()["speakers_count"], **details}
+
+
+health_monitor.register("aivisspeech", _health_probe)
+
+
 @router.get("/health")
 async def health_check():
-    """Check AivisSpeech Engine health"""
+    """Check AivisSpeech Engine health (latest background probe snapshot)"""
     try:
-        start_time = time.time()
-        
         if not config.ENABLE_REAL_SERVICES:
             return {
                 "aivisspeech": True,
@@ -224,18 +625,20 @@ async def health_check():
                 "service_url": "mock://localhost"
             }
         
-        client = await get_aivisspeech_client()
-        response = await client.get("/speakers", timeout=5.0)
-        is_healthy = response.status_code == 200
+        snapshot = await health_monitor.snapshot("aivisspeech")
+        is_healthy = snapshot["available"]
         
-        response_time = (time.time() - start_time) * 1000
-        
-        return {
+        result = {
             "aivisspeech": is_healthy,
-            "status": "healthy" if is_healthy else "degraded",
-            "response_time_ms": round(response_time, 2),
-            "service_url": config.get_aivisspeech_url()
+            "status": "healthy" if is_healthy else "unhealthy",
+            "response_time_ms": snapshot["response_time_ms"],
+            "service_url": config.get_aivisspeech_url(),
+            "checked_at": snapshot["checked_at"],
+            "latency": snapshot["latency"]
         }
+        if snapshot["error"]:
+            result["error"] = snapshot["error"]
+        return result
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return {
@@ -258,22 +661,21 @@ async def test_connection():
                 "message": "Running in mock mode. Set ENABLE_REAL_SERVICES=true to connect to real service."
             }
         
-        client = await get_aivisspeech_client()
         url = config.get_aivisspeech_url()
         
-        # Try to get speakers as a connection test
+        # Probe a lightweight endpoint as a connection test
         start_time = time.time()
-        response = await client.get("/speakers", timeout=10.0)
+        response = await probe_aivisspeech(timeout=10.0)
         response_time = (time.time() - start_time) * 1000
         
         if response.status_code == 200:
-            speakers = response.json()
+            speakers = await speaker_catalog.get()
             return {
                 "connected": True,
                 "service": "AivisSpeech",
                 "url": url,
                 "response_time_ms": round(response_time, 2),
-                "speakers_available": len(speakers) if isinstance(speakers, list) else 0,
+                "speakers_available": len(speakers),
                 "message": "Successfully connected to AivisSpeech service"
             }
         else:
@@ -329,121 +731,317 @@ def create_mock_wav_data(duration_seconds: float = 0.5, sample_rate: int = 44100
     return wav_buffer.read()
 
 
-def concatenate_wav_files(wav_data_list: List[bytes]) -> bytes:
-    """Concatenate multiple WAV files into one"""
-    if not wav_data_list:
-        return create_mock_wav_data()
-    
-    # Parse first WAV to get parameters
-    first_wav = io.BytesIO(wav_data_list[0])
-    with wave.open(first_wav, 'rb') as wav:
-        params = wav.getparams()
-        sample_rate = params.framerate
-        num_channels = params.nchannels
-        sample_width = params.sampwidth
-    
-    # Collect all audio samples
-    all_samples = []
-    for wav_data in wav_data_list:
-        wav_buffer = io.BytesIO(wav_data)
-        with wave.open(wav_buffer, 'rb') as wav:
-            frames = wav.readframes(wav.getnframes())
-            all_samples.append(frames)
-    
-    # Concatenate all samples
-    concatenated_samples = b''.join(all_samples)
-    
-    # Create output WAV
-    output_buffer = io.BytesIO()
-    with wave.open(output_buffer, 'wb') as out_wav:
-        out_wav.setnchannels(num_channels)
-        out_wav.setsampwidth(sample_width)
-        out_wav.setframerate(sample_rate)
-        out_wav.writeframes(concatenated_samples)
+async def stream_wav_lines(
+    line_tasks: List["asyncio.Task[bytes]"],
+    assembler: WavAssembler
+):
+    """
+    Yield a streaming WAV: the header immediately, then each line's PCM frames
+    as soon as that line and every line before it are ready
     
-    output_buffer.seek(0)
-    return output_buffer.read()
+    Lines in another format are converted to the stream format. Pending line
+    tasks are cancelled if the client disconnects.
+    """
+    try:
+        yield wav_header(assembler.fmt)
+        
+        for i, task in enumerate(line_tasks):
+            wav_data = await task
+            metrics.record_audio("tts_batch", wav_data)
+            try:
+                for chunk in assembler.add(wav_data):
+                    yield chunk
+            except WavFormatError as e:
+                # Keep the stream decodable: substitute silence for an undecodable line
+                logger.warning(f"Line {i+1} is not a usable WAV ({e}), replacing with silence")
+                for chunk in assembler.add(create_mock_wav_data(0.5, assembler.fmt.sample_rate)):
+                    yield chunk
+        for chunk in assembler.flush():
+            yield chunk
+        
+        if assembler.converted:
+            logger.info(f"Converted {assembler.converted} lines to the stream format {assembler.fmt.describe()}")
+        logger.info(f"Streamed batch audio for {len(line_tasks)} texts")
+    finally:
+        for task in line_tasks:
+            if not task.done():
+                task.cancel()
 
 
 @router.post("/synthesize_batch")
-async def synthesize_batch(request: BatchTTSRequest):
+async def synthesize_batch(
+    request: BatchTTSRequest,
+    background: bool = Query(False, description="Queue the work and return the task immediately")
+):
     """
     Synthesize speech for multiple texts in batch
     
     Args:
         request: Batch TTS parameters
+        background: Return a QUEUED task (202) and synthesize on the job queue;
+            progress advances per finished line (422 together with stream)
         
     Returns:
         Concatenated WAV audio stream
     """
+    if background and request.stream:
+        raise HTTPException(status_code=422, detail="background and stream cannot be combined")
+    
     try:
         logger.info(f"Batch synthesis requested for {len(request.texts)} texts")
         
-        wav_data_list = []
+        # Streaming mode pins the output format so the header can go out before any line is ready
+        output_sample_rate = config.DEFAULT_SAMPLE_RATE if request.stream else None
+        gap_seconds = (request.gap_ms if request.gap_ms is not None else config.TTS_LINE_GAP_MS) / 1000.0
+        crossfade_seconds = (request.crossfade_ms if request.crossfade_ms is not None else config.TTS_LINE_CROSSFADE_MS) / 1000.0
+        
+        group_tasks: Dict[int, asyncio.Future] = {}
+        
+        def cancel_groups() -> None:
+            # Groups whose lines are no longer awaited (e.g. the client went away)
+            for task in group_tasks.values():
+                if not task.done():
+                    task.cancel()
         
         if not config.ENABLE_REAL_SERVICES:
             # Mock mode: generate silent audio
-            for i, text in enumerate(request.texts):
+            async def synthesize_line(i: int, text: str) -> bytes:
                 logger.debug(f"Generating mock audio {i+1}/{len(request.texts)}")
                 base_duration = min(len(text) * 0.05, 5.0)
                 adjusted_duration = base_duration / request.speed_scale
-                wav_data = create_mock_wav_data(duration_seconds=adjusted_duration)
-                wav_data_list.append(wav_data)
+                return create_mock_wav_data(duration_seconds=adjusted_duration)
         else:
-            # Real mode: use AivisSpeech API
+            # Real mode: use AivisSpeech API, fanning lines out over the connection pool
             client = await get_aivisspeech_client()
+            concurrency = request.concurrency or config.get_tts_batch_concurrency()
+            # A group only plays when all its lines are done, which would delay the first streamed line
+            group_size = 1 if request.stream else config.TTS_MULTI_SYNTHESIS_SIZE
             
-            for i, text in enumerate(request.texts):
-                logger.debug(f"Synthesizing text {i+1}/{len(request.texts)}: {text[:50]}...")
+            if group_size > 1:
+                # Consecutive lines share one /multi_synthesis call; groups run in parallel
+                semaphore = asyncio.Semaphore(max(math.ceil(concurrency / group_size), 1))
+                logger.info(f"Batch synthesis concurrency: {concurrency} (groups of {group_size})")
+                
+                async def run_group(group: int) -> List[Any]:
+                    async with semaphore:
+                        texts = request.texts[group * group_size:(group + 1) * group_size]
+                        return await synthesize_group(client, texts, request, output_sample_rate)
+                
+                async def synthesize_line(i: int, text: str) -> bytes:
+                    group = i // group_size
+                    if group not in group_tasks:
+                        group_tasks[group] = asyncio.ensure_future(run_group(group))
+                    try:
+                        result = (await group_tasks[group])[i % group_size]
+                    except Exception as e:
+                        result = e
+                    if isinstance(result, BaseException):
+                        logger.error(f"Failed to synthesize text {i+1}: {result}")
+                        # Add silence for failed synthesis
+                        return create_mock_wav_data(duration_seconds=0.5)
+                    return result
+            else:
+                semaphore = asyncio.Semaphore(concurrency)
+                logger.info(f"Batch synthesis concurrency: {concurrency}")
+                
+                async def synthesize_line(i: int, text: str) -> bytes:
+                    async with semaphore:
+                        logger.debug(f"Synthesizing text {i+1}/{len(request.texts)}: {text[:50]}...")
+                        try:
+                            return await synthesize_text(client, text, request, output_sample_rate)
+                        except Exception as e:
+                            logger.error(f"Failed to synthesize text {i+1}: {e}")
+                            # Add silence for failed synthesis
+                            return create_mock_wav_data(duration_seconds=0.5)
+        
+        if background:
+            async def work(job: Job) -> Dict[str, Any]:
+                done = 0
+                
+                async def run_line(i: int, text: str) -> bytes:
+                    nonlocal done
+                    wav_data = await synthesize_line(i, text)
+                    metrics.record_audio("tts_batch", wav_data)
+                    done += 1
+                    # Each line is downloadable (and announced) as soon as it is ready
+                    job.add_artifact(f"line-{i}", wav_data, line=i)
+                    job.set_progress(done / len(request.texts) * 100.0, line=i, lines_done=done, lines=len(request.texts))
+                    return wav_data
                 
                 try:
-                    # Create audio query
-                    query_response = await client.post(
-                        "/audio_query",
-                        params={
-                            "text": text,
-                            "speaker": request.speaker_id
-                        }
+                    wav_data_list = await asyncio.gather(
+                        *(run_line(i, text) for i, text in enumerate(request.texts))
                     )
-                    query_response.raise_for_status()
-                    audio_query = query_response.json()
-                    
-                    # Apply parameters
-                    audio_query['speedScale'] = request.speed_scale
-                    audio_query['pitchScale'] = request.pitch_scale
-                    audio_query['intonationScale'] = request.intonation_scale
-                    audio_query['volumeScale'] = request.volume_scale
-                    
-                    # Synthesize
-                    synthesis_response = await client.post(
-                        "/synthesis",
-                        params={"speaker": request.speaker_id},
-                        json=audio_query,
-                        headers={"Content-Type": "application/json"}
+                finally:
+                    cancel_groups()
+                job.add_artifact("audio", concatenate_wav(wav_data_list, gap_seconds=gap_seconds, crossfade_seconds=crossfade_seconds))
+                return {
+                    "speaker_id": request.speaker_id,
+                    "lines": len(request.texts)
+                }
+            
+            return submit_task(TaskType.TTS, work)
+        
+        filename = f"batch_synthesis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+        
+        if request.stream:
+            # Start every line now; the stream consumes them in request order
+            line_tasks = [
+                asyncio.create_task(synthesize_line(i, text))
+                for i, text in enumerate(request.texts)
+            ]
+            return StreamingResponse(
+                stream_wav_lines(
+                    line_tasks,
+                    WavAssembler(
+                        WavFormat(config.DEFAULT_SAMPLE_RATE, config.DEFAULT_CHANNELS, config.DEFAULT_BIT_DEPTH // 8),
+                        gap_seconds=gap_seconds,
+                        crossfade_seconds=crossfade_seconds
                     )
-                    synthesis_response.raise_for_status()
-                    
-                    wav_data_list.append(synthesis_response.content)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to synthesize text {i+1}: {e}")
-                    # Add silence for failed synthesis
-                    wav_data_list.append(create_mock_wav_data(duration_seconds=0.5))
-        
-        # Concatenate all WAV files
-        combined_wav = concatenate_wav_files(wav_data_list)
+                ),
+                media_type="audio/wav",
+                headers={
+                    "Content-Disposition": f"attachment; filename={filename}"
+                }
+            )
+        
+        # gather() keeps results in request order regardless of completion order
+        try:
+            wav_data_list = await asyncio.gather(
+                *(synthesize_line(i, text) for i, text in enumerate(request.texts))
+            )
+        finally:
+            cancel_groups()
+        
+        for wav_data in wav_data_list:
+            metrics.record_audio("tts_batch", wav_data)
+        
+        # Stream the joined WAV straight from the line buffers (header carries exact sizes)
+        with tracing.span("assemble", lines=len(wav_data_list)):
+            combined_wav = iter_concatenated_wav(wav_data_list, gap_seconds=gap_seconds, crossfade_seconds=crossfade_seconds)
         
         logger.info(f"Successfully generated batch audio for {len(request.texts)} texts")
         
         # Return as streaming response
         return StreamingResponse(
-            io.BytesIO(combined_wav),
+            combined_wav,
             media_type="audio/wav",
             headers={
-                "Content-Disposition": f"attachment; filename=batch_synthesis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+                "Content-Disposition": f"attachment; filename={filename}"
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch synthesis failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sessions")
+async def create_reading_session(request: ReadingSessionRequest):
+    """
+    Open a reading session for Play All
+    
+    The first `lookahead` + 1 lines (READING_PREFETCH_LINES by default) start
+    synthesizing immediately; fetching a line moves the cursor and keeps the
+    next lines prefetched, so playback can go gaplessly from line to line.
+    
+    Returns:
+        Session state with session_id
+    """
+    if config.ENABLE_REAL_SERVICES:
+        client = await get_aivisspeech_client()
+        
+        async def synthesize_line(text: str) -> bytes:
+            return await synthesize_text(client, text, request)
+    else:
+        async def synthesize_line(text: str) -> bytes:
+            base_duration = min(len(text) * 0.05, 5.0)
+            return create_mock_wav_data(duration_seconds=base_duration / request.speed_scale)
+    
+    lookahead = config.READING_PREFETCH_LINES if request.lookahead is None else request.lookahead
+    session = reading_sessions.create(request.lines, synthesize_line, lookahead)
+    return session.status()
+
+
+def _get_reading_session(session_id: str):
+    session = reading_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Reading session not found: {session_id}")
+    return session
+
+
+@router.get("/sessions/{session_id}")
+async def get_reading_session(session_id: str):
+    """Reading session state: cursor, ready and pending lines"""
+    return _get_reading_session(session_id).status()
+
+
+@router.get("/sessions/{session_id}/lines/{index}")
+async def get_reading_session_line(session_id: str, index: int):
+    """
+    Get one line's audio as raw WAV and move the cursor to it
+    
+    Returns immediately when the line was prefetched; otherwise waits for it.
+    """
+    session = _get_reading_session(session_id)
+    
+    try:
+        wav_data = await session.get_line(index)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except httpx.HTTPError as e:
+        logger.error(f"Reading session {session_id} line {index} failed: {e}")
+        raise HTTPException(status_code=502, detail=f"AivisSpeech service error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Reading session {session_id} line {index} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return Response(
+        content=wav_data,
+        media_type="audio/wav",
+        headers={"X-Line-Index": str(index), "X-Line-Count": str(len(session.lines))}
+    )
+
+
+@router.post("/sessions/{session_id}/lines")
+async def append_reading_session_lines(session_id: str, request: ReadingSessionLinesRequest):
+    """
+    Append lines to a reading session
+    
+    Scripts longer than one request's 1000 lines are registered in pages:
+    the first page opens the session (playback can start right away) and
+    the rest are appended in order.
+    """
+    session = _get_reading_session(session_id)
+    if len(session.lines) + len(request.lines) > config.READING_SESSION_MAX_LINES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Reading session would exceed {config.READING_SESSION_MAX_LINES} lines"
+        )
+    session.append(request.lines)
+    return session.status()
+
+
+@router.put("/sessions/{session_id}/cursor")
+async def move_reading_session_cursor(session_id: str, request: CursorRequest):
+    """
+    Move the playback cursor without fetching audio (seek/skip)
+    
+    Prefetch outside the new window is cancelled and the lines after the
+    new cursor start synthesizing.
+    """
+    session = _get_reading_session(session_id)
+    if request.index >= len(session.lines):
+        raise HTTPException(status_code=404, detail=f"Line index out of range: {request.index}")
+    session.seek(request.index)
+    return session.status()
+
+
+@router.delete("/sessions/{session_id}")
+async def close_reading_session(session_id: str):
+    """Close a reading session and cancel its pending prefetch"""
+    if not reading_sessions.close(session_id):
+        raise HTTPException(status_code=404, detail=f"Reading session not found: {session_id}")
+    return {"success": True, "session_id": session_id}
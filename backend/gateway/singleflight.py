@@ -0,0 +1,74 @@
+"""
+Single-flight request coalescing for MioVo Gateway
+Concurrent calls with the same key share one upstream future
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """One in-flight upstream call and the number of requests awaiting it"""
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical work
+
+    The first caller for a key starts the work as a task; later callers with
+    the same key await that task instead of starting their own. Each waiter
+    awaits through asyncio.shield, so one waiter disconnecting never cancels
+    the work for the others. When the last waiter goes away the task is
+    cancelled and forgotten, so the next caller starts fresh.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Last interested caller left: stop the upstream work
+                self._forget(key, call)
+                call.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            call.waiters -= 1
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned
+        }
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,161 @@
+"""
+Speaker catalog cache for MioVo Gateway
+Keeps the AivisSpeech /speakers list with a TTL, background refresh,
+an ETag for conditional requests and a style id -> speaker index
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class SpeakerCatalog:
+    """
+    Cached speaker list
+
+    - get() returns the cached list; the first call (or a call after a failed
+      initial load) fetches synchronously
+    - once the TTL has passed, get() keeps serving the stale list and starts a
+      background refresh (stale-while-revalidate)
+    - start() additionally refreshes on a fixed interval so the catalog is
+      warm before anyone asks
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]], ttl: float):
+        self._fetch = fetch
+        self.ttl = ttl
+
+        self._speakers: Optional[List[Dict[str, Any]]] = None
+        self._etag: Optional[str] = None
+        self._style_index: Dict[int, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._periodic_task: Optional[asyncio.Task] = None
+
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._speakers is not None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._etag
+
+    def is_stale(self) -> bool:
+        return time.time() - self._fetched_at > self.ttl
+
+    async def get(self) -> List[Dict[str, Any]]:
+        """Get the speaker list, fetching it if it was never loaded"""
+        if self._speakers is None:
+            await self.refresh()
+        elif self.is_stale():
+            self._ensure_refresh_task()
+        return self._speakers
+
+    async def refresh(self) -> List[Dict[str, Any]]:
+        """Fetch the speaker list now (concurrent callers share one fetch)"""
+        await asyncio.shield(self._ensure_refresh_task())
+        return self._speakers
+
+    def lookup_style(self, style_id: int) -> Optional[Dict[str, Any]]:
+        """Find the speaker owning a style id (None if unknown or not loaded)"""
+        return self._style_index.get(style_id)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Start periodic background refresh"""
+        if self._periodic_task is None or self._periodic_task.done():
+            self._periodic_task = asyncio.create_task(self._run_periodic(interval or self.ttl))
+
+    async def stop(self) -> None:
+        for task in (self._periodic_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "speakers_count": len(self._speakers) if self._speakers is not None else 0,
+            "styles_count": len(self._style_index),
+            "age_seconds": round(time.time() - self._fetched_at, 1) if self.loaded else None,
+            "ttl_seconds": self.ttl,
+            "etag": self._etag,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "last_error": self.last_error
+        }
+
+    def _ensure_refresh_task(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._do_refresh())
+            self._refresh_task.add_done_callback(_consume_exception)
+        return self._refresh_task
+
+    async def _do_refresh(self) -> None:
+        try:
+            speakers = await self._fetch()
+        except Exception as e:
+            self.refresh_failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Speaker catalog refresh failed: {e}")
+            raise
+
+        body = json.dumps(speakers, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+        if etag != self._etag:
+            logger.info(f"Speaker catalog updated: {len(speakers)} speakers")
+
+        self._speakers = speakers
+        self._etag = etag
+        self._style_index = _build_style_index(speakers)
+        self._fetched_at = time.time()
+        self.refreshes += 1
+        self.last_error = None
+
+    async def _run_periodic(self, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # Already logged; keep serving the last good catalog
+            await asyncio.sleep(interval)
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _build_style_index(speakers: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    index: Dict[int, Dict[str, Any]] = {}
+    for speaker in speakers:
+        for style in speaker.get("styles") or []:
+            if "id" not in style:
+                continue
+            index[style["id"]] = {
+                "style_id": style["id"],
+                "style_name": style.get("name"),
+                "speaker_name": speaker.get("name"),
+                "speaker_uuid": speaker.get("speaker_uuid")
+            }
+    return index
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
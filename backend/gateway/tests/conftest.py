@@ -0,0 +1,81 @@
+"""
+Shared setup for the gateway unit tests
+Gateway modules are imported flat (as main.py does) and the stand-in
+services as the `fakes` package next to the gateway; HTTP paths run
+against the fakes in-process, without sockets
+"""
+import os
+import sys
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(GATEWAY_DIR))
+sys.path.insert(0, GATEWAY_DIR)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+
+from config import config  # noqa: E402
+from fakes import aivisspeech as fake_aivisspeech_app, rvc as fake_rvc_app  # noqa: E402
+from fakes.service import FakeService  # noqa: E402
+from upstream import UpstreamPool  # noqa: E402
+
+
+def instant(service: FakeService) -> FakeService:
+    """Zero simulated latency, so tests only measure the gateway"""
+    service.configure({
+        "latency": {route: {"base": 0.0, "per_unit": 0.0} for route in service.latency},
+        "concurrency": 64
+    })
+    return service
+
+
+def fake_pool(name: str, app) -> UpstreamPool:
+    """Upstream pool whose one backend is an in-process fake app"""
+    return UpstreamPool(
+        name,
+        [f"http://{name}"],
+        lambda url: httpx.AsyncClient(base_url=url, transport=httpx.ASGITransport(app=app))
+    )
+
+
+@pytest.fixture
+def real_services(monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_REAL_SERVICES", True)
+
+
+@pytest_asyncio.fixture
+async def fake_aivisspeech(real_services, monkeypatch):
+    """Route the TTS router to a fresh fake AivisSpeech; yields its FakeService"""
+    from routers import tts
+
+    service = instant(fake_aivisspeech_app.default_service(seed=1))
+    pool = fake_pool("aivisspeech", fake_aivisspeech_app.create_app(service))
+    monkeypatch.setattr(tts, "aivisspeech_client", pool)
+    tts.tts_cache.clear()
+    tts.query_cache.clear()
+    yield service
+    tts.tts_cache.clear()
+    tts.query_cache.clear()
+    await pool.aclose()
+
+
+@pytest_asyncio.fixture
+async def fake_rvc(real_services, monkeypatch):
+    """Route the RVC router to a fresh fake RVC service; yields its FakeService"""
+    from routers import rvc
+
+    service = instant(fake_rvc_app.default_service(seed=1))
+    pool = fake_pool("rvc", fake_rvc_app.create_app(service))
+    monkeypatch.setattr(rvc, "rvc_client", pool)
+    yield service
+    await pool.aclose()
+
+
+@pytest_asyncio.fixture
+async def gateway():
+    """HTTP client for the gateway app (lifespan hooks are not run)"""
+    import main
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://gateway", timeout=10) as client:
+        yield client
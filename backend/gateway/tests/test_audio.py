@@ -0,0 +1,114 @@
+"""Tests for WAV parsing, conversion and line assembly"""
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from audio import (
+    WavAssembler, WavFormat, WavFormatError, concatenate_wav, iter_concatenated_wav, parse_wav, wav_header
+)
+from fakes.service import wav_bytes
+
+MONO_16K = WavFormat(16000, 1, 2)
+
+
+def frames_of(wav_data: bytes) -> int:
+    fmt, pcm = parse_wav(wav_data)
+    return len(pcm) // fmt.block_align
+
+
+def test_parse_matches_the_wave_module():
+    data = wav_bytes(0.5, sample_rate=22050, channels=2)
+
+    fmt, pcm = parse_wav(data)
+
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        assert fmt == WavFormat(22050, 2, 2)
+        assert pcm.tobytes() == wav_file.readframes(wav_file.getnframes())
+
+
+def test_parse_skips_extra_chunks_and_reads_streamed_sizes():
+    pcm = b"\x01\x00" * 100
+    streamed = wav_header(MONO_16K)[:36] + b"LIST" + (4).to_bytes(4, "little") + b"INFO" + b"data" + b"\xff" * 4 + pcm
+
+    fmt, parsed = parse_wav(streamed)
+
+    assert fmt == MONO_16K
+    assert parsed.tobytes() == pcm
+
+
+def test_parse_rejects_non_wav():
+    with pytest.raises(WavFormatError):
+        parse_wav(b"ID3 not a wav file")
+
+
+def test_concatenation_keeps_every_frame_and_exact_header():
+    lines = [wav_bytes(0.25, sample_rate=16000), wav_bytes(0.5, sample_rate=16000)]
+
+    joined = concatenate_wav(lines)
+
+    with wave.open(io.BytesIO(joined), "rb") as wav_file:
+        assert wav_file.getnframes() == 4000 + 8000
+    assert len(joined) == 44 + 12000 * 2
+
+
+def test_gap_inserts_silence_between_lines_only():
+    lines = [wav_bytes(0.1, sample_rate=16000)] * 3
+
+    joined = concatenate_wav(lines, gap_seconds=0.05)
+
+    assert frames_of(joined) == 3 * 1600 + 2 * 800
+
+
+def test_crossfade_overlaps_lines_and_header_matches_output():
+    lines = [wav_bytes(0.5, sample_rate=16000), wav_bytes(0.5, sample_rate=16000)]
+
+    chunks = list(iter_concatenated_wav(lines, crossfade_seconds=0.1))
+
+    with wave.open(io.BytesIO(b"".join(chunks)), "rb") as wav_file:
+        assert wav_file.getnframes() == 16000 - 1600
+    assert sum(len(chunk) for chunk in chunks[1:]) == (16000 - 1600) * 2
+
+
+def test_crossfade_is_limited_to_half_a_line():
+    lines = [wav_bytes(0.02, sample_rate=16000), wav_bytes(0.5, sample_rate=16000)]
+
+    joined = concatenate_wav(lines, crossfade_seconds=0.1)
+
+    assert frames_of(joined) == 320 + 8000 - 160
+
+
+def test_lines_are_converted_to_the_output_format():
+    lines = [wav_bytes(0.5, sample_rate=16000), wav_bytes(0.5, sample_rate=44100, channels=2)]
+
+    fmt, pcm = parse_wav(concatenate_wav(lines))
+
+    assert fmt == MONO_16K
+    assert len(pcm) // fmt.block_align == 16000
+
+
+def test_assembler_streams_views_without_copying_unconverted_lines():
+    line = wav_bytes(0.1, sample_rate=16000)
+    assembler = WavAssembler(MONO_16K)
+
+    chunks = list(assembler.add(line)) + list(assembler.flush())
+
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert assembler.converted == 0
+    assert assembler.frames == 1600
+
+
+def test_float_lines_are_converted_without_clipping_artifacts():
+    samples = (np.sin(np.linspace(0, 20, 1600)) * 0.5).astype("<f4")
+    float_line = wav_header(WavFormat(16000, 1, 4, True), 1600) + samples.tobytes()
+
+    fmt, pcm = parse_wav(concatenate_wav([wav_bytes(0.1, sample_rate=16000), float_line]))
+
+    converted = np.frombuffer(pcm, dtype="<i2")[1600:] / 32768.0
+    assert np.allclose(converted, samples, atol=1e-3)
+
+
+def test_nothing_to_concatenate_is_an_error():
+    with pytest.raises(ValueError):
+        concatenate_wav([])
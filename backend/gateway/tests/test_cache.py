@@ -0,0 +1,150 @@
+"""Tests for the TTS result caches"""
+import asyncio
+import os
+
+import pytest
+
+from cache import AudioCache, QueryCache, make_cache_key
+from models import TTSRequest
+from routers import tts
+
+
+def test_cache_key_is_order_independent_for_dicts():
+    assert make_cache_key("a", {"x": 1, "y": 2}) == make_cache_key("a", {"y": 2, "x": 1})
+    assert make_cache_key("a", 1) != make_cache_key("a", 2)
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_evicts_least_recently_used():
+    cache = AudioCache(memory_bytes=10)
+    await cache.put("a", b"aaaa")
+    await cache.put("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"  # "b" is now the oldest
+
+    await cache.put("c", b"cccc")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"aaaa"
+    assert cache.stats()["memory_bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entry_larger_than_memory_budget_is_not_kept():
+    cache = AudioCache(memory_bytes=4)
+    await cache.put("a", b"too large")
+
+    assert await cache.get("a") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_clear_and_promotes_hits(tmp_path):
+    cache = AudioCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024)
+    await cache.put("k" * 64, b"audio")
+    cache.clear()
+
+    assert await cache.get("k" * 64) == b"audio"
+    assert await cache.get("k" * 64) == b"audio"
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_stays_within_budget(tmp_path):
+    cache = AudioCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=10)
+    for i in range(5):
+        await cache.put(f"{i:064d}", b"1234")
+
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 2
+    assert cache.stats()["disk_bytes"] <= 10
+
+
+@pytest.mark.asyncio
+async def test_full_disk_tier_evicts_to_low_water_without_rescanning(tmp_path, monkeypatch):
+    cache = AudioCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=100)
+    for i in range(10):
+        await cache.put(f"{i:064d}", b"x" * 10)
+    assert await cache.get(f"{0:064d}") is not None  # Now the most recent
+
+    def no_scan():
+        raise AssertionError("directory rescanned")
+    monkeypatch.setattr(cache, "_scan_disk", no_scan)
+    await cache.put("a" * 64, b"x" * 10)
+
+    # 110 bytes over a 100-byte budget: down to 90, not just 100
+    assert cache.stats()["disk_bytes"] == 90
+    assert await cache.get(f"{0:064d}") is not None
+    assert await cache.get(f"{1:064d}") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_disk_writes_keep_the_size_exact(tmp_path):
+    cache = AudioCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=1 << 20)
+
+    await asyncio.gather(*(cache.put(f"{i % 8:064d}", b"x" * (i + 1)) for i in range(64)))
+
+    on_disk = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names)
+    stats = cache.stats()
+    assert stats["disk_bytes"] == on_disk
+    assert stats["disk_entries"] == 8
+
+
+@pytest.mark.asyncio
+async def test_disk_index_is_rebuilt_in_last_use_order(tmp_path):
+    cache = AudioCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=30)
+    for key in ("a", "b", "c"):
+        await cache.put(key * 64, b"x" * 10)
+    path = cache._disk_path("a" * 64)
+    os.utime(path, (os.path.getmtime(path) + 60,) * 2)  # "a" was used last
+
+    restarted = AudioCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=30)
+    assert restarted.stats()["disk_bytes"] == 30
+    await restarted.put("d" * 64, b"x" * 10)
+
+    assert await restarted.get("a" * 64) is not None
+    assert await restarted.get("b" * 64) is None
+
+
+def test_query_cache_hands_out_private_copies():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", {"speedScale": 1.0})
+    cache.get("a")["speedScale"] = 2.0
+
+    assert cache.get("a") == {"speedScale": 1.0}
+
+
+def test_query_cache_is_bounded_by_entries():
+    cache = QueryCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, {})
+
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_synthesis_is_served_from_cache(fake_aivisspeech):
+    client = await tts.get_aivisspeech_client()
+    request = TTSRequest(text="こんにちは", speaker_id=0)
+
+    first = await tts.synthesize_text(client, request.text, request)
+    second = await tts.synthesize_text(client, request.text, request)
+
+    assert second == first
+    assert fake_aivisspeech.requests["/synthesis"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_key_covers_synthesis_parameters(fake_aivisspeech):
+    client = await tts.get_aivisspeech_client()
+    normal = TTSRequest(text="こんにちは", speaker_id=0)
+    faster = TTSRequest(text="こんにちは", speaker_id=0, speed_scale=1.5)
+
+    await tts.synthesize_text(client, normal.text, normal)
+    await tts.synthesize_text(client, faster.text, faster)
+
+    assert fake_aivisspeech.requests["/synthesis"] == 2
+    # The AudioQuery only depends on text and speaker
+    assert fake_aivisspeech.requests["/audio_query"] == 1
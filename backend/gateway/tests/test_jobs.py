@@ -0,0 +1,156 @@
+"""Tests for the background job queue"""
+import asyncio
+
+import pytest
+
+from jobs import JobManager, QueueFullError
+from models import TaskStatus, TaskType
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_manager(**kwargs) -> JobManager:
+    options = {"workers": {TaskType.TTS: 1}, "queue_max": 10, "result_ttl": 600}
+    options.update(kwargs)
+    return JobManager(**options)
+
+
+async def wait_finished(job, timeout: float = 2.0) -> None:
+    async def poll():
+        while not job.finished:
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_job_completes_with_result_and_artifacts():
+    manager = make_manager()
+
+    async def work(job):
+        job.set_progress(50.0, line=0)
+        job.add_artifact("audio", b"RIFF....")
+        return {"lines": 1}
+
+    job = manager.submit(TaskType.TTS, work)
+    assert job.status == TaskStatus.QUEUED
+    await wait_finished(job)
+
+    assert job.status == TaskStatus.COMPLETED
+    assert job.progress == 100.0
+    assert job.to_response().result == {"lines": 1, "tracks": ["audio"]}
+    assert manager.stats()["completed"] == 1
+    await manager.stop()
+
+
+async def test_failed_work_marks_job_failed():
+    manager = make_manager()
+
+    async def work(job):
+        raise RuntimeError("engine down")
+
+    job = manager.submit(TaskType.TTS, work)
+    await wait_finished(job)
+
+    assert job.status == TaskStatus.FAILED
+    assert job.error == "engine down"
+    assert manager.stats()["failed"] == 1
+    await manager.stop()
+
+
+async def test_cancel_running_job():
+    manager = make_manager()
+    started = asyncio.Event()
+
+    async def work(job):
+        started.set()
+        await asyncio.sleep(10)
+        return {}
+
+    job = manager.submit(TaskType.TTS, work)
+    await asyncio.wait_for(started.wait(), 1)
+    manager.cancel(job.task_id)
+
+    assert job.status == TaskStatus.FAILED
+    assert job.error == "Cancelled"
+    await asyncio.sleep(0)
+    assert job._task.cancelled()
+    await manager.stop()
+
+
+async def test_full_queue_rejects_submissions():
+    manager = make_manager(queue_max=1)
+    blocker = asyncio.Event()
+
+    async def work(job):
+        await blocker.wait()
+        return {}
+
+    manager.submit(TaskType.TTS, work)
+    await asyncio.sleep(0.01)  # The worker takes the first job
+    manager.submit(TaskType.TTS, work)
+    with pytest.raises(QueueFullError):
+        manager.submit(TaskType.TTS, work)
+    assert manager.stats()["rejected"] == 1
+
+    blocker.set()
+    await manager.stop()
+
+
+async def test_events_are_published_to_subscribers():
+    manager = make_manager()
+    release = asyncio.Event()
+
+    async def work(job):
+        await release.wait()
+        job.set_progress(50.0)
+        return {}
+
+    job = manager.submit(TaskType.TTS, work)
+    queue = job.subscribe()
+    release.set()
+    await wait_finished(job)
+
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait()[1])
+    assert events == ["status", "progress", "status"]
+    await manager.stop()
+
+
+async def test_expired_jobs_are_dropped():
+    manager = make_manager(result_ttl=0)
+
+    async def work(job):
+        return {}
+
+    job = manager.submit(TaskType.TTS, work)
+    await wait_finished(job)
+    await asyncio.sleep(0.01)
+
+    assert manager.get(job.task_id) is None
+    await manager.stop()
+
+
+async def test_retained_audio_is_bounded_least_recently_accessed_first():
+    manager = make_manager(result_max_bytes=2500)
+
+    async def work(job):
+        job.add_artifact("audio", bytes(1000))
+        return {}
+
+    first = manager.submit(TaskType.TTS, work)
+    await wait_finished(first)
+    second = manager.submit(TaskType.TTS, work)
+    await wait_finished(second)
+
+    # Reading the first task makes the second the least recently accessed
+    await asyncio.sleep(0.01)
+    assert manager.get(first.task_id) is first
+
+    third = manager.submit(TaskType.TTS, work)
+    await wait_finished(third)
+
+    assert manager.get(second.task_id) is None
+    assert manager.get(first.task_id) is first
+    assert manager.get(third.task_id) is third
+    assert manager.stats()["evicted"] == 1
+    await manager.stop()
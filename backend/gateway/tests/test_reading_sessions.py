@@ -0,0 +1,130 @@
+"""Tests for Play All reading sessions and their lookahead prefetch"""
+import asyncio
+
+import pytest
+
+from audio import parse_wav
+from reading_sessions import ReadingSession, ReadingSessionManager
+
+pytestmark = pytest.mark.asyncio
+
+
+class RecordingSynthesizer:
+    """Line synthesizer that records calls and finishes when released"""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, text: str) -> bytes:
+        self.started.append(text)
+        await self.release.wait()
+        return text.encode()
+
+
+async def test_session_prefetches_lookahead_window():
+    synthesize = RecordingSynthesizer()
+    session = ReadingSessionManager(ttl=60).create(["a", "b", "c", "d", "e"], synthesize, lookahead=2)
+    await asyncio.sleep(0)
+
+    assert synthesize.started == ["a", "b", "c"]
+    assert session.status()["pending"] == [0, 1, 2]
+    session.close()
+
+
+async def test_get_line_moves_cursor_and_cancels_lines_behind_it():
+    synthesize = RecordingSynthesizer()
+    session = ReadingSession(["a", "b", "c", "d", "e"], synthesize, lookahead=1)
+    session.seek(0)
+    await asyncio.sleep(0)
+
+    synthesize.release.set()
+    assert await session.get_line(3) == b"d"
+
+    status = session.status()
+    assert status["cursor"] == 3
+    assert status["cancelled"] == 2  # Lines 0 and 1 were still pending
+    assert set(status["ready"]) | set(status["pending"]) == {3, 4}
+    session.close()
+
+
+async def test_failed_line_is_retried_on_next_get():
+    calls = 0
+
+    async def flaky(text: str) -> bytes:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("engine hiccup")
+        return b"ok"
+
+    session = ReadingSession(["a"], flaky, lookahead=0)
+    session.seek(0)
+    with pytest.raises(RuntimeError):
+        await session.get_line(0)
+    assert await session.get_line(0) == b"ok"
+    session.close()
+
+
+async def test_append_extends_session_and_prefetch():
+    synthesize = RecordingSynthesizer()
+    session = ReadingSession(["a"], synthesize, lookahead=2)
+    session.seek(0)
+    session.append(["b", "c", "d"])
+    await asyncio.sleep(0)
+
+    assert synthesize.started == ["a", "b", "c"]
+    assert session.status()["lines"] == 4
+    session.close()
+
+
+async def test_out_of_range_line_raises():
+    session = ReadingSession(["a"], RecordingSynthesizer(), lookahead=0)
+    with pytest.raises(IndexError):
+        await session.get_line(1)
+    session.close()
+
+
+async def test_idle_sessions_are_closed():
+    manager = ReadingSessionManager(ttl=0)
+    session = manager.create(["a"], RecordingSynthesizer(), lookahead=0)
+    await asyncio.sleep(0.01)
+
+    assert manager.get(session.session_id) is None
+
+
+async def test_long_script_is_paged_into_session(fake_aivisspeech, gateway):
+    lines = [f"行{i}" for i in range(1500)]
+    request = {"lines": lines[:1000], "speaker_id": 0, "lookahead": 1}
+
+    assert (await gateway.post("/tts/sessions", json={**request, "lines": lines})).status_code == 422
+
+    response = await gateway.post("/tts/sessions", json=request)
+    assert response.status_code == 200
+    session_id = response.json()["session_id"]
+
+    response = await gateway.post(f"/tts/sessions/{session_id}/lines", json={"lines": lines[1000:]})
+    assert response.status_code == 200
+    assert response.json()["lines"] == 1500
+
+    response = await gateway.get(f"/tts/sessions/{session_id}/lines/1200")
+    assert response.status_code == 200
+    assert response.headers["x-line-count"] == "1500"
+    fmt, pcm = parse_wav(response.content)
+    assert len(pcm) > 0
+    assert fake_aivisspeech.requests["/synthesis"] >= 1
+
+    assert (await gateway.get(f"/tts/sessions/{session_id}/lines/1500")).status_code == 404
+    assert (await gateway.delete(f"/tts/sessions/{session_id}")).status_code == 200
+
+
+async def test_session_line_limit(fake_aivisspeech, gateway, monkeypatch):
+    from config import config
+
+    monkeypatch.setattr(config, "READING_SESSION_MAX_LINES", 3)
+    response = await gateway.post("/tts/sessions", json={"lines": ["a", "b"], "speaker_id": 0, "lookahead": 0})
+    session_id = response.json()["session_id"]
+
+    response = await gateway.post(f"/tts/sessions/{session_id}/lines", json={"lines": ["c", "d"]})
+    assert response.status_code == 413
+    await gateway.delete(f"/tts/sessions/{session_id}")
@@ -0,0 +1,189 @@
+"""Tests for the circuit breaker, adaptive timeouts and the upstream pool"""
+import asyncio
+
+import httpx
+import pytest
+
+from resilience import CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from upstream import UpstreamPool
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    assert not breaker.record_failure()
+    breaker.record_success()  # Resets the streak
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.can_attempt()
+    assert breaker.retry_in() > 0
+
+
+def test_half_open_breaker_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == HALF_OPEN
+
+    assert breaker.can_attempt()
+    breaker.on_attempt()
+    assert not breaker.can_attempt()
+
+    breaker.release_trial()
+    assert breaker.can_attempt()
+    breaker.on_attempt()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+    for _ in range(5):
+        breaker.record_failure()
+    breaker.on_attempt()
+    assert breaker.record_failure()
+    assert breaker.opens == 2
+
+
+def test_adaptive_timeout_needs_history_and_scales_with_work():
+    timeouts = AdaptiveTimeout(factor=3, minimum=0.5, maximum=30, min_samples=5)
+    assert timeouts.timeout_for("/synthesis", 10) is None
+
+    for _ in range(5):
+        timeouts.observe("/synthesis", elapsed=0.1, units=10)  # 10 ms per character
+    assert timeouts.timeout_for("/synthesis", 100) == pytest.approx(3.0)
+    assert timeouts.timeout_for("/synthesis", 1) == 0.5  # Floor
+    assert timeouts.timeout_for("/synthesis", 10000) == 30  # Ceiling
+
+
+def test_timed_out_requests_raise_the_timeout():
+    timeouts = AdaptiveTimeout(factor=3, minimum=0.1, maximum=30, min_samples=5)
+    for _ in range(5):
+        timeouts.observe("/convert", elapsed=0.1)
+
+    # A sustained slowdown: every request hits the adaptive timeout
+    limits = []
+    for _ in range(5):
+        limits.append(timeouts.timeout_for("/convert"))
+        timeouts.observe_timeout("/convert", limits[-1])
+
+    assert limits == sorted(limits) and limits[-1] > limits[0]
+    assert timeouts.stats()["/convert"]["censored"] == 5
+
+
+def make_pool(handler, urls=("http://a",), **kwargs) -> UpstreamPool:
+    return UpstreamPool(
+        "test",
+        list(urls),
+        lambda url: httpx.AsyncClient(base_url=url, transport=httpx.MockTransport(handler)),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_ejects_failing_backend_and_fails_fast():
+    async def handler(request):
+        return httpx.Response(500)
+
+    pool = make_pool(handler, eject_after=2, eject_seconds=60)
+    for _ in range(2):
+        assert (await pool.get("/x")).status_code == 500
+
+    with pytest.raises(CircuitOpenError):
+        await pool.get("/x")
+    assert pool.stats()["backends"][0]["circuit"]["state"] == OPEN
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_balances_across_backends():
+    seen = []
+
+    async def handler(request):
+        seen.append(request.url.host)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    pool = make_pool(handler, urls=("http://a", "http://b"))
+    await asyncio.gather(*(pool.get("/x") for _ in range(4)))
+    assert sorted(seen) == ["a", "a", "b", "b"]
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connect_error_is_retried_on_another_backend():
+    async def handler(request):
+        if request.url.host == "a":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    pool = make_pool(handler, urls=("http://a", "http://b"))
+    for _ in range(2):
+        assert (await pool.get("/x")).status_code == 200
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_timeout_does_not_eject_backend():
+    slow = False
+
+    async def handler(request):
+        # MockTransport does not enforce timeouts: expire the adaptive one by hand
+        if slow and request.extensions["timeout"]["read"] < 5:
+            raise httpx.ReadTimeout("adaptive limit", request=request)
+        return httpx.Response(200)
+
+    timeouts = AdaptiveTimeout(factor=3, minimum=0.1, maximum=30, min_samples=3)
+    pool = make_pool(handler, eject_after=2, timeouts=timeouts)
+    for _ in range(3):
+        await pool.get("/x")
+
+    slow = True
+    for _ in range(3):
+        with pytest.raises(httpx.ReadTimeout):
+            await pool.get("/x")
+
+    backend = pool.stats()["backends"][0]
+    assert backend["circuit"]["state"] == CLOSED
+    assert backend["adaptive_timeouts"] == 3
+    assert backend["failures"] == 0
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_route_recovers_after_a_sustained_slowdown():
+    async def handler(request):
+        # Every request now takes 2 s: the adaptive timeout fires below that
+        if request.extensions["timeout"]["read"] < 2:
+            raise httpx.ReadTimeout("adaptive limit", request=request)
+        return httpx.Response(200)
+
+    timeouts = AdaptiveTimeout(factor=3, minimum=0.1, maximum=30, min_samples=3)
+    for _ in range(3):
+        timeouts.observe("/x", elapsed=0.01)
+    pool = make_pool(handler, timeouts=timeouts)
+
+    statuses = []
+    for _ in range(10):
+        try:
+            statuses.append((await pool.get("/x")).status_code)
+        except httpx.ReadTimeout:
+            statuses.append("timeout")
+
+    assert statuses[0] == "timeout"
+    assert statuses[-1] == 200
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fixed_timeout_counts_towards_breaker():
+    async def handler(request):
+        raise httpx.ReadTimeout("fixed limit", request=request)
+
+    pool = make_pool(handler, eject_after=2)
+    for _ in range(2):
+        with pytest.raises(httpx.ReadTimeout):
+            await pool.get("/x")
+    assert pool.stats()["backends"][0]["circuit"]["state"] == OPEN
+    await pool.aclose()
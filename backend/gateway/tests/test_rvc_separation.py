@@ -0,0 +1,32 @@
+"""Tests for vocal separation through the gateway against the fake RVC service"""
+import base64
+
+import pytest
+
+from fakes.service import wav_bytes
+
+pytestmark = pytest.mark.asyncio
+
+AUDIO_BASE64 = base64.b64encode(wav_bytes(1.0, sample_rate=16000)).decode()
+
+
+async def test_separation_returns_both_stems(fake_rvc, gateway):
+    fake_rvc.configure({"latency": {"/separate": {"base": 0.02, "per_unit": 0.0, "distribution": "fixed"}}})
+
+    response = await gateway.post("/rvc/separate", json={"audio_base64": AUDIO_BASE64})
+
+    body = response.json()
+    assert body["status"] == "completed"
+    assert body["result"]["vocals_base64"] == AUDIO_BASE64
+    # The upstream "accompaniment" stem is served as "instrumental"
+    assert body["result"]["instrumental_base64"] == AUDIO_BASE64
+    assert body["result"]["processing_time"] == pytest.approx(0.02, abs=0.005)
+    assert fake_rvc.requests["/separate"] == 1
+
+
+async def test_separation_upstream_error_fails_the_task(fake_rvc, gateway):
+    fake_rvc.configure({"faults": {"error_rate": 1.0, "error_status": 500}})
+
+    response = await gateway.post("/rvc/separate", json={"audio_base64": AUDIO_BASE64})
+
+    assert response.json()["status"] == "failed"
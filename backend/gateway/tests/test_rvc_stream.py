@@ -0,0 +1,47 @@
+"""Tests for streamed conversion through the gateway against the fake RVC service"""
+import base64
+import struct
+
+import pytest
+
+from audio import parse_wav
+from fakes.service import wav_bytes
+
+pytestmark = pytest.mark.asyncio
+
+
+def with_list_chunk(data: bytes) -> bytes:
+    """The same WAV with a LIST chunk between fmt and data, as tagging tools write it"""
+    info = b"INFOISFT" + struct.pack("<I", 6) + b"tools\x00"
+    chunk = b"LIST" + struct.pack("<I", len(info)) + info
+    body = data[12:36] + chunk + data[36:]
+    return b"RIFF" + struct.pack("<I", 4 + len(body)) + b"WAVE" + body
+
+
+async def convert_stream(gateway, audio: bytes, segment_seconds: float = 5.0):
+    return await gateway.post("/rvc/convert/stream", json={
+        "audio_base64": base64.b64encode(audio).decode(),
+        "model_name": "leo_model.pth",
+        "segment_seconds": segment_seconds
+    })
+
+
+@pytest.mark.parametrize("extra_chunk", [False, True])
+async def test_stream_echoes_the_pcm_behind_a_stream_header(fake_rvc, gateway, extra_chunk):
+    source = wav_bytes(15.0, sample_rate=16000)
+    _, frames = parse_wav(source)
+
+    response = await convert_stream(gateway, with_list_chunk(source) if extra_chunk else source)
+
+    assert response.status_code == 200
+    assert response.headers["x-segments"] == "3"
+    header, pcm = response.content[:44], response.content[44:]
+    assert header[4:8] == header[40:44] == b"\xff\xff\xff\xff"  # Sizes unknown, as from the real server
+    assert struct.unpack("<HHI", header[20:28]) == (1, 1, 16000)  # PCM, mono, 16 kHz
+    assert pcm == bytes(frames)
+
+
+async def test_undecodable_audio_is_rejected_before_streaming(fake_rvc, gateway):
+    response = await convert_stream(gateway, b"not a wav file")
+
+    assert response.status_code == 400
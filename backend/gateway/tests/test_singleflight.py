@@ -0,0 +1,110 @@
+"""Tests for single-flight request coalescing"""
+import asyncio
+
+import pytest
+
+from models import TTSRequest
+from routers import tts
+from singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+class Upstream:
+    """Counts calls and finishes them when released"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "result"
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    callers = [asyncio.create_task(flight.do("key", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 3
+    assert upstream.calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2, "abandoned": 0}
+
+
+async def test_finished_call_is_not_reused():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+    upstream.release.set()
+
+    await flight.do("key", upstream)
+    await flight.do("key", upstream)
+
+    assert upstream.calls == 2
+
+
+async def test_one_waiter_leaving_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    leaving = asyncio.create_task(flight.do("key", upstream))
+    staying = asyncio.create_task(flight.do("key", upstream))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await staying == "result"
+    assert upstream.cancelled == 0
+
+
+async def test_last_waiter_leaving_cancels_the_call():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    caller = asyncio.create_task(flight.do("key", upstream))
+    await asyncio.sleep(0)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0)
+
+    assert upstream.cancelled == 1
+    assert flight.in_flight() == 0
+    assert flight.stats()["abandoned"] == 1
+
+
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    async def failing() -> str:
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("key", failing),
+        flight.do("key", failing),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+
+async def test_identical_synthesis_requests_share_one_upstream_call(fake_aivisspeech):
+    client = await tts.get_aivisspeech_client()
+    request = TTSRequest(text="こんにちは", speaker_id=0)
+
+    results = await asyncio.gather(*(tts.synthesize_text(client, request.text, request) for _ in range(4)))
+
+    assert len(set(results)) == 1
+    assert fake_aivisspeech.requests["/synthesis"] == 1
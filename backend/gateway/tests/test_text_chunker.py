@@ -0,0 +1,53 @@
+"""Tests for the sentence-aware text chunker"""
+import pytest
+
+from text_chunker import split_long_sentence, split_sentences, split_text
+
+
+def test_sentences_keep_terminators_and_closing_marks():
+    text = "「おはよう。」今日は晴れ！本当に？！\nまたね"
+
+    assert split_sentences(text) == ["「おはよう。」", "今日は晴れ！", "本当に？！", "またね"]
+
+
+def test_blank_lines_are_dropped():
+    assert split_sentences("一行目。\n\n  \n二行目") == ["一行目。", "二行目"]
+
+
+def test_long_sentence_splits_at_clause_boundaries():
+    sentence = "あいうえお、かきくけこ、さしすせそ。"
+
+    assert split_long_sentence(sentence, 12) == ["あいうえお、かきくけこ、", "さしすせそ。"]
+
+
+def test_clause_longer_than_cap_is_hard_cut():
+    parts = split_long_sentence("あ" * 25, 10)
+
+    assert parts == ["あ" * 10, "あ" * 10, "あ" * 5]
+
+
+def test_chunks_pack_whole_sentences_up_to_cap():
+    text = "一文目です。二文目です。三文目です。"
+
+    chunks = split_text(text, 13)
+
+    assert chunks == ["一文目です。二文目です。", "三文目です。"]
+    assert "".join(chunks) == text
+
+
+def test_chunks_never_exceed_cap():
+    text = "これはとても長い文章で、句読点が少しだけあり、" * 20 + "。短い文。" * 10
+
+    chunks = split_text(text, 40)
+
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert "".join(chunks) == text.replace("\n", "")
+
+
+def test_ascii_words_keep_a_space_across_lines():
+    assert split_text("Hello there\nGood night", 100) == ["Hello there Good night"]
+
+
+def test_cap_must_be_positive():
+    with pytest.raises(ValueError):
+        split_text("テキスト", 0)
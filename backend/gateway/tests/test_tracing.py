@@ -0,0 +1,58 @@
+"""Tests for the trace exporter"""
+import json
+import threading
+
+from tracing import TraceExporter
+
+
+def test_records_are_written_by_the_writer_thread(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    exporter = TraceExporter(str(path))
+    writers = []
+    write = exporter._write
+    monkeypatch.setattr(exporter, "_write", lambda record: (writers.append(threading.current_thread()), write(record)))
+
+    for i in range(3):
+        exporter.export({"trace_id": f"t{i}", "path": "/tts/synthesize"})
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["trace_id"] for line in lines] == ["t0", "t1", "t2"]
+    assert exporter.exported == 3
+    assert threading.current_thread() not in writers
+
+
+def test_records_beyond_the_backlog_are_dropped(tmp_path):
+    exporter = TraceExporter(str(tmp_path / "traces.jsonl"), max_pending=2)
+    blocked = threading.Event()
+    exporter._write = lambda record: blocked.wait(5)
+
+    for i in range(5):
+        exporter.export({"trace_id": f"t{i}"})
+
+    # The writer holds at most one record, the queue two more
+    assert exporter.dropped >= 2
+    blocked.set()
+    exporter.close()
+
+
+def test_unwritable_path_counts_failures(tmp_path):
+    exporter = TraceExporter(str(tmp_path / "missing" / "traces.jsonl"))
+
+    exporter.export({"trace_id": "t0"})
+    exporter.close()
+
+    assert (exporter.exported, exporter.failed) == (0, 1)
+
+
+def test_export_does_not_wait_for_a_slow_writer(tmp_path):
+    exporter = TraceExporter(str(tmp_path / "traces.jsonl"))
+    release = threading.Event()
+    exporter._write = lambda record: release.wait(5)
+
+    exporter.export({"trace_id": "t0"})
+    exporter.export({"trace_id": "t1"})  # Returns while the writer is still blocked
+
+    assert exporter.dropped == 0
+    release.set()
+    exporter.close()
@@ -0,0 +1,130 @@
+"""Tests for batch synthesis and /multi_synthesis line groups against the fake AivisSpeech"""
+import asyncio
+
+import pytest
+
+from audio import parse_wav
+from config import config
+from routers import tts
+
+pytestmark = pytest.mark.asyncio
+
+LINES = ["こんにちは", "今日はいい天気ですね", "さようなら", "また明日"]
+
+
+def slow(service, route: str, seconds: float) -> None:
+    service.configure({"latency": {route: {"base": seconds, "per_unit": 0.0, "distribution": "fixed"}}})
+
+
+async def test_batch_groups_lines_into_multi_synthesis(fake_aivisspeech, gateway, monkeypatch):
+    monkeypatch.setattr(config, "TTS_MULTI_SYNTHESIS_SIZE", 2)
+
+    response = await gateway.post("/tts/synthesize_batch", json={"texts": LINES, "speaker_id": 0})
+
+    assert response.status_code == 200
+    _, frames = parse_wav(response.content)
+    assert len(frames) > 0
+    assert fake_aivisspeech.requests.get("/multi_synthesis") == 2
+    assert "/synthesis" not in fake_aivisspeech.requests
+
+
+async def test_non_streamed_batch_groups_by_default(fake_aivisspeech, gateway):
+    response = await gateway.post("/tts/synthesize_batch", json={"texts": LINES, "speaker_id": 0})
+
+    assert response.status_code == 200
+    assert fake_aivisspeech.requests.get("/multi_synthesis") == 1
+    assert "/synthesis" not in fake_aivisspeech.requests
+
+
+async def test_stream_batch_never_groups(fake_aivisspeech, gateway, monkeypatch):
+    monkeypatch.setattr(config, "TTS_MULTI_SYNTHESIS_SIZE", 8)
+
+    response = await gateway.post("/tts/synthesize_batch", json={"texts": LINES, "speaker_id": 0, "stream": True})
+
+    assert response.status_code == 200
+    assert fake_aivisspeech.requests.get("/synthesis") == len(LINES)
+    assert "/multi_synthesis" not in fake_aivisspeech.requests
+
+
+async def test_background_stream_batch_is_rejected(fake_aivisspeech, gateway):
+    response = await gateway.post(
+        "/tts/synthesize_batch",
+        params={"background": "true"},
+        json={"texts": LINES, "speaker_id": 0, "stream": True}
+    )
+
+    assert response.status_code == 422
+    assert fake_aivisspeech.requests == {}
+
+
+async def test_grouped_lines_are_cached(fake_aivisspeech):
+    client = await tts.get_aivisspeech_client()
+    request = tts.BatchTTSRequest(texts=LINES, speaker_id=0)
+
+    first = await tts.synthesize_group(client, LINES, request)
+    second = await tts.synthesize_group(client, LINES, request)
+
+    assert second == first
+    assert fake_aivisspeech.requests["/multi_synthesis"] == 1
+
+
+async def test_grouped_lines_join_single_line_flights(fake_aivisspeech):
+    slow(fake_aivisspeech, "/synthesis", 0.1)
+    client = await tts.get_aivisspeech_client()
+    request = tts.BatchTTSRequest(texts=LINES, speaker_id=0)
+
+    single = asyncio.create_task(tts.synthesize_text(client, LINES[0], request))
+    await asyncio.sleep(0.02)
+    results = await tts.synthesize_group(client, LINES[:2], request)
+
+    assert results[0] == await single
+    assert fake_aivisspeech.requests["/synthesis"] == 1
+    # Only the line nobody else was synthesizing went out grouped
+    assert fake_aivisspeech.requests["/multi_synthesis"] == 1
+    assert fake_aivisspeech.requests["/audio_query"] == 2
+
+
+async def test_concurrent_groups_share_one_upstream_call(fake_aivisspeech):
+    slow(fake_aivisspeech, "/multi_synthesis", 0.05)
+    client = await tts.get_aivisspeech_client()
+    request = tts.BatchTTSRequest(texts=LINES, speaker_id=0)
+
+    first, second = await asyncio.gather(
+        tts.synthesize_group(client, LINES, request),
+        tts.synthesize_group(client, LINES, request)
+    )
+
+    assert first == second
+    assert fake_aivisspeech.requests["/multi_synthesis"] == 1
+
+
+async def test_cancelled_group_stops_upstream_work(fake_aivisspeech):
+    slow(fake_aivisspeech, "/multi_synthesis", 5.0)
+    client = await tts.get_aivisspeech_client()
+    request = tts.BatchTTSRequest(texts=LINES, speaker_id=0)
+
+    group = asyncio.create_task(tts.synthesize_group(client, LINES, request))
+    while not fake_aivisspeech.in_flight:
+        await asyncio.sleep(0.01)
+    group.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await group
+    await asyncio.sleep(0.01)
+
+    assert tts.synthesis_flight.in_flight() == 0
+    assert fake_aivisspeech.in_flight == 0
+
+
+async def test_failed_group_falls_back_to_single_lines(fake_aivisspeech):
+    client = await tts.get_aivisspeech_client()
+    request = tts.BatchTTSRequest(texts=LINES, speaker_id=0)
+
+    async def flaky_multi(audio_queries, speaker_id):
+        raise RuntimeError("engine hiccup")
+
+    tts.get_aivisspeech_engine(client).multi_synthesis = flaky_multi
+
+    results = await tts.synthesize_group(client, LINES[:2], request)
+
+    assert all(isinstance(wav_data, bytes) for wav_data in results)
+    assert fake_aivisspeech.requests["/synthesis"] == 2
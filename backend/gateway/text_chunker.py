@@ -0,0 +1,131 @@
+"""
+Sentence-aware Japanese text segmenter
+Chunk-and-Stream pattern: split long text into chunks that can be synthesized in parallel
+"""
+from typing import List
+
+# Sentence terminators (full-width and ASCII)
+SENTENCE_DELIMITERS = "。！？!?"
+
+# Closing brackets/quotes that stay attached to the sentence they end
+CLOSING_MARKS = "」』）)】〕〉》\"'”’"
+
+# Clause boundaries used when a single sentence exceeds the length cap
+CLAUSE_DELIMITERS = "、，,；;：:"
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text on 。！？!? and newlines
+
+    Terminators and any closing brackets that follow them stay with their
+    sentence. Empty segments are dropped.
+    """
+    sentences: List[str] = []
+    current: List[str] = []
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+
+        if char in "\r\n":
+            _flush(current, sentences)
+            i += 1
+            continue
+
+        current.append(char)
+        i += 1
+
+        if char in SENTENCE_DELIMITERS:
+            # Absorb repeated terminators ("！？") and closing marks ("。」")
+            while i < len(text) and (text[i] in SENTENCE_DELIMITERS or text[i] in CLOSING_MARKS):
+                current.append(text[i])
+                i += 1
+            _flush(current, sentences)
+
+    _flush(current, sentences)
+    return sentences
+
+
+def split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    """Split one over-long sentence at clause boundaries, then hard-cut at max_chars"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    pieces: List[str] = []
+    current = ""
+    for char in sentence:
+        current += char
+        if char in CLAUSE_DELIMITERS:
+            pieces.append(current)
+            current = ""
+    if current:
+        pieces.append(current)
+
+    parts: List[str] = []
+    buffer = ""
+    for piece in pieces:
+        # Hard cut for clauses that are still too long
+        while len(piece) > max_chars:
+            if buffer:
+                parts.append(buffer)
+                buffer = ""
+            parts.append(piece[:max_chars])
+            piece = piece[max_chars:]
+
+        if len(buffer) + len(piece) > max_chars:
+            parts.append(buffer)
+            buffer = piece
+        else:
+            buffer += piece
+
+    if buffer:
+        parts.append(buffer)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters
+
+    Sentences are packed greedily so each chunk is as close to max_chars as
+    possible without breaking a sentence; only sentences longer than
+    max_chars are broken up (at clause boundaries first).
+
+    Args:
+        text: Input text
+        max_chars: Length cap per chunk
+
+    Returns:
+        Chunks in reading order
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    chunks: List[str] = []
+    buffer = ""
+
+    for sentence in split_sentences(text):
+        for part in split_long_sentence(sentence, max_chars):
+            if buffer and len(buffer) + len(part) + 1 > max_chars:
+                chunks.append(buffer)
+                buffer = ""
+            buffer = _join(buffer, part)
+
+    if buffer:
+        chunks.append(buffer)
+    return chunks
+
+
+def _join(left: str, right: str) -> str:
+    """Concatenate two segments, keeping a space between ASCII words"""
+    if left and left[-1].isascii() and left[-1].isalnum() and right[0].isascii() and right[0].isalnum():
+        return f"{left} {right}"
+    return left + right
+
+
+def _flush(current: List[str], sentences: List[str]) -> None:
+    sentence = "".join(current).strip()
+    if sentence:
+        sentences.append(sentence)
+    current.clear()
@@ -0,0 +1,276 @@
+"""
+Lightweight request tracing for MioVo Gateway
+Each request gets a trace id; stages record spans through a contextvar, the
+response carries them in a Server-Timing header and finished traces can be
+appended to a JSONL file for a local collector
+"""
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from loguru import logger
+
+TRACE_HEADER = "X-Trace-Id"
+
+# Server-Timing metric names must be HTTP tokens
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+_TRACE_ID = re.compile(r"^[A-Za-z0-9-]{8,64}$")
+
+
+class Span:
+    """One timed stage; times are seconds relative to the start of the trace"""
+
+    __slots__ = ("name", "start", "end", "attributes")
+
+    def __init__(self, name: str, start: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start_ms": round(self.start * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            **({"attributes": self.attributes} if self.attributes else {})
+        }
+
+
+class Trace:
+    """Spans of one request"""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def add_span(self, name: str, start: float, end: float, **attributes: Any) -> Span:
+        """Record a span measured elsewhere (e.g. reported by an upstream's Server-Timing)"""
+        span = Span(name, start, attributes)
+        span.end = end
+        self.spans.append(span)
+        return span
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """
+        Server-Timing header value: durations summed per span name, in the
+        order the names first appeared, plus `total`
+        """
+        durations: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for span in self.spans:
+            if span.end is None:
+                continue
+            name = _TOKEN_UNSAFE.sub("_", span.name)
+            durations[name] = durations.get(name, 0.0) + span.duration
+            counts[name] = counts.get(name, 0) + 1
+
+        entries = []
+        for name, duration in durations.items():
+            entry = f"{name};dur={duration * 1000:.1f}"
+            if counts[name] > 1:
+                entry += f';desc="x{counts[name]}"'
+            entries.append(entry)
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("miovo_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a stage of the current request
+
+    Outside a traced request this does nothing, so library code can be
+    instrumented unconditionally. Works across awaits: tasks created inside
+    the request inherit the trace through the contextvar.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(name, trace.elapsed(), attributes)
+    trace.spans.append(current)
+    try:
+        yield current
+    finally:
+        current.end = trace.elapsed()
+
+
+def parse_server_timing(value: str) -> List[Dict[str, Any]]:
+    """Entries of a Server-Timing header as [{"name", "duration_ms"}] (entries without dur are skipped)"""
+    entries = []
+    for part in value.split(","):
+        fields = [field.strip() for field in part.split(";")]
+        if not fields[0]:
+            continue
+        for field in fields[1:]:
+            key, _, raw = field.partition("=")
+            if key.strip() == "dur":
+                try:
+                    entries.append({"name": fields[0], "duration_ms": float(raw.strip().strip('"'))})
+                except ValueError:
+                    pass
+                break
+    return entries
+
+
+class TraceExporter:
+    """
+    Appends finished traces as JSON lines to a file (one line per request)
+
+    export() only queues the record; a writer thread serializes and writes
+    it, so request middleware never does file I/O on the event loop. When
+    the writer falls `max_pending` records behind, new ones are dropped.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, max_pending: int = 10000):
+        self.path = path
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self.exported = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def export(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning(f"Trace export to {self.path} is falling behind, dropping traces")
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is self._STOP:
+                break
+            self._write(record)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        try:
+            line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line)
+            self.exported += 1
+        except (OSError, TypeError, ValueError) as e:
+            self.failed += 1
+            if self.failed == 1:
+                logger.warning(f"Trace export to {self.path} failed: {e}")
+
+    def close(self) -> None:
+        """Write what is queued, then stop the writer and close the file"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a trace per HTTP request
+
+    The trace id is taken from an incoming X-Trace-Id (so the frontend or a
+    proxy can correlate) or generated. The response carries X-Trace-Id and a
+    Server-Timing header with the spans finished before the response
+    started; the exporter receives every span once the body is complete.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        exporter: Optional[TraceExporter] = None,
+        exclude_paths: Sequence[str] = ("/metrics", "/health")
+    ):
+        self.app = app
+        self.exporter = exporter
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-trace-id":
+                incoming = value.decode("latin-1")
+                break
+        trace = Trace(incoming if incoming and _TRACE_ID.match(incoming) else None)
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                headers.append((b"server-timing", trace.server_timing(total=trace.elapsed()).encode("latin-1")))
+                # Lets cross-origin pages (the Vite dev server) read the timings
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            if self.exporter is not None:
+                route = scope.get("route")
+                self.exporter.export({
+                    **trace.to_dict(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status,
+                    "duration_ms": round(trace.elapsed() * 1000, 3)
+                })
@@ -0,0 +1,309 @@
+"""
+Upstream backend pool for MioVo Gateway
+Spreads requests over several engine instances with least-outstanding-requests
+balancing, a circuit breaker per instance and adaptive timeouts
+"""
+import asyncio
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+import metrics
+import tracing
+from resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError, CLOSED, OPEN
+
+
+class NoHealthyBackendError(httpx.TransportError):
+    """Raised by probe_backends() when every backend failed its probe"""
+
+
+class Backend:
+    """One upstream instance, its circuit breaker and load counters"""
+
+    def __init__(self, url: str, client: httpx.AsyncClient, breaker: CircuitBreaker):
+        self.url = url
+        self.client = client
+        self.breaker = breaker
+
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.adaptive_timeouts = 0
+        self.last_error: Optional[str] = None
+
+        # Parsed JSON body of the last successful health probe
+        self.probe_body: Any = None
+
+    @property
+    def ejected(self) -> bool:
+        """Out of balancing: circuit open, or half-open with its trial request in flight"""
+        return not self.breaker.can_attempt()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.breaker.state != OPEN,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "adaptive_timeouts": self.adaptive_timeouts,
+            "circuit": self.breaker.stats(),
+            "last_error": self.last_error
+        }
+
+
+class UpstreamPool:
+    """
+    Drop-in for a single httpx.AsyncClient (get/post/request/aclose)
+
+    - Each request goes to the backend with the fewest requests in flight
+      among those whose circuit lets it through; ties rotate so idle
+      backends share the load evenly
+    - Transport errors (including fixed timeouts) and 5xx responses count
+      as failures; `eject_after` in a row open the backend's circuit for
+      `eject_seconds`, after which one trial request decides whether it
+      closes again. A passing health probe closes it at once
+    - When every circuit is open the request fails immediately with
+      CircuitOpenError instead of waiting out a timeout
+    - Connect errors are retried once on another backend, since the request
+      never reached the first one
+    - Requests without an explicit timeout get one from AdaptiveTimeout,
+      scaled by the `work` keyword (characters, seconds of audio, ...);
+      expiring it fails the request without counting against the backend
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        client_factory: Callable[[str], httpx.AsyncClient],
+        eject_after: int = 3,
+        eject_seconds: float = 10.0,
+        timeouts: Optional[AdaptiveTimeout] = None,
+        max_connections: Optional[int] = None
+    ):
+        if not urls:
+            raise ValueError(f"{name}: at least one upstream URL is required")
+
+        self.name = name
+        self.timeouts = timeouts
+        # Connection limit of each backend's client, for pool utilization metrics
+        self.max_connections = max_connections
+        self.backends = [
+            Backend(url, client_factory(url), CircuitBreaker(eject_after, eject_seconds))
+            for url in urls
+        ]
+        self._rotation = itertools.count()
+        self.fast_failures = 0
+
+    @property
+    def base_url(self) -> str:
+        return self.backends[0].url
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def request(self, method: str, url: str, work: float = 1.0, stream: bool = False, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request to the best backend
+
+        Args:
+            work: Size of the work (e.g. text length) used to scale the adaptive timeout
+            stream: Return as soon as the headers arrive; the caller reads the
+                body (aiter_raw) and must close the response. The adaptive
+                timeout does not apply (it covers whole responses).
+
+        Raises:
+            CircuitOpenError: Every backend's circuit is open
+        """
+        try:
+            backend = self._acquire()
+        except CircuitOpenError:
+            metrics.upstream_requests.inc(upstream=self.name, path=url, status="circuit_open")
+            raise
+        try:
+            return await self._send(backend, method, url, work, stream, **kwargs)
+        except httpx.ConnectError:
+            retry = self._acquire(exclude=backend, required=False)
+            if retry is None:
+                raise
+            logger.warning(f"{self.name}: {backend.url} refused connection, retrying on {retry.url}")
+            return await self._send(retry, method, url, work, stream, **kwargs)
+
+    def pick(self, exclude: Optional[Backend] = None) -> Optional[Backend]:
+        """Least-outstanding backend whose circuit allows a request (None if there is none)"""
+        admitted = [backend for backend in self.backends if backend is not exclude and not backend.ejected]
+        if not admitted:
+            return None
+
+        least = min(backend.outstanding for backend in admitted)
+        tied = [backend for backend in admitted if backend.outstanding == least]
+        return tied[next(self._rotation) % len(tied)]
+
+    async def probe_backends(self, path: str, timeout: float) -> Dict[str, Any]:
+        """
+        Probe every backend concurrently (fed by the health monitor)
+
+        Probes bypass the circuit breakers: a passing probe closes the
+        circuit at once, a failing one counts like a request failure.
+
+        Raises:
+            NoHealthyBackendError: No backend answered the probe
+        """
+        results = await asyncio.gather(*(self._probe(backend, path, timeout) for backend in self.backends))
+        healthy = sum(results)
+        details = {
+            "backends_healthy": healthy,
+            "backends_total": len(self.backends),
+            "backends": [backend.stats() for backend in self.backends]
+        }
+        if healthy == 0:
+            errors = "; ".join(f"{backend.url}: {backend.last_error}" for backend in self.backends)
+            raise NoHealthyBackendError(f"No healthy {self.name} backend ({errors})")
+        return details
+
+    def healthy_probe_bodies(self) -> List[Any]:
+        """Last probe bodies of the backends whose circuit is not open"""
+        return [
+            backend.probe_body for backend in self.backends
+            if backend.breaker.state != OPEN and backend.probe_body is not None
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": [backend.stats() for backend in self.backends],
+            "healthy": sum(1 for backend in self.backends if backend.breaker.state != OPEN),
+            "fast_failures": self.fast_failures,
+            "timeouts": self.timeouts.stats() if self.timeouts is not None else {}
+        }
+
+    async def aclose(self) -> None:
+        for backend in self.backends:
+            await backend.client.aclose()
+
+    def _acquire(self, exclude: Optional[Backend] = None, required: bool = True) -> Optional[Backend]:
+        backend = self.pick(exclude)
+        if backend is None:
+            if not required:
+                return None
+            self.fast_failures += 1
+            retry_in = min(candidate.breaker.retry_in() for candidate in self.backends)
+            raise CircuitOpenError(f"{self.name} circuit open, retry in {retry_in:.1f}s")
+        backend.breaker.on_attempt()
+        return backend
+
+    async def _send(self, backend: Backend, method: str, url: str, work: float, stream: bool = False, **kwargs: Any) -> httpx.Response:
+        adaptive = False
+        if self.timeouts is not None and "timeout" not in kwargs and not stream:
+            timeout = self.timeouts.timeout_for(url, work)
+            if timeout is not None:
+                adaptive = True
+                # Waiting for a free local connection is not the backend's fault: keep the pool timeout
+                kwargs["timeout"] = httpx.Timeout(timeout, pool=backend.client.timeout.pool)
+
+        trace_id = tracing.current_trace_id()
+        if trace_id is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), tracing.TRACE_HEADER: trace_id}
+
+        backend.outstanding += 1
+        backend.requests += 1
+        start_time = time.time()
+        try:
+            with tracing.span(f"{self.name}.{url.strip('/').replace('/', '.')}", backend=backend.url) as call:
+                if stream:
+                    response = await backend.client.send(backend.client.build_request(method, url, **kwargs), stream=True)
+                else:
+                    response = await backend.client.request(method, url, **kwargs)
+                if call is not None:
+                    call.attributes["status"] = response.status_code
+                    self._add_upstream_spans(call, response)
+        except httpx.PoolTimeout:
+            backend.breaker.release_trial()
+            metrics.upstream_pool_timeouts.inc(upstream=self.name)
+            metrics.upstream_requests.inc(upstream=self.name, path=url, status="pool_timeout")
+            raise
+        except httpx.TimeoutException as e:
+            if not adaptive or isinstance(e, httpx.ConnectTimeout):
+                self._record_failure(backend, str(e) or e.__class__.__name__)
+                metrics.upstream_requests.inc(upstream=self.name, path=url, status=e.__class__.__name__)
+                raise
+            # Slower than usual is not down: a busy engine (long queue) must not get ejected.
+            # Only the fixed client timeouts count towards the circuit breaker.
+            backend.breaker.release_trial()
+            # Without a sample the history would stay that of before the slowdown
+            self.timeouts.observe_timeout(url, timeout, work)
+            backend.adaptive_timeouts += 1
+            backend.last_error = f"adaptive timeout ({e.__class__.__name__})"
+            metrics.upstream_requests.inc(upstream=self.name, path=url, status="adaptive_timeout")
+            raise
+        except httpx.TransportError as e:
+            self._record_failure(backend, str(e) or e.__class__.__name__)
+            metrics.upstream_requests.inc(upstream=self.name, path=url, status=e.__class__.__name__)
+            raise
+        except BaseException:
+            # Cancelled mid-request: release a half-open trial without judging the backend
+            backend.breaker.release_trial()
+            raise
+        finally:
+            backend.outstanding -= 1
+
+        elapsed = time.time() - start_time
+        metrics.upstream_requests.inc(upstream=self.name, path=url, status=str(response.status_code))
+        metrics.upstream_request_duration.observe(elapsed, upstream=self.name, path=url)
+
+        if response.status_code >= 500:
+            self._record_failure(backend, f"HTTP {response.status_code}")
+        else:
+            backend.breaker.record_success()
+            backend.last_error = None
+            if self.timeouts is not None and response.status_code < 400 and not stream:
+                self.timeouts.observe(url, elapsed, work)
+        return response
+
+    async def _probe(self, backend: Backend, path: str, timeout: float) -> bool:
+        try:
+            response = await backend.client.get(path, timeout=timeout)
+            response.raise_for_status()
+            backend.probe_body = response.json() if "json" in response.headers.get("content-type", "") else None
+        except Exception as e:
+            self._record_failure(backend, str(e).splitlines()[0] if str(e) else e.__class__.__name__)
+            return False
+
+        if backend.breaker.state != CLOSED:
+            logger.info(f"{self.name}: {backend.url} passed health probe, circuit closed")
+        backend.breaker.record_success()
+        backend.last_error = None
+        return True
+
+    def _add_upstream_spans(self, call: tracing.Span, response: httpx.Response) -> None:
+        """Stages the upstream reported in Server-Timing, as spans under this call"""
+        server_timing = response.headers.get("server-timing")
+        trace = tracing.current_trace()
+        if not server_timing or trace is None:
+            return
+        cursor = call.start
+        for entry in tracing.parse_server_timing(server_timing):
+            if entry["name"] == "total":
+                continue
+            duration = entry["duration_ms"] / 1000.0
+            # Upstream stages run one after another; their offset within the call is approximate
+            trace.add_span(f"{self.name}.server.{entry['name']}", cursor, cursor + duration)
+            cursor += duration
+
+    def _record_failure(self, backend: Backend, error: str) -> None:
+        backend.failures += 1
+        backend.last_error = error
+        if backend.breaker.record_failure():
+            logger.warning(
+                f"{self.name}: circuit opened for {backend.url} for {backend.breaker.reset_timeout}s "
+                f"after {backend.breaker.consecutive_failures} consecutive failures ({error})"
+            )
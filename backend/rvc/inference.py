@@ -0,0 +1,666 @@
+"""
+RVC inference jobs
+Blocking work run by the inference worker pool: model loading and caching,
+voice conversion and Demucs separation. Functions here are module level so
+a process pool can pickle them; every process keeps its own model cache.
+"""
+import base64
+import io
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from model_cache import ModelCache
+
+# RVC imports
+try:
+    from rvc_python import RVC
+    RVC_AVAILABLE = True
+except ImportError:
+    logger.warning("rvc-python not installed, running in API-only mode")
+    RVC_AVAILABLE = False
+    RVC = None
+
+# Device new model instances are created on (changed by POST /set_device)
+rvc_device = os.getenv("RVC_DEVICE", "cuda:0")
+
+# Memory budget for resident voice models (parameter and buffer bytes of their networks)
+MODEL_CACHE_MB = int(os.getenv("RVC_MODEL_CACHE_MB", "4096"))
+
+# Convert decoded samples with the backend's own pipeline when it has one (false forces temp files)
+IN_MEMORY = os.getenv("RVC_IN_MEMORY", "true").lower() == "true"
+
+# HuBERT and the f0 extractors take 16 kHz mono
+PIPELINE_SAMPLE_RATE = 16000
+
+# Temp files (file-based conversion, Demucs) go to RAM when /dev/shm exists
+TEMP_DIR = os.getenv("RVC_TEMP_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+# Long clips are converted in segments joined with crossfades, so inference memory stays flat
+SEGMENT_SECONDS = float(os.getenv("RVC_SEGMENT_SECONDS", "20"))
+SEGMENT_OVERLAP_SECONDS = float(os.getenv("RVC_SEGMENT_OVERLAP_SECONDS", "0.5"))
+SEGMENT_THRESHOLD_SECONDS = float(os.getenv("RVC_SEGMENT_THRESHOLD_SECONDS", "60"))  # /convert segments clips longer than this
+SEGMENT_SEARCH_SECONDS = 2.0  # How far from the target length a quieter cut point is looked for
+ENERGY_WINDOW_SECONDS = 0.02
+
+# RIFF/data size written when the length is unknown (streaming)
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+class StageTimer:
+    """
+    Durations of the stages of one request, reported to the gateway in a
+    Server-Timing header so tunnel time can be told apart from server time
+    """
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def add(self, name: str, seconds: float) -> None:
+        """Record a stage measured elsewhere (e.g. on a worker)"""
+        self.stages.append((name, seconds))
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per stage name, summed over repeats (segments), in first-seen order"""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.totals().items())
+
+    def to_dict(self) -> dict:
+        return {name: round(seconds * 1000, 1) for name, seconds in self.totals().items()}
+
+    def log(self, operation: str) -> None:
+        stages = " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.totals().items())
+        logger.info(f"{operation} stages [{self.trace_id or '-'}]: {stages}")
+
+
+def resident_bytes(instance) -> int:
+    """
+    Bytes held by a model instance's networks: parameters and buffers of the
+    generator, and of HuBERT once the first conversion has loaded it
+
+    Counted from the tensors themselves, so allocations by loads and
+    inferences running at the same time do not leak into the figure.
+    """
+    vc = getattr(instance, "vc", None)
+    total = 0
+    for module in (getattr(vc, "net_g", None), getattr(vc, "hubert_model", None)):
+        if module is None or not hasattr(module, "parameters"):
+            continue
+        for tensor in itertools.chain(module.parameters(), module.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def load_rvc_model(model_name: str) -> tuple:
+    """
+    Load a voice model into its own RVC instance (model cache loader)
+
+    Each cached model keeps its weights in its instance, so switching
+    between resident voices costs no disk load.
+
+    Args:
+        model_name: Model file name in RVC_MODEL_DIR
+
+    Returns:
+        (RVC instance, resident size in bytes)
+
+    Raises:
+        FileNotFoundError: No such model file
+    """
+    model_dir = os.getenv("RVC_MODEL_DIR", "/models")
+    model_path = os.path.join(model_dir, model_name)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model not found: {model_name}")
+
+    logger.info(f"Loading model {model_name} on {rvc_device}")
+    instance = RVC(device=rvc_device)
+    instance.load_model(model_path)
+
+    # File size when the instance exposes no networks to count
+    size_bytes = resident_bytes(instance)
+    return instance, size_bytes if size_bytes > 0 else os.path.getsize(model_path)
+
+
+def release_rvc_model(model_name: str, instance) -> None:
+    """Free an evicted model's weights (model cache eviction hook)"""
+    import torch
+
+    if hasattr(instance, "unload_model"):
+        instance.unload_model()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+model_cache = ModelCache(load_rvc_model, MODEL_CACHE_MB * 1024 * 1024, on_evict=release_rvc_model)
+
+
+def init_worker(device: str, torch_threads: int = 0) -> None:
+    """
+    Process pool initializer
+
+    Args:
+        device: Device for model instances in this process
+        torch_threads: Intra-op threads per process (0 = torch default), so
+            N worker processes do not each start one thread per core
+    """
+    global rvc_device
+    rvc_device = device
+    if torch_threads > 0:
+        import torch
+        torch.set_num_threads(torch_threads)
+
+
+def set_device(device: str) -> None:
+    """Create models on device from now on; resident models are dropped"""
+    global rvc_device
+    rvc_device = device
+    model_cache.clear()
+
+
+def load_model(model_name: str) -> bool:
+    """
+    Make a model resident in this process's cache
+
+    Returns:
+        True if it was already loaded
+
+    Raises:
+        FileNotFoundError: No such model file
+    """
+    cached = model_name in model_cache
+    model_cache.get(model_name)
+    return cached
+
+
+def read_wav(data: bytes) -> tuple:
+    """
+    Decode audio bytes in memory
+
+    Returns:
+        (float32 samples, (frames,) for mono or (frames, channels), sample rate)
+
+    Raises:
+        RuntimeError: libsndfile cannot decode the data
+    """
+    import soundfile as sf
+
+    audio, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=False)
+    return audio, sample_rate
+
+
+def write_wav(audio, sample_rate: int) -> bytes:
+    """Encode samples as 16-bit PCM WAV bytes in memory"""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def audio_seconds(data: bytes) -> Optional[float]:
+    """Duration from the header alone (None if libsndfile cannot read it)"""
+    import soundfile as sf
+
+    try:
+        info = sf.info(io.BytesIO(data))
+    except RuntimeError:
+        return None
+    return info.frames / info.samplerate if info.samplerate else None
+
+
+def stream_header(sample_rate: int, channels: int) -> bytes:
+    """16-bit PCM WAV header with unknown sizes, for audio sent as it is converted"""
+    import struct
+
+    block_align = channels * 2
+    return (
+        b'RIFF' + struct.pack('<I', UNKNOWN_SIZE) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16)
+        + b'data' + struct.pack('<I', UNKNOWN_SIZE)
+    )
+
+
+def pcm16(audio) -> bytes:
+    """Float samples in [-1, 1] as interleaved little-endian 16-bit PCM"""
+    import numpy as np
+
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype('<i2').tobytes()
+
+
+def _infer_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "f0method": params["f0method"],
+        "pitch": 0,  # Use default pitch
+        "index_rate": params["index_rate"],
+        "filter_radius": params["filter_radius"],
+        "resample_sr": params["resample_sr"],
+        "rms_mix_rate": params["rms_mix_rate"],
+        "protect": params["protect"]
+    }
+
+
+def supports_pipeline(rvc) -> bool:
+    """
+    Whether a model instance can convert decoded samples in memory
+
+    rvc-python keeps the loaded voice on rvc.vc: HuBERT, the generator
+    (net_g) and a Pipeline whose pipeline() converts a 16 kHz mono array.
+    infer_file() wraps the same call between a file load and a WAV write;
+    instances without it (or RVC_IN_MEMORY=false) go through temp files.
+    """
+    vc = getattr(rvc, "vc", None)
+    pipeline = getattr(vc, "pipeline", None)
+    return IN_MEMORY and getattr(vc, "net_g", None) is not None and callable(getattr(pipeline, "pipeline", None))
+
+
+# Harvest caches f0 by input path; in-memory calls each get a key of their own
+_pipeline_keys = itertools.count()
+
+
+def _run_pipeline(rvc, audio, sample_rate: int, params: Dict[str, Any]) -> Tuple[Any, int]:
+    # What infer_file does between loading its input file and writing its output
+    import numpy as np
+
+    vc = rvc.vc
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if sample_rate != PIPELINE_SAMPLE_RATE:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=PIPELINE_SAMPLE_RATE)
+    peak = np.abs(audio).max() / 0.95 if len(audio) else 0.0
+    if peak > 1:
+        audio = audio / peak
+
+    if vc.hubert_model is None:
+        from rvc_python.modules.vc.utils import load_hubert
+        vc.hubert_model = load_hubert(vc.config, vc.lib_dir)
+
+    model_info = getattr(rvc, "models", {}).get(getattr(rvc, "current_model", None)) or {}
+    file_index = (model_info.get("index") or "").replace("trained", "added")  # As vc_single does
+    infer = _infer_params(params)
+    key = f"memory:{next(_pipeline_keys)}"
+    try:
+        converted = vc.pipeline.pipeline(
+            model=vc.hubert_model,
+            net_g=vc.net_g,
+            sid=0,
+            audio=audio,
+            input_audio_path=key,
+            times=[0, 0, 0],
+            f0_up_key=infer["pitch"],
+            f0_method=infer["f0method"],
+            file_index=file_index,
+            index_rate=infer["index_rate"],
+            if_f0=vc.if_f0,
+            filter_radius=infer["filter_radius"],
+            tgt_sr=vc.tgt_sr,
+            resample_sr=infer["resample_sr"],
+            rms_mix_rate=infer["rms_mix_rate"],
+            version=vc.version,
+            protect=infer["protect"],
+            f0_file=None
+        )
+    finally:
+        # Harvest leaves the input in a module-level dict keyed by path
+        module = sys.modules.get(type(vc.pipeline).__module__)
+        getattr(module, "input_audio_path2wav", {}).pop(key, None)
+
+    resample_sr = infer["resample_sr"]
+    output_rate = resample_sr if vc.tgt_sr != resample_sr >= 16000 else vc.tgt_sr
+    # The pipeline returns int16 samples
+    return np.asarray(converted, dtype=np.float32) / 32768.0, output_rate
+
+
+def plan_segments(
+    audio,
+    sample_rate: int,
+    segment_seconds: float = SEGMENT_SECONDS,
+    overlap_seconds: float = SEGMENT_OVERLAP_SECONDS,
+    split: str = "silence"
+) -> List[Tuple[int, int, int]]:
+    """
+    Split a clip into overlapping segments
+
+    Cut points fall about every `segment_seconds`; with split="silence" each
+    one moves to the quietest 20 ms window within SEGMENT_SEARCH_SECONDS of
+    its target, so crossfades land in pauses rather than mid-phoneme.
+    Segments extend half the overlap past each cut on both sides.
+
+    Returns:
+        [(start frame, end frame, frames shared with the next segment)]; one
+        segment covering the clip when it is short enough
+    """
+    import numpy as np
+
+    total = len(audio)
+    target = max(1, int(segment_seconds * sample_rate))
+    half_overlap = int(overlap_seconds * sample_rate / 2)
+    if total <= target * 1.5:
+        return [(0, total, 0)]
+
+    search = int(SEGMENT_SEARCH_SECONDS * sample_rate) if split == "silence" else 0
+    window = max(1, int(ENERGY_WINDOW_SECONDS * sample_rate))
+    mono = audio if audio.ndim == 1 else audio.mean(axis=1)
+    windows = total // window
+    energy = np.square(mono[:windows * window].reshape(windows, window)).mean(axis=1)
+
+    cuts = [0]
+    # Stop when the rest fits in one segment, so the last one is never a sliver
+    while total - cuts[-1] > target * 1.5:
+        low = max(cuts[-1] + target // 2, cuts[-1] + target - search)
+        high = min(total - target // 2, cuts[-1] + target + search)
+        first, last = low // window, max(low // window + 1, high // window)
+        if search and last <= len(energy):
+            cut = (first + int(np.argmin(energy[first:last]))) * window + window // 2
+        else:
+            cut = cuts[-1] + target
+        cuts.append(min(max(cut, low), high))
+    cuts.append(total)
+
+    segments = []
+    for i in range(len(cuts) - 1):
+        start = max(0, cuts[i] - half_overlap)
+        end = min(total, cuts[i + 1] + half_overlap)
+        shared = end - max(0, cuts[i + 1] - half_overlap) if i + 2 < len(cuts) else 0
+        segments.append((start, end, shared))
+    return segments
+
+
+class SegmentStitcher:
+    """
+    Joins converted segments in order, crossfading the frames neighbouring
+    segments share; only the shared tail of the last segment is held back
+    """
+
+    def __init__(self):
+        self._tail = None
+        self._empty = None  # Zero frames shaped like the output (mono or multichannel)
+
+    def add(self, audio, shared_input_frames: int, input_frames: int):
+        """
+        Add the next converted segment
+
+        Args:
+            audio: Converted samples
+            shared_input_frames: Input frames this segment shares with the next
+            input_frames: Input frames of this segment (the output rate may differ)
+
+        Returns:
+            Samples that are final and can be emitted
+        """
+        import numpy as np
+
+        audio = np.asarray(audio, dtype=np.float32)
+        self._empty = audio[:0]
+        if self._tail is not None:
+            overlap = min(len(self._tail), len(audio))
+            fade = np.linspace(0.0, 1.0, overlap, endpoint=False, dtype=np.float32)
+            if audio.ndim > 1:
+                fade = fade[:, None]
+            audio = np.concatenate([self._tail[:overlap] * (1.0 - fade) + audio[:overlap] * fade, audio[overlap:]])
+
+        keep = round(len(audio) * shared_input_frames / input_frames) if input_frames else 0
+        keep = min(keep, len(audio))
+        self._tail = audio[len(audio) - keep:] if keep else None
+        return audio[:len(audio) - keep]
+
+    def finish(self):
+        """Whatever was held back (nothing after a last segment)"""
+        import numpy as np
+
+        tail, self._tail = self._tail, None
+        if tail is not None:
+            return tail
+        return self._empty if self._empty is not None else np.zeros(0, dtype=np.float32)
+
+
+def _convert_files(rvc, audio_bytes: bytes, params: Dict[str, Any], timer: StageTimer) -> bytes:
+    # Write input audio to temp file
+    with timer.stage("write_input"):
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False, dir=TEMP_DIR) as input_file:
+            input_path = input_file.name
+            input_file.write(audio_bytes)
+
+        # Output temp file
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False, dir=TEMP_DIR) as output_file:
+            output_path = output_file.name
+
+    try:
+        # Perform RVC conversion
+        with timer.stage("inference"):
+            rvc.infer_file(input_path=input_path, output_path=output_path, **_infer_params(params))
+
+        # Read converted audio
+        with timer.stage("read_output"):
+            with open(output_path, 'rb') as f:
+                return f.read()
+    finally:
+        # Cleanup temp files
+        if os.path.exists(input_path):
+            os.unlink(input_path)
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+
+
+def _convert_samples(rvc, audio, sample_rate: int, params: Dict[str, Any], timer: StageTimer) -> Tuple[Any, int]:
+    # One segment; backends without an in-memory pipeline get it through a temp WAV
+    if supports_pipeline(rvc):
+        with timer.stage("inference"):
+            return _run_pipeline(rvc, audio, sample_rate, params)
+    with timer.stage("encode_wav"):
+        segment_bytes = write_wav(audio, sample_rate)
+    converted_bytes = _convert_files(rvc, segment_bytes, params, timer)
+    with timer.stage("decode_wav"):
+        return read_wav(converted_bytes)
+
+
+def iter_converted_segments(
+    rvc,
+    audio,
+    sample_rate: int,
+    segments: List[Tuple[int, int, int]],
+    params: Dict[str, Any],
+    timer: StageTimer
+) -> Iterator[Tuple[Any, int]]:
+    """Convert segments one after another, yielding (final samples, output rate) as they are stitched"""
+    stitcher = SegmentStitcher()
+    output_rate = sample_rate
+    for start, end, shared in segments:
+        converted, output_rate = _convert_samples(rvc, audio[start:end], sample_rate, params, timer)
+        yield stitcher.add(converted, shared, end - start), output_rate
+    yield stitcher.finish(), output_rate
+
+
+def _convert_clip(rvc, audio_bytes: bytes, params: Dict[str, Any], timer: StageTimer) -> Tuple[bytes, int]:
+    # (WAV bytes, segments converted)
+    duration = audio_seconds(audio_bytes)
+    segmented = duration is not None and duration > SEGMENT_THRESHOLD_SECONDS
+    # Input libsndfile cannot decode is left to the backend's own loader
+    if segmented or (duration is not None and supports_pipeline(rvc)):
+        import numpy as np
+
+        with timer.stage("decode_wav"):
+            audio, sample_rate = read_wav(audio_bytes)
+        segments = plan_segments(audio, sample_rate) if segmented else [(0, len(audio), 0)]
+        pieces = []
+        output_rate = sample_rate
+        for piece, output_rate in iter_converted_segments(rvc, audio, sample_rate, segments, params, timer):
+            pieces.append(piece)
+        with timer.stage("encode_wav"):
+            return write_wav(np.concatenate(pieces), output_rate), len(segments)
+
+    return _convert_files(rvc, audio_bytes, params, timer), 1
+
+
+def convert_audio(audio_base64: str, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode, convert and encode one clip
+
+    rvc-python models convert the decoded samples in memory; other backends,
+    and input libsndfile cannot decode, go through temp files in TEMP_DIR.
+    Clips longer than SEGMENT_THRESHOLD_SECONDS are converted in segments
+    joined with crossfades, so inference memory does not grow with length.
+
+    Args:
+        audio_base64: Input WAV (base64)
+        model_name: Voice model file name
+        params: RVCParams fields
+
+    Returns:
+        {"audio": WAV bytes, "stages": [(stage, seconds)], "model_loaded": whether the model had to be loaded,
+         "segments": segments converted}
+
+    Raises:
+        FileNotFoundError: No such model file
+    """
+    timer = StageTimer()
+
+    with timer.stage("decode"):
+        audio_bytes = base64.b64decode(audio_base64)
+
+    with ExitStack() as stack:
+        # Resident models are served from the cache; others are loaded once.
+        # A request for a model another worker is using waits for it here.
+        model_loaded = model_name not in model_cache
+        with timer.stage("load_model" if model_loaded else "model_wait"):
+            rvc = stack.enter_context(model_cache.use(model_name))
+        result_bytes, segments = _convert_clip(rvc, audio_bytes, params, timer)
+
+    return {"audio": result_bytes, "stages": timer.stages, "model_loaded": model_loaded, "segments": segments}
+
+
+def prepare_segments(audio_base64: str, segment_seconds: float, overlap_seconds: float, split: str) -> Dict[str, Any]:
+    """
+    Decode a clip and plan its segments (first step of a streamed conversion)
+
+    Returns:
+        {"audio": samples, "sample_rate", "segments": [(start, end, shared)], "stages"}
+
+    Raises:
+        RuntimeError: libsndfile cannot decode the input
+    """
+    timer = StageTimer()
+    with timer.stage("decode"):
+        audio_bytes = base64.b64decode(audio_base64)
+    with timer.stage("decode_wav"):
+        audio, sample_rate = read_wav(audio_bytes)
+    with timer.stage("plan_segments"):
+        segments = plan_segments(audio, sample_rate, segment_seconds, overlap_seconds, split)
+    return {"audio": audio, "sample_rate": sample_rate, "segments": segments, "stages": timer.stages}
+
+
+def convert_segment(model_name: str, audio, sample_rate: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert one segment of a streamed conversion
+
+    Returns:
+        {"audio": converted samples, "sample_rate": output rate, "stages"}
+
+    Raises:
+        FileNotFoundError: No such model file
+    """
+    timer = StageTimer()
+    with ExitStack() as stack:
+        with timer.stage("load_model" if model_name not in model_cache else "model_wait"):
+            rvc = stack.enter_context(model_cache.use(model_name))
+        converted, output_rate = _convert_samples(rvc, audio, sample_rate, params, timer)
+    return {"audio": converted, "sample_rate": output_rate, "stages": timer.stages}
+
+
+def separate_vocals(audio_path: str, output_dir: str) -> tuple[str, str]:
+    """
+    Separate vocals from audio using Demucs v4
+
+    Args:
+        audio_path: Input audio file path
+        output_dir: Output directory
+
+    Returns:
+        (vocals_path, accompaniment_path)
+    """
+    logger.info(f"Separating vocals with Demucs: {audio_path}")
+
+    try:
+        # Run Demucs
+        subprocess.run([
+            "demucs",
+            "--two-stems=vocals",
+            "-o", output_dir,
+            audio_path
+        ], check=True, capture_output=True, text=True)
+
+        # Find output files
+        # Demucs creates: output_dir/htdemucs/{filename}/vocals.wav, no_vocals.wav
+        base_name = os.path.splitext(os.path.basename(audio_path))[0]
+        vocals_path = os.path.join(output_dir, "htdemucs", base_name, "vocals.wav")
+        accompaniment_path = os.path.join(output_dir, "htdemucs", base_name, "no_vocals.wav")
+
+        if not os.path.exists(vocals_path):
+            raise FileNotFoundError(f"Vocals not found: {vocals_path}")
+
+        logger.info(f"Separation completed: vocals={vocals_path}")
+
+        return vocals_path, accompaniment_path
+
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Demucs failed: {e.stderr}")
+        raise RuntimeError(f"Demucs separation failed: {e.stderr}")
+
+
+def separate_audio(audio_base64: str) -> Dict[str, Any]:
+    """
+    Decode one clip and split it into vocals and accompaniment
+
+    Returns:
+        {"vocals": WAV bytes, "accompaniment": WAV bytes or None, "stages": [(stage, seconds)]}
+    """
+    timer = StageTimer()
+
+    with timer.stage("decode"):
+        audio_bytes = base64.b64decode(audio_base64)
+
+    # Create temp directory for Demucs output
+    with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+        # Write input audio
+        input_path = os.path.join(temp_dir, "input.wav")
+        with timer.stage("write_input"):
+            with open(input_path, 'wb') as f:
+                f.write(audio_bytes)
+
+        # Separate vocals
+        with timer.stage("separation"):
+            vocals_path, accompaniment_path = separate_vocals(input_path, temp_dir)
+
+        # Read separated audio files
+        with timer.stage("read_output"):
+            with open(vocals_path, 'rb') as f:
+                vocals_bytes = f.read()
+
+            accompaniment_bytes = None
+            if os.path.exists(accompaniment_path):
+                with open(accompaniment_path, 'rb') as f:
+                    accompaniment_bytes = f.read()
+
+    return {"vocals": vocals_bytes, "accompaniment": accompaniment_bytes, "stages": timer.stages}
@@ -0,0 +1,320 @@
+"""
+Resident model cache for the RVC server
+Loaded voice models stay in memory, ordered by recency and bounded by a
+memory budget; pinned models are never evicted
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+
+class ModelPinnedError(Exception):
+    """Raised when evicting a pinned model without force"""
+    pass
+
+
+class ModelBusyError(Exception):
+    """Raised when evicting a model that is running an inference"""
+    pass
+
+
+class CachedModel:
+    """A loaded model and its bookkeeping"""
+
+    def __init__(self, name: str, model: Any, size_bytes: int, load_seconds: float):
+        self.name = name
+        self.model = model
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 0
+        self.pinned = False
+        # One inference per model at a time; busy models are never evicted
+        self.lock = threading.Lock()
+        self.busy = 0
+        # Set by clear() while busy: released when the last inference finishes
+        self.stale = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size_mb": round(self.size_bytes / (1024 * 1024), 1),
+            "load_seconds": round(self.load_seconds, 3),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "uses": self.uses,
+            "pinned": self.pinned,
+            "busy": self.busy > 0
+        }
+
+
+class _PendingLoad:
+    """A load in progress; other requests for the same model wait on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models bounded by memory
+
+    `loader(name)` returns (model, size in bytes) and may raise. It runs
+    outside the cache lock, so hits, other loads and cache management go on
+    while a model loads; concurrent requests for the same missing model wait
+    for that one load. Before a load, least recently used unpinned models are
+    evicted to make room for the model's size from its previous load (if
+    known), so a reload does not briefly need twice the memory.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Tuple[Any, int]],
+        budget_bytes: int,
+        on_evict: Optional[Callable[[str, Any], None]] = None
+    ):
+        self.loader = loader
+        self.budget_bytes = budget_bytes
+        self.on_evict = on_evict
+        self._models: "OrderedDict[str, CachedModel]" = OrderedDict()
+        self._known_sizes: Dict[str, int] = {}
+        self._loading: Dict[str, _PendingLoad] = {}
+        # Bumped by clear(), so a load that started before it is not kept
+        self._generation = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._models.values())
+
+    def get(self, name: str) -> Any:
+        """
+        Loaded model for name, loading it on a miss
+
+        Raises:
+            Whatever the loader raises (e.g. FileNotFoundError)
+        """
+        return self._acquire(name).model
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """
+        Loaded model held exclusively for the block
+
+        Worker threads running inference use this: two requests for the same
+        model take turns (a model instance is not thread-safe), requests for
+        different models run in parallel, and a model in use is not evicted.
+
+        Raises:
+            Whatever the loader raises (e.g. FileNotFoundError)
+        """
+        entry = self._acquire(name, busy=True)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.busy -= 1
+                if entry.stale and not entry.busy:
+                    self.evictions += 1
+                    self._release(entry)
+
+    def pin(self, name: str) -> CachedModel:
+        """Keep a model resident until unpinned (loads it if needed)"""
+        entry = self._acquire(name, busy=True)
+        with self._lock:
+            entry.pinned = True
+            entry.busy -= 1
+        return entry
+
+    def unpin(self, name: str) -> bool:
+        """Make a model evictable again; False if it is not loaded"""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                return False
+            entry.pinned = False
+            return True
+
+    def evict(self, name: str, force: bool = False) -> bool:
+        """
+        Drop a model from memory
+
+        Returns:
+            False if the model was not loaded
+
+        Raises:
+            ModelPinnedError: The model is pinned and force is False
+            ModelBusyError: The model is running an inference
+        """
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                return False
+            if entry.pinned and not force:
+                raise ModelPinnedError(f"Model is pinned: {name}")
+            if entry.busy:
+                raise ModelBusyError(f"Model is in use: {name}")
+            self._drop(entry)
+            return True
+
+    def clear(self) -> int:
+        """
+        Drop every model, pinned ones included (e.g. after a device change)
+
+        Models running an inference leave the cache at once but keep their
+        weights until their last inference finishes; loads in progress are
+        not kept.
+
+        Returns:
+            Number of models whose release waits for a running inference
+        """
+        with self._lock:
+            self._generation += 1
+            busy = 0
+            for entry in list(self._models.values()):
+                if entry.busy:
+                    del self._models[entry.name]
+                    entry.stale = True
+                    busy += 1
+                else:
+                    self._drop(entry)
+            if busy:
+                logger.info(f"Model cache cleared; {busy} busy models are released when their inference finishes")
+            return busy
+
+    def loaded(self) -> List[str]:
+        """Names of resident models, least recently used first"""
+        return list(self._models)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "models": [entry.to_dict() for entry in reversed(self._models.values())],  # Most recent first
+                "count": len(self._models),
+                "loading": sorted(self._loading),
+                "used_mb": round(self.used_bytes / (1024 * 1024), 1),
+                "budget_mb": round(self.budget_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+    def _acquire(self, name: str, busy: bool = False) -> CachedModel:
+        """Entry for name, loading it on a miss; with busy, marked busy before the lock is released"""
+        first = True
+        while True:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    if first:
+                        self.hits += 1
+                    self._models.move_to_end(name)
+                    return self._touch(entry, busy)
+
+                if first:
+                    self.misses += 1
+                first = False
+                pending = self._loading.get(name)
+                leader = pending is None
+                if leader:
+                    pending = self._loading[name] = _PendingLoad()
+                    generation = self._generation
+                    self._make_room(self._known_sizes.get(name, 0))
+
+            if not leader:
+                pending.done.wait()
+                if pending.error is not None:
+                    raise pending.error
+                continue  # Pick up the loaded entry (or load again if it is gone already)
+
+            try:
+                entry = self._load(name)
+            except BaseException as e:
+                with self._lock:
+                    del self._loading[name]
+                pending.error = e
+                pending.done.set()
+                raise
+
+            with self._lock:
+                del self._loading[name]
+                kept = generation == self._generation
+                if kept:
+                    self._add(entry)
+                    self._touch(entry, busy)
+            pending.done.set()
+            if kept:
+                return entry
+            # clear() ran during the load (e.g. a device change): load again
+            logger.info(f"Discarding model loaded before the cache was cleared: {name}")
+            self._release(entry)
+
+    def _touch(self, entry: CachedModel, busy: bool) -> CachedModel:
+        entry.uses += 1
+        entry.last_used = time.time()
+        if busy:
+            entry.busy += 1
+        return entry
+
+    def _load(self, name: str) -> CachedModel:
+        start_time = time.perf_counter()
+        model, size_bytes = self.loader(name)
+        entry = CachedModel(name, model, size_bytes, time.perf_counter() - start_time)
+        logger.info(f"Model loaded into cache: {name} ({entry.size_bytes / (1024 * 1024):.0f} MB, {entry.load_seconds:.2f}s)")
+        return entry
+
+    def _add(self, entry: CachedModel) -> None:
+        self._models[entry.name] = entry
+        self._known_sizes[entry.name] = entry.size_bytes
+
+        # The first load of a model only learns its size afterwards
+        self._make_room(0, keep=entry.name)
+        if self.used_bytes > self.budget_bytes:
+            logger.warning(
+                f"Model cache over budget: {self.used_bytes / (1024 * 1024):.0f} MB used, "
+                f"{self.budget_bytes / (1024 * 1024):.0f} MB allowed (pinned or single large model)"
+            )
+
+    def _make_room(self, incoming_bytes: int, keep: Optional[str] = None) -> None:
+        while self.used_bytes + incoming_bytes > self.budget_bytes:
+            victim = self._least_recent_evictable(keep)
+            if victim is None:
+                return
+            self._drop(victim)
+
+    def _least_recent_evictable(self, keep: Optional[str]) -> Optional[CachedModel]:
+        for entry in self._models.values():
+            if not entry.pinned and not entry.busy and entry.name != keep:
+                return entry
+        return None
+
+    def _drop(self, entry: CachedModel) -> None:
+        del self._models[entry.name]
+        self.evictions += 1
+        logger.info(f"Evicted model from cache: {entry.name}")
+        self._release(entry)
+
+    def _release(self, entry: CachedModel) -> None:
+        if self.on_evict is not None:
+            try:
+                self.on_evict(entry.name, entry.model)
+            except Exception as e:
+                logger.warning(f"Model eviction hook failed for {entry.name}: {e}")
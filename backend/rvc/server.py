@@ -3,24 +3,25 @@ RVC API Server
 Voice Conversion Service
 Port: 10102
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import asyncio
 import base64
 import io
+import json
+import os
+import time
 import uvicorn
 from loguru import logger
 
-# RVC imports
-try:
-    from rvc_python import RVC
-    RVC_AVAILABLE = True
-except ImportError:
-    logger.warning("rvc-python not installed, running in API-only mode")
-    RVC_AVAILABLE = False
-    RVC = None
+import inference
+from inference import RVC_AVAILABLE, StageTimer, model_cache
+from model_cache import ModelBusyError, ModelPinnedError
+from workers import PoolFullError, pool_from_env
 
 app = FastAPI(
     title="MioVo RVC Service",
@@ -29,22 +30,38 @@ app = FastAPI(
 )
 
 # Global state for RVC service
-rvc_instance = None
 current_model = None
 current_params = None
-model_cache = {}  # LRU cache for loaded models (max 5-7 models)
-MAX_CACHE_SIZE = 7
 
+# Blocking work (loads, inference, Demucs, file I/O) runs here, off the event loop
+inference_pool = pool_from_env()
+if inference_pool.mode == "process":
+    # Each worker process gets the device and its share of the cores
+    inference_pool.initializer = inference.init_worker
+    inference_pool.restart(initargs=(inference.rvc_device, max(1, (os.cpu_count() or 1) // inference_pool.workers)))
 
-def init_rvc():
-    """Initialize RVC instance"""
-    global rvc_instance
-    if RVC_AVAILABLE and rvc_instance is None:
-        import os
-        device = os.getenv("RVC_DEVICE", "cuda:0")
-        logger.info(f"Initializing RVC with device: {device}")
-        rvc_instance = RVC(device=device)
-    return rvc_instance
+
+def pool_full_response(error: PoolFullError) -> HTTPException:
+    """503 telling the caller when the queue is likely to have room"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def require_thread_executor() -> None:
+    """Cache management acts on this process's cache, which process workers do not share"""
+    if inference_pool.mode != "thread":
+        raise HTTPException(
+            status_code=409,
+            detail="Model cache management needs RVC_EXECUTOR=thread (each worker process keeps its own cache)"
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_inference_pool():
+    inference_pool.shutdown()
 
 
 class RVCParams(BaseModel):
@@ -62,6 +79,10 @@ class ConvertRequest(BaseModel):
     audio_base64: str
     model_name: str
     params: Optional[RVCParams] = None
+    # Segmentation for /convert/stream (defaults: RVC_SEGMENT_SECONDS, RVC_SEGMENT_OVERLAP_SECONDS)
+    segment_seconds: Optional[float] = None
+    overlap_seconds: Optional[float] = None
+    split: str = "silence"  # silence (cut in the quietest nearby spot), fixed
 
 
 class SeparationRequest(BaseModel):
@@ -70,49 +91,6 @@ class SeparationRequest(BaseModel):
     model: str = "htdemucs"  # Demucs model preset
 
 
-def separate_vocals(audio_path: str, output_dir: str) -> tuple[str, str]:
-    """
-    Separate vocals from audio using Demucs v4
-    
-    Args:
-        audio_path: Input audio file path
-        output_dir: Output directory
-        
-    Returns:
-        (vocals_path, accompaniment_path)
-    """
-    import subprocess
-    import os
-    
-    logger.info(f"Separating vocals with Demucs: {audio_path}")
-    
-    try:
-        # Run Demucs
-        subprocess.run([
-            "demucs",
-            "--two-stems=vocals",
-            "-o", output_dir,
-            audio_path
-        ], check=True, capture_output=True, text=True)
-        
-        # Find output files
-        # Demucs creates: output_dir/htdemucs/{filename}/vocals.wav, no_vocals.wav
-        base_name = os.path.splitext(os.path.basename(audio_path))[0]
-        vocals_path = os.path.join(output_dir, "htdemucs", base_name, "vocals.wav")
-        accompaniment_path = os.path.join(output_dir, "htdemucs", base_name, "no_vocals.wav")
-        
-        if not os.path.exists(vocals_path):
-            raise FileNotFoundError(f"Vocals not found: {vocals_path}")
-        
-        logger.info(f"Separation completed: vocals={vocals_path}")
-        
-        return vocals_path, accompaniment_path
-        
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Demucs failed: {e.stderr}")
-        raise RuntimeError(f"Demucs separation failed: {e.stderr}")
-
-
 # Health check
 @app.get("/health")
 async def health_check():
@@ -122,7 +100,9 @@ async def health_check():
         "service": "miovo-rvc",
         "version": "0.1.0",
         "rvc_loaded": current_model is not None,
-        "current_model": current_model
+        "current_model": current_model,
+        "models_loaded": len(model_cache),
+        "executor": inference_pool.stats()
     }
 
 
@@ -151,57 +131,87 @@ async def get_models():
 @app.post("/models/{model_name}")
 async def load_model(model_name: str):
     """Load RVC model into memory (LRU cache)"""
-    global current_model, model_cache
+    global current_model
     
     if not RVC_AVAILABLE:
         raise HTTPException(status_code=503, detail="RVC not available")
     
     try:
-        import os
-        import torch
-        
-        logger.info(f"Loading model: {model_name}")
-        
-        # Initialize RVC if needed
-        rvc = init_rvc()
-        if not rvc:
-            raise HTTPException(status_code=500, detail="Failed to initialize RVC")
-        
-        # Model path
-        model_dir = os.getenv("RVC_MODEL_DIR", "/models")
-        model_path = os.path.join(model_dir, model_name)
-        
-        if not os.path.exists(model_path):
-            raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
-        
-        # Load model using rvc-python
-        rvc.load_model(model_path)
-        
-        # Update cache (LRU)
-        if len(model_cache) >= MAX_CACHE_SIZE:
-            # Remove oldest
-            oldest_key = next(iter(model_cache))
-            del model_cache[oldest_key]
-            torch.cuda.empty_cache()
-            logger.info(f"Evicted model from cache: {oldest_key}")
-        
-        model_cache[model_name] = {"loaded_at": datetime.utcnow().isoformat()}
+        cached, _ = await inference_pool.run(inference.load_model, model_name)
         current_model = model_name
         
-        logger.info(f"Model loaded successfully: {model_name}")
+        logger.info(f"Model ready: {model_name} ({'cached' if cached else 'loaded'})")
         
         return {
             "status": "loaded",
             "model": model_name,
+            "cached": cached,
             "cache_size": len(model_cache)
         }
-    except HTTPException:
-        raise
+    except PoolFullError as e:
+        raise pool_full_response(e)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Model cache
+@app.get("/models/cache")
+async def get_model_cache():
+    """Resident models (most recently used first), memory use and hit counters"""
+    require_thread_executor()
+    # Off the event loop: the cache lock may be held by a worker thread
+    return await run_in_threadpool(model_cache.stats)
+
+
+@app.delete("/models/{model_name}")
+async def evict_model(model_name: str, force: bool = False):
+    """Drop a model from memory (pinned models need force=true)"""
+    global current_model
+    
+    require_thread_executor()
+    try:
+        evicted = await run_in_threadpool(model_cache.evict, model_name, force=force)
+    except (ModelPinnedError, ModelBusyError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not evicted:
+        raise HTTPException(status_code=404, detail=f"Model not loaded: {model_name}")
+    
+    if current_model == model_name:
+        current_model = None
+    return {"status": "evicted", "model": model_name, "cache_size": len(model_cache)}
+
+
+@app.post("/models/{model_name}/pin")
+async def pin_model(model_name: str):
+    """Load a model if needed and keep it resident regardless of recency"""
+    if not RVC_AVAILABLE:
+        raise HTTPException(status_code=503, detail="RVC not available")
+    require_thread_executor()
+    
+    try:
+        entry, _ = await inference_pool.run(model_cache.pin, model_name)
+    except PoolFullError as e:
+        raise pool_full_response(e)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
+    except Exception as e:
+        logger.error(f"Failed to pin model: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "pinned", **entry.to_dict()}
+
+
+@app.delete("/models/{model_name}/pin")
+async def unpin_model(model_name: str):
+    """Let a pinned model be evicted again"""
+    require_thread_executor()
+    if not await run_in_threadpool(model_cache.unpin, model_name):
+        raise HTTPException(status_code=404, detail=f"Model not loaded: {model_name}")
+    return {"status": "unpinned", "model": model_name}
+
+
 # Set parameters
 @app.post("/params")
 async def set_params(params: RVCParams):
@@ -232,104 +242,200 @@ async def get_params():
 
 # Convert voice
 @app.post("/convert")
-async def convert_voice(request: ConvertRequest):
+async def convert_voice(request: ConvertRequest, http_request: Request, response: Response):
     """
     Convert voice using RVC
     
+    Decoding, model loading and inference run on the
+    inference pool, so the server keeps answering while it converts.
+    
     Args:
         request: Audio data (base64) + model name + parameters
         
     Returns:
-        Converted audio (base64)
+        Converted audio (base64), or raw WAV when the Accept header asks for audio/wav;
+        stage durations in the Server-Timing header
     """
+    global current_model
+    
     if not RVC_AVAILABLE:
         raise HTTPException(status_code=503, detail="RVC not available")
     
+    start_time = time.time()
+    timer = StageTimer(http_request.headers.get("X-Trace-Id"))
+    
+    # Use request params if provided, otherwise use global current_params
+    params = request.params or current_params or RVCParams()
+    
+    logger.info(f"Converting with model: {request.model_name}")
+    logger.info(f"Using params: f0method={params.f0method}, protect={params.protect}")
+    
     try:
-        import os
-        import tempfile
-        import soundfile as sf
-        import numpy as np
-        
-        # Decode base64 audio
-        audio_bytes = base64.b64decode(request.audio_base64)
-        
-        logger.info(f"Converting with model: {request.model_name}")
-        
-        # Initialize RVC if needed
-        rvc = init_rvc()
-        if not rvc:
-            raise HTTPException(status_code=500, detail="Failed to initialize RVC")
-        
-        # Load model if different from current
-        if current_model != request.model_name:
-            model_dir = os.getenv("RVC_MODEL_DIR", "/models")
-            model_path = os.path.join(model_dir, request.model_name)
-            if not os.path.exists(model_path):
-                raise HTTPException(status_code=404, detail=f"Model not found: {request.model_name}")
-            rvc.load_model(model_path)
-        
-        # Use request params if provided, otherwise use global current_params
-        params = request.params or current_params or RVCParams()
+        job, queue_seconds = await inference_pool.run(
+            inference.convert_audio, request.audio_base64, request.model_name, params.dict()
+        )
+        timer.add("queue", queue_seconds)
+        for stage, seconds in job["stages"]:
+            timer.add(stage, seconds)
+        result_bytes = job["audio"]
+        current_model = request.model_name
+        
+        processing_time = round(time.time() - start_time, 3)
+        logger.info(
+            f"Conversion completed: {len(result_bytes)} bytes in {processing_time}s "
+            f"({job['segments']} segment(s))"
+        )
+        
+        # Raw WAV for callers that accept it (skips base64 on the tunnel link)
+        if "audio/wav" in http_request.headers.get("accept", ""):
+            return Response(
+                content=result_bytes,
+                media_type="audio/wav",
+                headers={
+                    "X-Model": request.model_name,
+                    "X-Params-Used": json.dumps(params.dict(), separators=(',', ':')),
+                    "X-Processing-Time": str(processing_time),
+                    "Server-Timing": timer.header()
+                }
+            )
         
-        logger.info(f"Using params: f0method={params.f0method}, protect={params.protect}")
+        # Encode to base64
+        with timer.stage("encode"):
+            result_base64 = base64.b64encode(result_bytes).decode('utf-8')
         
-        # Write input audio to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as input_file:
-            input_path = input_file.name
-            input_file.write(audio_bytes)
+        response.headers["Server-Timing"] = timer.header()
+        return {
+            "status": "converted",
+            "audio_base64": result_base64,
+            "model": request.model_name,
+            "params_used": params.dict(),
+            "processing_time": processing_time,
+            "timings": timer.to_dict()
+        }
         
-        # Output temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as output_file:
-            output_path = output_file.name
+    except PoolFullError as e:
+        raise pool_full_response(e)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model not found: {request.model_name}")
+    except Exception as e:
+        logger.error(f"Conversion failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        timer.log("Conversion")
+
+
+# Convert voice, streaming segments as they finish
+@app.post("/convert/stream")
+async def convert_voice_stream(request: ConvertRequest, http_request: Request):
+    """
+    Convert long audio in overlapping segments and stream the result
+    
+    The clip is cut near silence about every segment_seconds; segments are
+    converted on the inference pool (the next one while the previous is
+    sent) and joined with crossfades over the overlap. The first audio is
+    sent as soon as the first segment is converted, and inference memory
+    stays that of one segment whatever the clip length.
+    
+    Args:
+        request: Audio data (base64) + model name + parameters + segmentation
         
+    Returns:
+        16-bit PCM WAV stream (sizes in the header are unknown, 0xFFFFFFFF)
+    """
+    global current_model
+    
+    if not RVC_AVAILABLE:
+        raise HTTPException(status_code=503, detail="RVC not available")
+    if request.split not in ("silence", "fixed"):
+        raise HTTPException(status_code=422, detail=f"Unknown split mode: {request.split}")
+    
+    start_time = time.time()
+    timer = StageTimer(http_request.headers.get("X-Trace-Id"))
+    params = (request.params or current_params or RVCParams()).dict()
+    segment_seconds = request.segment_seconds or inference.SEGMENT_SECONDS
+    overlap_seconds = inference.SEGMENT_OVERLAP_SECONDS if request.overlap_seconds is None else request.overlap_seconds
+    
+    try:
+        plan, queue_seconds = await inference_pool.run(
+            inference.prepare_segments, request.audio_base64, segment_seconds, overlap_seconds, request.split
+        )
+    except PoolFullError as e:
+        raise pool_full_response(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=f"Cannot decode audio: {e}")
+    timer.add("queue", queue_seconds)
+    for stage, seconds in plan["stages"]:
+        timer.add(stage, seconds)
+    
+    audio, sample_rate, segments = plan["audio"], plan["sample_rate"], plan["segments"]
+    logger.info(f"Streaming conversion with model {request.model_name}: {len(segments)} segment(s)")
+    
+    def submit(index: int) -> asyncio.Task:
+        start, end, _ = segments[index]
+        # The request was admitted with its first job; later segments must not be rejected midway
+        return asyncio.ensure_future(inference_pool.run(
+            inference.convert_segment, request.model_name, audio[start:end], sample_rate, params, bounded=False
+        ))
+    
+    # Converting one segment ahead keeps the worker busy while the previous one is sent
+    lookahead = 1
+    tasks = [submit(i) for i in range(min(lookahead + 1, len(segments)))]
+    
+    try:
+        first, queue_seconds = await tasks[0]
+    except FileNotFoundError:
+        for task in tasks:
+            task.cancel()
+        raise HTTPException(status_code=404, detail=f"Model not found: {request.model_name}")
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        logger.error(f"Streaming conversion failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    current_model = request.model_name
+    
+    async def body():
+        stitcher = inference.SegmentStitcher()
+        job, job_queue_seconds = first, queue_seconds
+        channels = job["audio"].shape[1] if job["audio"].ndim > 1 else 1
+        yield inference.stream_header(job["sample_rate"], channels)
         try:
-            # Perform RVC conversion
-            rvc.infer_file(
-                input_path=input_path,
-                output_path=output_path,
-                f0method=params.f0method,
-                pitch=0,  # Use default pitch
-                index_rate=params.index_rate,
-                filter_radius=params.filter_radius,
-                resample_sr=params.resample_sr,
-                rms_mix_rate=params.rms_mix_rate,
-                protect=params.protect
+            for index, (start, end, shared) in enumerate(segments):
+                if index > 0:
+                    job, job_queue_seconds = await tasks[index]
+                if index + lookahead < len(segments) and len(tasks) == index + lookahead:
+                    tasks.append(submit(index + lookahead))
+                timer.add("queue", job_queue_seconds)
+                for stage, seconds in job["stages"]:
+                    timer.add(stage, seconds)
+                yield inference.pcm16(stitcher.add(job["audio"], shared, end - start))
+            yield inference.pcm16(stitcher.finish())
+            logger.info(
+                f"Streaming conversion completed: {len(segments)} segment(s) "
+                f"in {round(time.time() - start_time, 3)}s"
             )
-            
-            # Read converted audio
-            with open(output_path, 'rb') as f:
-                result_bytes = f.read()
-            
-            # Encode to base64
-            result_base64 = base64.b64encode(result_bytes).decode('utf-8')
-            
-            logger.info(f"Conversion completed: {len(result_bytes)} bytes")
-            
-            return {
-                "status": "converted",
-                "audio_base64": result_base64,
-                "model": request.model_name,
-                "params_used": params.dict()
-            }
-            
+        except Exception as e:
+            # Headers are gone; the client sees a truncated stream
+            logger.error(f"Streaming conversion failed: {e}")
         finally:
-            # Cleanup temp files
-            if os.path.exists(input_path):
-                os.unlink(input_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Conversion failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+            for task in tasks:
+                task.cancel()
+            timer.log("Streaming conversion")
+    
+    return StreamingResponse(
+        body(),
+        media_type="audio/wav",
+        headers={
+            "X-Model": request.model_name,
+            "X-Segments": str(len(segments)),
+            "X-Params-Used": json.dumps(params, separators=(',', ':'))
+        }
+    )
 
 
 # Separate vocals (Demucs)
 @app.post("/separate")
-async def separate_vocals_endpoint(request: SeparationRequest):
+async def separate_vocals_endpoint(request: SeparationRequest, http_request: Request, response: Response):
     """
     Separate vocals from audio using Demucs
     
@@ -337,51 +443,41 @@ async def separate_vocals_endpoint(request: SeparationRequest):
         request: Audio data (base64) + model preset
         
     Returns:
-        Separated vocals and accompaniment (base64)
+        Separated vocals and accompaniment (base64); stage durations in the Server-Timing header
     """
+    timer = StageTimer(http_request.headers.get("X-Trace-Id"))
+    
+    logger.info(f"Separating vocals with model: {request.model}")
+    
     try:
-        import os
-        import tempfile
-        
-        # Decode base64 audio
-        audio_bytes = base64.b64decode(request.audio_base64)
-        
-        logger.info(f"Separating vocals with model: {request.model}")
-        
-        # Create temp directory for Demucs output
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Write input audio
-            input_path = os.path.join(temp_dir, "input.wav")
-            with open(input_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            # Separate vocals
-            vocals_path, accompaniment_path = separate_vocals(input_path, temp_dir)
-            
-            # Read separated audio files
-            with open(vocals_path, 'rb') as f:
-                vocals_bytes = f.read()
-            
-            accompaniment_bytes = None
-            if os.path.exists(accompaniment_path):
-                with open(accompaniment_path, 'rb') as f:
-                    accompaniment_bytes = f.read()
-            
-            # Encode to base64
+        job, queue_seconds = await inference_pool.run(inference.separate_audio, request.audio_base64)
+        timer.add("queue", queue_seconds)
+        for stage, seconds in job["stages"]:
+            timer.add(stage, seconds)
+        vocals_bytes = job["vocals"]
+        accompaniment_bytes = job["accompaniment"]
+        
+        # Encode to base64
+        with timer.stage("encode"):
             vocals_base64 = base64.b64encode(vocals_bytes).decode('utf-8')
             accompaniment_base64 = None
             if accompaniment_bytes:
                 accompaniment_base64 = base64.b64encode(accompaniment_bytes).decode('utf-8')
-            
-            logger.info(f"Separation completed: vocals={len(vocals_bytes)} bytes")
-            
-            return {
-                "status": "separated",
-                "vocals_base64": vocals_base64,
-                "accompaniment_base64": accompaniment_base64,
-                "model": request.model
-            }
-            
+        
+        logger.info(f"Separation completed: vocals={len(vocals_bytes)} bytes")
+        timer.log("Separation")
+        
+        response.headers["Server-Timing"] = timer.header()
+        return {
+            "status": "separated",
+            "vocals_base64": vocals_base64,
+            "accompaniment_base64": accompaniment_base64,
+            "model": request.model,
+            "timings": timer.to_dict()
+        }
+        
+    except PoolFullError as e:
+        raise pool_full_response(e)
     except Exception as e:
         logger.error(f"Separation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -391,7 +487,7 @@ async def separate_vocals_endpoint(request: SeparationRequest):
 @app.post("/set_device")
 async def set_device(device: str = "cuda:0"):
     """Set computation device (cuda:0, cpu, etc.)"""
-    global rvc_instance
+    global current_model
     
     if not RVC_AVAILABLE:
         raise HTTPException(status_code=503, detail="RVC not available")
@@ -417,11 +513,11 @@ async def set_device(device: str = "cuda:0"):
                     detail=f"Invalid device ID: {device_id}. Available: 0-{torch.cuda.device_count()-1}"
                 )
         
-        # Reinitialize RVC with new device
-        rvc_instance = RVC(device=device)
-        
-        # Clear model cache (device changed)
-        model_cache.clear()
+        # Models are reloaded on the new device when next used
+        await run_in_threadpool(inference.set_device, device)
+        if inference_pool.mode == "process":
+            inference_pool.restart(initargs=(device,) + inference_pool.initargs[1:])
+        current_model = None
         torch.cuda.empty_cache()
         
         logger.info(f"Device switched successfully to: {device}")
@@ -0,0 +1,9 @@
+"""
+Shared setup for the RVC server unit tests
+Server modules are imported flat (as server.py does); the tests cover the
+parts that need neither rvc_python nor torch
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,242 @@
+"""Tests for the resident model cache"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import inference
+from model_cache import ModelBusyError, ModelCache, ModelPinnedError
+
+MB = 1024 * 1024
+
+
+class Loader:
+    """Loader with fixed model sizes; a name in `gates` blocks until its event is set"""
+
+    def __init__(self, sizes=None):
+        self.sizes = sizes or {}
+        self.gates = {}
+        self.loads = []
+        self.released = []
+
+    def __call__(self, name):
+        self.loads.append(name)
+        gate = self.gates.get(name)
+        if gate is not None:
+            assert gate.wait(5)
+        if name == "missing":
+            raise FileNotFoundError(name)
+        return f"model:{name}", self.sizes.get(name, 100 * MB)
+
+    def on_evict(self, name, model):
+        self.released.append(name)
+
+
+def make_cache(loader, budget_mb=250):
+    return ModelCache(loader, budget_mb * MB, on_evict=loader.on_evict)
+
+
+def start(fn, *args):
+    thread = threading.Thread(target=fn, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_hit_does_not_reload():
+    loader = Loader()
+    cache = make_cache(loader)
+
+    assert cache.get("a") == "model:a"
+    assert cache.get("a") == "model:a"
+
+    assert loader.loads == ["a"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_model_is_evicted():
+    loader = Loader()
+    cache = make_cache(loader)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+
+    cache.get("c")
+
+    assert cache.loaded() == ["a", "c"]
+    assert loader.released == ["b"]
+
+
+def test_pinned_and_busy_models_are_not_evicted():
+    loader = Loader()
+    cache = make_cache(loader, budget_mb=150)
+    cache.pin("a")
+
+    with cache.use("b"):
+        cache.get("c")
+        assert set(cache.loaded()) == {"a", "b", "c"}  # Over budget rather than evicting
+        with pytest.raises(ModelBusyError):
+            cache.evict("b")
+    with pytest.raises(ModelPinnedError):
+        cache.evict("a")
+
+    assert cache.evict("a", force=True)
+    assert not cache.evict("a")
+
+
+def test_loader_errors_propagate_and_are_not_cached():
+    cache = make_cache(Loader())
+
+    for _ in range(2):
+        with pytest.raises(FileNotFoundError):
+            cache.get("missing")
+    assert len(cache) == 0
+
+
+def test_load_does_not_block_hits_or_stats():
+    loader = Loader()
+    cache = make_cache(loader, budget_mb=1000)
+    cache.get("a")
+    loader.gates["slow"] = threading.Event()
+
+    loading = start(cache.get, "slow")
+    wait_for(lambda: "slow" in loader.loads)
+
+    assert cache.get("a") == "model:a"
+    assert cache.stats()["loading"] == ["slow"]
+    assert cache.unpin("a")
+
+    loader.gates["slow"].set()
+    loading.join(2)
+    assert "slow" in cache
+
+
+def test_concurrent_requests_share_one_load():
+    loader = Loader()
+    cache = make_cache(loader)
+    loader.gates["a"] = threading.Event()
+    results = []
+
+    threads = [start(lambda: results.append(cache.get("a"))) for _ in range(4)]
+    wait_for(lambda: "a" in loader.loads)
+    time.sleep(0.02)
+    loader.gates["a"].set()
+    for thread in threads:
+        thread.join(2)
+
+    assert results == ["model:a"] * 4
+    assert loader.loads == ["a"]
+
+
+def test_waiters_see_the_leaders_load_error():
+    loader = Loader()
+    cache = make_cache(loader)
+    loader.gates["missing"] = threading.Event()
+    errors = []
+
+    def get_missing():
+        try:
+            cache.get("missing")
+        except FileNotFoundError as e:
+            errors.append(e)
+
+    threads = [start(get_missing) for _ in range(3)]
+    wait_for(lambda: "missing" in loader.loads)
+    time.sleep(0.02)
+    loader.gates["missing"].set()
+    for thread in threads:
+        thread.join(2)
+
+    assert len(errors) == 3
+    assert loader.loads == ["missing"]
+
+
+def test_clear_skips_busy_models_until_their_inference_ends():
+    loader = Loader()
+    cache = make_cache(loader)
+    cache.get("idle")
+
+    with cache.use("busy") as model:
+        assert cache.clear() == 1
+        assert len(cache) == 0
+        assert loader.released == ["idle"]
+        assert model == "model:busy"  # Still usable by the running inference
+
+    assert loader.released == ["idle", "busy"]
+    assert cache.get("busy") == "model:busy"
+    assert loader.loads.count("busy") == 2
+
+
+def test_load_started_before_clear_is_not_kept():
+    loader = Loader()
+    cache = make_cache(loader)
+    loader.gates["a"] = threading.Event()
+    results = []
+
+    loading = start(lambda: results.append(cache.get("a")))
+    wait_for(lambda: "a" in loader.loads)
+    cache.clear()
+    loader.gates["a"].set()
+    loading.join(2)
+
+    assert results == ["model:a"]
+    assert loader.loads == ["a", "a"]
+    assert loader.released == ["a"]
+    assert cache.loaded() == ["a"]
+
+
+def test_reload_makes_room_for_its_known_size_first():
+    loader = Loader(sizes={"big": 200 * MB})
+    cache = make_cache(loader)
+    cache.get("big")
+    cache.evict("big")
+    cache.get("a")
+
+    loader.gates["big"] = threading.Event()
+    loading = start(cache.get, "big")
+    wait_for(lambda: loader.loads.count("big") == 2)
+
+    assert "a" not in cache  # Evicted before the load, not after
+    loader.gates["big"].set()
+    loading.join(2)
+
+
+class Tensor:
+    def __init__(self, numel, element_size):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+class Module:
+    def __init__(self, parameters, buffers=()):
+        self._parameters = parameters
+        self._buffers = list(buffers)
+
+    def parameters(self):
+        return iter(self._parameters)
+
+    def buffers(self):
+        return iter(self._buffers)
+
+
+def test_resident_size_counts_parameters_and_buffers():
+    net_g = Module([Tensor(1000, 2), Tensor(10, 2)], buffers=[Tensor(4, 8)])  # Half-precision weights
+    instance = SimpleNamespace(vc=SimpleNamespace(net_g=net_g, hubert_model=None))
+    assert inference.resident_bytes(instance) == 2052
+
+    instance.vc.hubert_model = Module([Tensor(100, 4)])
+    assert inference.resident_bytes(instance) == 2452
+    assert inference.resident_bytes(SimpleNamespace()) == 0
@@ -0,0 +1,144 @@
+"""Tests for in-memory conversion through the backend's own pipeline"""
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import inference
+from inference import StageTimer, read_wav, write_wav
+
+RATE = 16000
+PARAMS = {
+    "f0method": "harvest",
+    "index_rate": 0.75,
+    "filter_radius": 3,
+    "resample_sr": 0,
+    "rms_mix_rate": 0.25,
+    "protect": 0.33
+}
+
+# Stands in for rvc-python's module-level harvest input cache
+input_audio_path2wav = {}
+
+
+class Pipeline:
+    """rvc-python Pipeline stand-in: doubles the rate (16 kHz in, 32 kHz out) and returns int16"""
+
+    def __init__(self):
+        self.calls = []
+
+    def pipeline(self, model, net_g, sid, audio, input_audio_path, times, f0_up_key, f0_method, file_index,
+                 index_rate, if_f0, filter_radius, tgt_sr, resample_sr, rms_mix_rate, version, protect,
+                 f0_file=None):
+        input_audio_path2wav[input_audio_path] = audio
+        self.calls.append({"audio": audio, "key": input_audio_path, "file_index": file_index, "f0_method": f0_method})
+        return (np.repeat(audio, 2) * 32767).astype(np.int16)
+
+
+class Model:
+    """Loaded rvc-python instance; infer_file copies its input and counts the calls"""
+
+    def __init__(self, index=""):
+        self.vc = SimpleNamespace(
+            hubert_model="hubert", net_g="net_g", pipeline=Pipeline(), tgt_sr=32000, if_f0=1, version="v2"
+        )
+        self.current_model = "voice.pth"
+        self.models = {"voice.pth": {"pth": "/models/voice.pth", "index": index}}
+        self.file_calls = 0
+
+    def infer_file(self, input_path, output_path, **params):
+        self.file_calls += 1
+        shutil.copyfile(input_path, output_path)
+
+
+def tone(seconds: float, channels: int = 1) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return np.stack([audio] * channels, axis=1) if channels > 1 else audio
+
+
+def test_clip_is_converted_without_temp_files():
+    model = Model()
+    timer = StageTimer()
+
+    wav_bytes, segments = inference._convert_clip(model, write_wav(tone(2), RATE), PARAMS, timer)
+
+    converted, sample_rate = read_wav(wav_bytes)
+    assert (segments, model.file_calls, len(model.vc.pipeline.calls)) == (1, 0, 1)
+    assert sample_rate == 32000
+    assert len(converted) == 2 * 2 * RATE
+    assert np.allclose(converted[::2], tone(2), atol=1e-3)
+    assert "write_input" not in timer.totals()
+
+
+def test_stereo_input_is_downmixed_and_loud_input_normalized():
+    model = Model()
+    audio = np.stack([tone(1) * 5, tone(1) * 5], axis=1)  # Peak 1.5
+
+    converted, _ = inference._run_pipeline(model, audio, RATE, PARAMS)
+
+    sent = model.vc.pipeline.calls[0]["audio"]
+    assert sent.ndim == 1
+    assert np.isclose(np.abs(sent).max(), 0.95, atol=1e-3)
+    assert converted.dtype == np.float32
+
+
+def test_harvest_input_is_not_left_behind():
+    model = Model()
+
+    inference._run_pipeline(model, tone(1), RATE, PARAMS)
+    inference._run_pipeline(model, tone(1), RATE, PARAMS)
+
+    keys = [call["key"] for call in model.vc.pipeline.calls]
+    assert keys[0] != keys[1]  # Harvest's f0 cache is keyed by path
+    assert input_audio_path2wav == {}
+
+
+@pytest.mark.parametrize("resample_sr, expected", [(0, 32000), (48000, 48000), (32000, 32000)])
+def test_output_rate_follows_resample_sr(resample_sr, expected):
+    _, output_rate = inference._run_pipeline(Model(), tone(1), RATE, dict(PARAMS, resample_sr=resample_sr))
+
+    assert output_rate == expected
+
+
+def test_index_path_is_passed_like_vc_single():
+    model = Model(index="/models/trained_IVF_voice.index")
+
+    inference._run_pipeline(model, tone(1), RATE, PARAMS)
+
+    assert model.vc.pipeline.calls[0]["file_index"] == "/models/added_IVF_voice.index"
+
+
+def test_long_clip_segments_stay_in_memory(monkeypatch):
+    monkeypatch.setattr(inference, "SEGMENT_THRESHOLD_SECONDS", 30)
+    model = Model()
+
+    wav_bytes, segments = inference._convert_clip(model, write_wav(tone(50), RATE), PARAMS, StageTimer())
+
+    converted, sample_rate = read_wav(wav_bytes)
+    assert (segments, model.file_calls) == (len(model.vc.pipeline.calls), 0)
+    assert segments > 1
+    assert len(converted) == 2 * 50 * RATE
+
+
+def test_disabled_or_missing_pipeline_uses_temp_files(monkeypatch):
+    wav_bytes = write_wav(tone(1), RATE)
+
+    unloaded = Model()
+    unloaded.vc.net_g = None
+    assert inference._convert_clip(unloaded, wav_bytes, PARAMS, StageTimer()) == (wav_bytes, 1)
+    assert unloaded.file_calls == 1
+
+    monkeypatch.setattr(inference, "IN_MEMORY", False)
+    model = Model()
+    assert inference._convert_clip(model, wav_bytes, PARAMS, StageTimer()) == (wav_bytes, 1)
+    assert (model.file_calls, model.vc.pipeline.calls) == (1, [])
+
+
+def test_input_libsndfile_cannot_decode_goes_to_the_backend_loader():
+    model = Model()
+    data = b"not a wav file"
+
+    assert inference._convert_clip(model, data, PARAMS, StageTimer()) == (data, 1)
+    assert model.file_calls == 1
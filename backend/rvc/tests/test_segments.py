@@ -0,0 +1,124 @@
+"""Tests for segmented conversion: cut planning, crossfade stitching and the file-based segment path"""
+import shutil
+
+import numpy as np
+import pytest
+
+import inference
+from inference import SegmentStitcher, StageTimer, plan_segments, read_wav, write_wav
+
+RATE = 16000
+PARAMS = {
+    "f0method": "rmvpe",
+    "index_rate": 0.75,
+    "filter_radius": 3,
+    "resample_sr": 0,
+    "rms_mix_rate": 0.25,
+    "protect": 0.33
+}
+
+
+class CopyModel:
+    """File-to-file model that returns its input unchanged"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def infer_file(self, input_path, output_path, **params):
+        self.calls += 1
+        shutil.copyfile(input_path, output_path)
+
+
+def tone(seconds: float, channels: int = 1) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return np.stack([audio] * channels, axis=1) if channels > 1 else audio
+
+
+def test_short_clip_is_one_segment():
+    assert plan_segments(tone(25), RATE, segment_seconds=20) == [(0, 25 * RATE, 0)]
+
+
+def test_segments_cover_the_clip_with_shared_overlaps():
+    audio = tone(95)
+
+    segments = plan_segments(audio, RATE, segment_seconds=20, overlap_seconds=0.5, split="fixed")
+
+    assert segments[0][0] == 0
+    assert segments[-1][1] == len(audio)
+    assert segments[-1][2] == 0
+    for (_, end, shared), (next_start, _, _) in zip(segments, segments[1:]):
+        assert shared == end - next_start == int(0.5 * RATE / 2) * 2
+
+
+def test_last_segment_is_never_a_sliver():
+    segments = plan_segments(tone(61), RATE, segment_seconds=20, overlap_seconds=0.0, split="fixed")
+
+    # The 1 s remainder joins the last segment instead of becoming its own
+    assert [end - start for start, end, _ in segments] == [20 * RATE, 20 * RATE, 21 * RATE]
+
+
+def test_silence_split_cuts_in_the_nearest_pause():
+    audio = tone(50)
+    audio[int(21.0 * RATE):int(21.3 * RATE)] = 0.0
+
+    segments = plan_segments(audio, RATE, segment_seconds=20, overlap_seconds=0.0, split="silence")
+
+    cut = segments[0][1]
+    assert 21.0 * RATE <= cut <= 21.3 * RATE
+
+
+def test_stitching_identity_segments_restores_the_clip():
+    audio = tone(50, channels=2)
+    segments = plan_segments(audio, RATE, segment_seconds=20, overlap_seconds=0.5)
+    stitcher = SegmentStitcher()
+
+    pieces = [stitcher.add(audio[start:end], shared, end - start) for start, end, shared in segments]
+    pieces.append(stitcher.finish())
+
+    assert np.allclose(np.concatenate(pieces), audio, atol=1e-6)
+
+
+def test_stitcher_scales_the_overlap_to_the_output_rate():
+    stitcher = SegmentStitcher()
+
+    # A model resampling 16 kHz input to 32 kHz output doubles the shared frames
+    emitted = stitcher.add(np.ones(2000, dtype=np.float32), shared_input_frames=100, input_frames=1000)
+
+    assert len(emitted) == 1800
+    assert len(stitcher.finish()) == 200
+
+
+def test_segments_go_through_temp_files_and_keep_the_audio():
+    model = CopyModel()
+    audio = tone(50)
+    segments = plan_segments(audio, RATE, segment_seconds=20, overlap_seconds=0.5)
+
+    pieces = [piece for piece, _ in inference.iter_converted_segments(model, audio, RATE, segments, PARAMS, StageTimer())]
+
+    assert model.calls == len(segments) == 3
+    assert np.allclose(np.concatenate(pieces), audio, atol=1e-3)
+
+
+def test_long_clip_is_converted_in_segments(monkeypatch):
+    monkeypatch.setattr(inference, "SEGMENT_THRESHOLD_SECONDS", 30)
+    model = CopyModel()
+    timer = StageTimer()
+
+    wav_bytes, segments = inference._convert_clip(model, write_wav(tone(40), RATE), PARAMS, timer)
+
+    converted, sample_rate = read_wav(wav_bytes)
+    assert (segments, model.calls) == (2, 2)
+    assert sample_rate == RATE
+    assert len(converted) == 40 * RATE
+    assert timer.totals()["inference"] > 0
+
+
+@pytest.mark.parametrize("seconds", [5, 25])
+def test_clips_up_to_the_threshold_are_one_file_conversion(seconds, monkeypatch):
+    monkeypatch.setattr(inference, "SEGMENT_THRESHOLD_SECONDS", 30)
+    model = CopyModel()
+    wav_bytes = write_wav(tone(seconds), RATE)
+
+    assert inference._convert_clip(model, wav_bytes, PARAMS, StageTimer()) == (wav_bytes, 1)
+    assert model.calls == 1
@@ -0,0 +1,138 @@
+"""Tests for the inference worker pool"""
+import asyncio
+import os
+import threading
+
+import pytest
+
+from workers import InferencePool, PoolFullError, pool_from_env
+
+
+class Gate:
+    """Blocking job that waits until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, value):
+        self.started.set()
+        assert self.release.wait(5)
+        return value
+
+
+async def wait_started(gate: Gate) -> None:
+    assert await asyncio.to_thread(gate.started.wait, 5)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_queue_wait():
+    pool = InferencePool(workers=1)
+
+    result, queue_seconds = await pool.run(sum, [1, 2, 3])
+
+    assert result == 6
+    assert queue_seconds >= 0.0
+    assert pool.stats()["completed"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_work_runs_off_the_event_loop():
+    pool = InferencePool(workers=1)
+    gate = Gate()
+
+    job = asyncio.create_task(pool.run(gate, "done"))
+    await wait_started(gate)
+    # The loop still answers while the worker is blocked
+    assert pool.stats()["running"] == 1
+    gate.release.set()
+
+    assert (await job)[0] == "done"
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after():
+    pool = InferencePool(workers=1, max_queue=1)
+    gate = Gate()
+
+    running = asyncio.create_task(pool.run(gate, 1))
+    await wait_started(gate)
+    queued = asyncio.create_task(pool.run(gate, 2))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(PoolFullError) as excinfo:
+        await pool.run(gate, 3)
+    assert excinfo.value.retry_after >= 1
+
+    # Follow-up work of an admitted request is not bounded
+    unbounded = asyncio.create_task(pool.run(gate, 4, bounded=False))
+    gate.release.set()
+
+    assert [(await job)[0] for job in (running, queued, unbounded)] == [1, 2, 4]
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_and_free_the_slot():
+    pool = InferencePool(workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("bad audio")
+
+    with pytest.raises(ValueError):
+        await pool.run(fail)
+    assert (await pool.run(sum, [1]))[0] == 1
+
+    stats = pool.stats()
+    assert (stats["failed"], stats["completed"], stats["running"]) == (1, 1, 0)
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_drops_a_job_that_has_not_started():
+    pool = InferencePool(workers=1, max_queue=1)
+    gate = Gate()
+    ran = []
+
+    running = asyncio.create_task(pool.run(gate, 1))
+    await wait_started(gate)
+    waiting = asyncio.create_task(pool.run(ran.append, 2))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    await asyncio.sleep(0.01)
+    gate.release.set()
+    await running
+    await asyncio.sleep(0.01)
+
+    assert ran == []
+    assert pool.stats()["queued"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_in_another_interpreter():
+    pool = InferencePool(mode="process", workers=1)
+
+    pid, _ = await pool.run(os.getpid)
+
+    assert pid != os.getpid()
+    pool.shutdown()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        InferencePool(mode="gpu")
+
+
+def test_pool_from_env(monkeypatch):
+    monkeypatch.setenv("RVC_EXECUTOR", "thread")
+    monkeypatch.setenv("RVC_WORKERS", "0")
+    monkeypatch.setenv("RVC_MAX_QUEUE", "4")
+
+    pool = pool_from_env()
+
+    assert (pool.mode, pool.workers, pool.max_queue) == ("thread", 1, 4)
+    pool.shutdown()
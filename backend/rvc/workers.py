@@ -0,0 +1,195 @@
+"""
+Inference worker pool for the RVC server
+Blocking work (model loads, inference, Demucs, temp-file I/O) runs on a
+thread or process pool behind a bounded queue, so the event loop keeps
+answering /health while conversions run
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class PoolFullError(Exception):
+    """Raised when the queue is full; callers answer 503 with Retry-After"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, *args: Any) -> Tuple[Any, float]:
+    # Module level so process pools can pickle it; returns when the work started
+    started_at = time.time()
+    return fn(*args), started_at
+
+
+class InferencePool:
+    """
+    Bounded executor for blocking RVC work
+
+    mode "thread" shares the server's model cache and suits GPU hosts (torch
+    releases the GIL during kernels); mode "process" gives CPU-only hosts
+    one interpreter per core, each worker with its own model cache.
+
+    At most `workers` jobs run and `max_queue` wait; further submissions
+    are rejected immediately instead of piling up behind a slow GPU.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 1,
+        max_queue: int = 16,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = ()
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode {mode!r} (expected one of {', '.join(EXECUTOR_MODES)})")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._recent_seconds = 0.0  # Moving average of job duration, for Retry-After
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "process":
+            # spawn: forked children would inherit the parent's event loop and CUDA state
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="rvc-worker",
+            initializer=self.initializer,
+            initargs=self.initargs
+        )
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    @property
+    def running(self) -> int:
+        return min(self._pending, self.workers)
+
+    async def run(self, fn: Callable, *args: Any, bounded: bool = True) -> Tuple[Any, float]:
+        """
+        Run fn(*args) on the pool
+
+        In process mode fn and args must be picklable (module-level functions).
+        Cancelling the caller drops a job that has not started yet.
+        bounded=False skips the queue limit, for follow-up jobs of work that
+        was already admitted (later segments of a streamed conversion).
+
+        Returns:
+            (fn's result, seconds the job waited in the queue)
+
+        Raises:
+            PoolFullError: workers + max_queue jobs are already pending
+            Whatever fn raises
+        """
+        with self._lock:
+            if bounded and self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                retry_after = max(1, round(self._recent_seconds * (self.queued + 1) / self.workers))
+                raise PoolFullError(f"Inference queue full ({self.max_queue} waiting)", retry_after)
+            self._pending += 1
+
+        submitted_at = time.time()
+        try:
+            future = self._executor.submit(functools.partial(_timed_call, fn), *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(functools.partial(self._finished, submitted_at))
+
+        try:
+            result, started_at = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): replace the pool for later jobs
+            logger.error("Inference worker process died; restarting the pool")
+            self.restart()
+            raise
+        return result, max(0.0, started_at - submitted_at)
+
+    def _finished(self, submitted_at: float, future: Future) -> None:
+        # Runs when the job ends (or is cancelled before starting), not when the caller stops waiting
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+                return
+            self.completed += 1
+            _, started_at = future.result()
+            duration = time.time() - started_at
+            self._recent_seconds = duration if self.completed == 1 else 0.8 * self._recent_seconds + 0.2 * duration
+
+    def restart(self, initargs: Optional[Tuple[Any, ...]] = None) -> None:
+        """
+        Replace the executor (e.g. new worker settings or a broken process pool)
+
+        Jobs already running finish on the old executor.
+        """
+        if initargs is not None:
+            self.initargs = initargs
+        old = self._executor
+        self._executor = self._create_executor()
+        old.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.queued,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_job_seconds": round(self._recent_seconds, 3)
+            }
+
+
+def pool_from_env(initializer: Optional[Callable[..., None]] = None, initargs: Tuple[Any, ...] = ()) -> InferencePool:
+    """
+    Pool configured by RVC_EXECUTOR (thread|process), RVC_WORKERS (0 = one
+    thread, or one process per CPU core) and RVC_MAX_QUEUE
+    """
+    mode = os.getenv("RVC_EXECUTOR", "thread").lower()
+    workers = int(os.getenv("RVC_WORKERS", "0"))
+    if workers <= 0:
+        workers = (os.cpu_count() or 1) if mode == "process" else 1
+    return InferencePool(
+        mode=mode,
+        workers=workers,
+        max_queue=int(os.getenv("RVC_MAX_QUEUE", "16")),
+        initializer=initializer,
+        initargs=initargs
+    )
@@ -193,35 +193,44 @@ export function ReadingMode() {
       const response = await fetch('/tts/synthesize', {
         method: 'POST',
         headers: { 
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          // Ask for raw WAV instead of base64-in-JSON
+          'Accept': 'audio/wav, application/json;q=0.5'
         },
         body: JSON.stringify(ttsRequest)
       })
       
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}))
-        throw new Error(errorData.detail || `Synthesis failed: ${response.statusText}`)
+        throw new Error(errorData.detail || errorData.error || `Synthesis failed: ${response.statusText}`)
       }
       
-      const taskResponse = await response.json()
+      // Binary response: the body is the WAV itself
+      const contentType = response.headers.get('Content-Type') || ''
+      let audioBlob: Blob
+      if (contentType.startsWith('audio/')) {
+        audioBlob = await response.blob()
+      } else {
+        const taskResponse = await response.json()
       
-      // Check if the task completed successfully
-      if (taskResponse.status !== 'completed') {
-        throw new Error(taskResponse.error || 'TTS generation failed')
-      }
+        // Check if the task completed successfully
+        if (taskResponse.status !== 'completed') {
+          throw new Error(taskResponse.error || 'TTS generation failed')
+        }
       
-      // Decode base64 audio data
-      if (!taskResponse.result?.audio_base64) {
-        throw new Error('No audio data in response')
-      }
+        // Decode base64 audio data
+        if (!taskResponse.result?.audio_base64) {
+          throw new Error('No audio data in response')
+        }
       
-      // Convert base64 to blob
-      const audioData = atob(taskResponse.result.audio_base64)
-      const audioArray = new Uint8Array(audioData.length)
-      for (let i = 0; i < audioData.length; i++) {
-        audioArray[i] = audioData.charCodeAt(i)
+        // Convert base64 to blob
+        const audioData = atob(taskResponse.result.audio_base64)
+        const audioArray = new Uint8Array(audioData.length)
+        for (let i = 0; i < audioData.length; i++) {
+          audioArray[i] = audioData.charCodeAt(i)
+        }
+        audioBlob = new Blob([audioArray], { type: 'audio/wav' })
       }
-      const audioBlob = new Blob([audioArray], { type: 'audio/wav' })
       
       // Cache the audio
       setAudioCache(prev => new Map(prev).set(lineId, audioBlob))
@@ -5,6 +5,9 @@
 import { useState, useRef, useCallback, useEffect } from 'react'
 import type { ReadingLine, AudioSettings, EmotionStyle } from '../types/audio'
 
+// Lines the gateway accepts per request; longer scripts are sent in pages
+const SESSION_PAGE_SIZE = 1000
+
 interface UsePlayAllOptions {
   lines: ReadingLine[]
   audioSettings: AudioSettings
@@ -38,9 +41,22 @@ export function usePlayAll({
   const [playbackSpeed, setPlaybackSpeed] = useState(1.0)
   
   const audioRef = useRef<HTMLAudioElement | null>(null)
-  const audioQueueRef = useRef<Blob[]>([])
   const abortControllerRef = useRef<AbortController | null>(null)
-  const isGeneratingRef = useRef(false)
+  // Server-side reading session: the gateway keeps the next lines synthesized ahead of us
+  const sessionIdRef = useRef<string | null>(null)
+  // Resolves once every page of a long script has been appended to the session
+  const appendLinesRef = useRef<Promise<void>>(Promise.resolve())
+  const currentIndexRef = useRef(0)
+  const isPlayingRef = useRef(false)
+  
+  // Close the reading session so the gateway cancels its prefetch
+  const closeSession = () => {
+    const sessionId = sessionIdRef.current
+    sessionIdRef.current = null
+    if (sessionId) {
+      fetch(`/tts/sessions/${sessionId}`, { method: 'DELETE', keepalive: true }).catch(() => {})
+    }
+  }
   
   // Cleanup on unmount
   useEffect(() => {
@@ -52,6 +68,7 @@ export function usePlayAll({
       if (abortControllerRef.current) {
         abortControllerRef.current.abort()
       }
+      closeSession()
     }
   }, [])
   
@@ -80,56 +97,76 @@ export function usePlayAll({
     return () => window.removeEventListener('keydown', handleKeyPress)
   }, [isPlaying, isPaused, lines.length])
   
-  // Generate audio for a single line
-  const generateAudioForLine = async (line: ReadingLine, signal: AbortSignal): Promise<Blob | null> => {
+  // Register all lines once; the gateway starts prefetching the first ones
+  const createSession = async (signal: AbortSignal): Promise<string | null> => {
     if (!selectedEmotion) return null
     
-    try {
-      // Use the new backend gateway API
-      const ttsRequest = {
-        text: line.text,
-        speaker_id: selectedEmotion.speakerId,
-        speed_scale: audioSettings.speedScale * playbackSpeed,
-        pitch_scale: audioSettings.pitchScale,
-        intonation_scale: audioSettings.intonationScale,
-        volume_scale: audioSettings.volumeScale
-      }
-      
-      const response = await fetch('/tts/synthesize', {
+    const texts = lines.map(line => line.text)
+    const sessionRequest = {
+      lines: texts.slice(0, SESSION_PAGE_SIZE),
+      speaker_id: selectedEmotion.speakerId,
+      speed_scale: audioSettings.speedScale * playbackSpeed,
+      pitch_scale: audioSettings.pitchScale,
+      intonation_scale: audioSettings.intonationScale,
+      volume_scale: audioSettings.volumeScale
+    }
+    
+    const response = await fetch('/tts/sessions', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(sessionRequest),
+      signal
+    })
+    
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}))
+      throw new Error(errorData.detail || `Failed to start reading session: ${response.statusText}`)
+    }
+    
+    const session = await response.json()
+    // Playback starts with the first page; the rest is appended in order meanwhile
+    appendLinesRef.current = appendLines(session.session_id, texts.slice(SESSION_PAGE_SIZE), signal)
+    appendLinesRef.current.catch(() => {})
+    return session.session_id
+  }
+  
+  const appendLines = async (sessionId: string, texts: string[], signal: AbortSignal): Promise<void> => {
+    for (let start = 0; start < texts.length; start += SESSION_PAGE_SIZE) {
+      const response = await fetch(`/tts/sessions/${sessionId}/lines`, {
         method: 'POST',
-        headers: { 
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(ttsRequest),
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ lines: texts.slice(start, start + SESSION_PAGE_SIZE) }),
         signal
       })
       
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}))
-        throw new Error(errorData.detail || `Synthesis failed: ${response.statusText}`)
+        throw new Error(errorData.detail || `Failed to add lines to reading session: ${response.statusText}`)
       }
-      
-      const taskResponse = await response.json()
-      
-      // Check if the task completed successfully
-      if (taskResponse.status !== 'completed') {
-        throw new Error(taskResponse.error || 'TTS generation failed')
+    }
+  }
+  
+  // Fetch one line's audio (usually already prefetched); this also moves the server-side cursor
+  const fetchLineAudio = async (index: number, signal: AbortSignal): Promise<Blob | null> => {
+    const sessionId = sessionIdRef.current
+    if (!sessionId) return null
+    
+    try {
+      if (index >= SESSION_PAGE_SIZE) {
+        await appendLinesRef.current
       }
       
-      // Decode base64 audio data
-      if (!taskResponse.result?.audio_base64) {
-        throw new Error('No audio data in response')
-      }
+      const response = await fetch(`/tts/sessions/${sessionId}/lines/${index}`, {
+        headers: { 'Accept': 'audio/wav' },
+        signal
+      })
       
-      // Convert base64 to blob
-      const audioData = atob(taskResponse.result.audio_base64)
-      const audioArray = new Uint8Array(audioData.length)
-      for (let i = 0; i < audioData.length; i++) {
-        audioArray[i] = audioData.charCodeAt(i)
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}))
+        throw new Error(errorData.detail || `Synthesis failed: ${response.statusText}`)
       }
-      const audioBlob = new Blob([audioArray], { type: 'audio/wav' })
       
-      return audioBlob
+      return await response.blob()
       
     } catch (err) {
       if ((err as Error).name === 'AbortError') {
@@ -141,47 +178,30 @@ export function usePlayAll({
     }
   }
   
-  // Generate all audio in batch
-  const generateAllAudio = async (signal: AbortSignal): Promise<Blob[]> => {
-    const audioBlobs: Blob[] = []
-    isGeneratingRef.current = true
-    
-    try {
-      // Generate audio for each line
-      for (let i = 0; i < lines.length; i++) {
-        if (signal.aborted) break
-        
-        const blob = await generateAudioForLine(lines[i], signal)
-        if (blob) {
-          audioBlobs.push(blob)
-        }
-      }
-    } finally {
-      isGeneratingRef.current = false
-    }
+  // Play the line at index, then continue with the next one
+  const playLine = useCallback(async (index: number) => {
+    const controller = abortControllerRef.current
+    if (!controller || controller.signal.aborted || !isPlayingRef.current) return
     
-    return audioBlobs
-  }
-  
-  // Play next audio in queue
-  const playNextAudio = useCallback(async () => {
-    if (currentIndex >= audioQueueRef.current.length) {
+    if (index >= lines.length) {
       stop()
       return
     }
     
-    const audioBlob = audioQueueRef.current[currentIndex]
-    if (!audioBlob) {
-      setCurrentIndex(prev => prev + 1)
-      setTimeout(playNextAudio, 100)
-      return
-    }
+    currentIndexRef.current = index
+    setCurrentIndex(index)
     
     // Highlight current line
-    const currentLine = lines[currentIndex]
-    if (currentLine) {
-      onLineHighlight?.(currentLine.id)
-      onAutoScroll?.(currentLine.id)
+    const currentLine = lines[index]
+    onLineHighlight?.(currentLine.id)
+    onAutoScroll?.(currentLine.id)
+    
+    const audioBlob = await fetchLineAudio(index, controller.signal)
+    if (controller.signal.aborted || currentIndexRef.current !== index) return
+    if (!audioBlob) {
+      // Skip lines that failed to synthesize
+      playLine(index + 1)
+      return
     }
     
     // Create or reuse audio element
@@ -197,9 +217,8 @@ export function usePlayAll({
     // Handle audio end
     audioRef.current.onended = () => {
       URL.revokeObjectURL(audioUrl)
-      if (isPlaying && !isPaused) {
-        setCurrentIndex(prev => prev + 1)
-        playNextAudio()
+      if (currentIndexRef.current === index) {
+        playLine(index + 1)
       }
     }
     
@@ -210,7 +229,7 @@ export function usePlayAll({
       console.error('Failed to play audio:', err)
       stop()
     }
-  }, [currentIndex, isPlaying, isPaused, lines, onLineHighlight, onAutoScroll])
+  }, [lines, onLineHighlight, onAutoScroll])
   
   // Play all lines
   const play = useCallback(async () => {
@@ -228,26 +247,26 @@ export function usePlayAll({
       setIsPlaying(true)
       setIsPaused(false)
       setCurrentIndex(0)
+      isPlayingRef.current = true
       
       // Create abort controller
       abortControllerRef.current = new AbortController()
       
-      // Generate all audio
       try {
-        const audioBlobs = await generateAllAudio(abortControllerRef.current.signal)
-        audioQueueRef.current = audioBlobs
-        
-        if (audioBlobs.length > 0) {
-          playNextAudio()
+        sessionIdRef.current = await createSession(abortControllerRef.current.signal)
+        if (sessionIdRef.current) {
+          playLine(0)
         } else {
           stop()
         }
       } catch (err) {
-        console.error('Failed to generate audio:', err)
+        if ((err as Error).name !== 'AbortError') {
+          console.error('Failed to generate audio:', err)
+        }
         stop()
       }
     }
-  }, [lines, isPaused, isPlaying, playNextAudio])
+  }, [lines, isPaused, isPlaying, playLine])
   
   // Pause playback
   const pause = useCallback(() => {
@@ -270,25 +289,28 @@ export function usePlayAll({
       abortControllerRef.current = null
     }
     
+    closeSession()
+    isPlayingRef.current = false
+    currentIndexRef.current = 0
+    
     setIsPlaying(false)
     setIsPaused(false)
     setCurrentIndex(0)
-    audioQueueRef.current = []
     onLineHighlight?.(null)
   }, [onLineHighlight])
   
   // Skip to next line
   const skip = useCallback(() => {
-    if (!isPlaying || currentIndex >= lines.length - 1) return
+    if (!isPlaying || currentIndexRef.current >= lines.length - 1) return
     
     if (audioRef.current) {
       audioRef.current.pause()
       audioRef.current.currentTime = 0
     }
     
-    setCurrentIndex(prev => Math.min(prev + 1, lines.length - 1))
-    setTimeout(playNextAudio, 100)
-  }, [isPlaying, currentIndex, lines.length, playNextAudio])
+    setIsPaused(false)
+    playLine(currentIndexRef.current + 1)
+  }, [isPlaying, lines.length, playLine])
   
   return {
     isPlaying,